@@ -1,3 +1,3 @@
-from .download import Download, download_files
+from .download import Download, download_files, parse_urls
 
-__all__ = ["Download", "download_files"]
+__all__ = ["Download", "download_files", "parse_urls"]
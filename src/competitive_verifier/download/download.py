@@ -1,12 +1,17 @@
+import concurrent.futures
+import threading
+import urllib.parse
 from argparse import ArgumentParser
+from collections import defaultdict
 from collections.abc import Iterable
-from itertools import chain
+from contextlib import nullcontext
+from itertools import chain, zip_longest
 from logging import getLogger
 from typing import Literal
 
 from pydantic import Field
 
-from competitive_verifier import oj
+from competitive_verifier import log, oj
 from competitive_verifier.arg import (
     OptionalVerifyFilesJsonArguments,
     VerboseArguments,
@@ -23,6 +28,9 @@ logger = getLogger(__name__)
 
 UrlOrVerificationFile = str | VerificationFile
 
+DEFAULT_JOBS_PER_HOST = 4
+"""The default number of problems downloaded from the same host at the same time"""
+
 
 def parse_urls(
     url_or_file: UrlOrVerificationFile | Iterable[UrlOrVerificationFile],
@@ -44,20 +52,94 @@ def enumerate_urls(file: VerificationFile) -> Iterable[str]:
             yield v.problem
 
 
+def _get_host(url: str) -> str:
+    return urllib.parse.urlparse(url).netloc
+
+
+def interleave_hosts(urls: Iterable[str]) -> list[str]:
+    """Order the URLs so that the same host does not continue.
+
+    The downloads from different hosts are started first
+    instead of waiting for the limit of a single host.
+    """
+    by_host: defaultdict[str, list[str]] = defaultdict(list)
+    for url in sorted(urls):
+        by_host[_get_host(url)].append(url)
+    return [
+        url
+        for urls_at_once in zip_longest(*by_host.values())
+        for url in urls_at_once
+        if url is not None
+    ]
+
+
+def _download_parallel(
+    urls: list[str],
+    *,
+    group_log: bool,
+    jobs: int,
+    jobs_per_host: int,
+) -> bool:
+    host_semaphores = {
+        host: threading.BoundedSemaphore(jobs_per_host)
+        for host in {_get_host(url) for url in urls}
+    }
+
+    def download(url: str) -> bool:
+        with (
+            host_semaphores[_get_host(url)],
+            log.deferred_group(f"download: {url}") if group_log else nullcontext(),
+        ):
+            return oj.download(url)
+
+    with (
+        log.enable_deferred_groups() if group_log else nullcontext(),
+        concurrent.futures.ThreadPoolExecutor(max_workers=jobs) as executor,
+    ):
+        return all(list(executor.map(download, urls)))
+
+
 def download_files(
     url_or_file: UrlOrVerificationFile | Iterable[UrlOrVerificationFile],
     *,
     check: bool = False,
     group_log: bool = False,
+    jobs: int = 1,
+    jobs_per_host: int = DEFAULT_JOBS_PER_HOST,
 ) -> bool:
-    result = True
+    """Download the problems.
+
+    Args:
+        url_or_file: The problem URLs or the verification files which have them
+        check: Raise VerifierError if some downloads fail
+        group_log: Group the logs of each download
+        jobs: The number of problems downloaded at the same time
+        jobs_per_host: The number of problems downloaded from the same host
+            at the same time
+
+    Returns:
+        bool: True if all downloads succeeded
+    """
+    if jobs < 1:
+        raise VerifierError("--jobs must be greater than 0.")
+    if jobs_per_host < 1:
+        raise VerifierError("jobs_per_host must be greater than 0.")
     try:
         ulimit_stack()
     except Exception:  # noqa: BLE001
         logger.warning("failed to increase the stack size[ulimit]")
-    for url in parse_urls(url_or_file):
-        if not oj.download(url, group_log=group_log):
-            result = False
+
+    urls = interleave_hosts(parse_urls(url_or_file))
+    oj.generate_library_checker_problems(urls)
+    if jobs == 1 or len(urls) <= 1:
+        result = True
+        for url in urls:
+            if not oj.download(url, group_log=group_log):
+                result = False
+    else:
+        result = _download_parallel(
+            urls, group_log=group_log, jobs=jobs, jobs_per_host=jobs_per_host
+        )
 
     if check and not result:
         raise VerifierError("Failed to download")
@@ -70,6 +152,7 @@ class Download(OptionalVerifyFilesJsonArguments, VerboseArguments):
         description="Download problems",
     )
     urls: list[str] = Field(default_factory=list)
+    jobs: int = 1
 
     @classmethod
     def add_parser(cls, parser: ArgumentParser):
@@ -79,6 +162,13 @@ class Download(OptionalVerifyFilesJsonArguments, VerboseArguments):
             nargs="*",
             help="A list of problem URL",
         )
+        parser.add_argument(
+            "--jobs",
+            "-j",
+            type=int,
+            default=1,
+            help="The number of problems downloaded at the same time",
+        )
 
     def _run(self) -> bool:
         logger.debug("arguments:%s", self)
@@ -95,4 +185,4 @@ class Download(OptionalVerifyFilesJsonArguments, VerboseArguments):
                 ).files.values()
             )
 
-        return download_files(files + self.urls, group_log=True)
+        return download_files(files + self.urls, group_log=True, jobs=self.jobs)
@@ -1,4 +1,6 @@
 import datetime
+import functools
+import os
 import pathlib
 from collections.abc import Iterable
 from typing import TYPE_CHECKING
@@ -9,15 +11,89 @@ if TYPE_CHECKING:
     from _typeshed import StrPath
 
 
-def get_commit_time(files: Iterable[pathlib.Path]) -> datetime.datetime:
-    code = ["git", "log", "-1", "--date=iso", "--pretty=%ad", "--", *map(str, files)]
-    stdout = exec_command(code, text=True, capture_output=True).stdout
-    timestamp = stdout.strip()
-    if not timestamp:
-        return datetime.datetime.min.replace(tzinfo=datetime.timezone.utc)
+_MIN_COMMIT_TIME = datetime.datetime.min.replace(tzinfo=datetime.timezone.utc)
+_COMMIT_MARKER = "\x01"
+
+
+def _parse_commit_time(timestamp: str) -> datetime.datetime:
     return datetime.datetime.strptime(timestamp, "%Y-%m-%d %H:%M:%S %z")
 
 
+def _absolute(path: "StrPath") -> str:
+    # Normalize lexically. Path.resolve() would follow symlinks tracked by git.
+    return os.path.normcase(os.path.abspath(path))  # noqa: PTH100
+
+
+class CommitTimeIndex:
+    """Latest commit time of every file in the repository.
+
+    The index is built from a single ``git log`` pass,
+    so each lookup does not spawn a ``git`` process.
+    """
+
+    _order: dict[str, int]
+    _times: list[datetime.datetime]
+
+    def __init__(self, root: "StrPath", log: str) -> None:
+        """Build the index.
+
+        Args:
+            root: The root directory of the repository
+            log: The output of ``git log`` run by ``build``
+        """
+        self._order = {}
+        self._times = []
+        root = pathlib.Path(root)
+        for token in log.split("\0"):
+            name = token
+            if token.startswith(_COMMIT_MARKER):
+                timestamp, _, name = token[len(_COMMIT_MARKER) :].partition("\n")
+                self._times.append(_parse_commit_time(timestamp.strip()))
+            if not name or not self._times:
+                continue
+            self._order.setdefault(_absolute(root / name), len(self._times) - 1)
+
+    @classmethod
+    def build(cls) -> "CommitTimeIndex":
+        stdout = exec_command(
+            [
+                "git",
+                "log",
+                "--date=iso",
+                f"--pretty=format:{_COMMIT_MARKER}%ad",
+                "--name-only",
+                "--no-renames",
+                "-z",
+            ],
+            text=True,
+            capture_output=True,
+        ).stdout
+        return cls(get_root_directory() if stdout else ".", stdout)
+
+    def get_commit_time(self, files: Iterable["StrPath"]) -> datetime.datetime:
+        """Get the time of the latest commit which changed any of the files.
+
+        Equivalent to ``git log -1 --pretty=%ad -- <files>``.
+        """
+        orders = [
+            order
+            for order in (self._order.get(_absolute(f)) for f in files)
+            if order is not None
+        ]
+        if not orders:
+            return _MIN_COMMIT_TIME
+        return self._times[min(orders)]
+
+
+@functools.cache
+def get_commit_time_index() -> CommitTimeIndex:
+    return CommitTimeIndex.build()
+
+
+def get_commit_time(files: Iterable[pathlib.Path]) -> datetime.datetime:
+    return get_commit_time_index().get_commit_time(files)
+
+
 def ls_files(*args: "StrPath") -> set[pathlib.Path]:
     stdout = exec_command(
         ["git", "ls-files", "-z", *[str(p) for p in (args or [])]],
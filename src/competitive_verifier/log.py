@@ -1,12 +1,18 @@
+import contextvars
 import sys
+import threading
+from collections.abc import Callable
 from contextlib import contextmanager
 from logging import (
     NOTSET,
     WARNING,
+    Filter,
     Handler,
+    LogRecord,
     basicConfig,
+    getLogger,
 )
-from typing import TextIO
+from typing import ParamSpec, TextIO, TypeVar
 
 import colorlog
 from colorama import Fore, Style
@@ -59,3 +65,90 @@ def group(title: str, *, stream: TextIO | None = None):
             yield
         finally:
             _console_group("Finish group", title=title, file=stream)
+
+
+_P = ParamSpec("_P")
+_T = TypeVar("_T")
+
+_deferred_buffer: contextvars.ContextVar[list[LogRecord] | None] = (
+    contextvars.ContextVar("_deferred_buffer", default=None)
+)
+"""The records held back by the innermost :func:`deferred_group`"""
+
+
+class _DeferredRecords(Filter):
+    """Hold back the records logged inside :func:`deferred_group`."""
+
+    def __init__(self) -> None:
+        super().__init__()
+        self.append_lock = threading.Lock()
+        self.flush_lock = threading.Lock()
+
+    def filter(self, record: LogRecord) -> bool:
+        buffer = _deferred_buffer.get()
+        if buffer is None:
+            return True
+        with self.append_lock:
+            # the same record is passed to the filter of every handler
+            if not buffer or buffer[-1] is not record:
+                buffer.append(record)
+        return False
+
+
+_deferred_records = _DeferredRecords()
+
+
+def in_current_context(func: Callable[_P, _T]) -> Callable[_P, _T]:
+    """Wrap ``func`` to run in the context of the caller.
+
+    Pass the wrapped function to executors so that the records logged
+    in the worker threads belong to the :func:`deferred_group` of the caller.
+    """
+    context = contextvars.copy_context()
+
+    def run(*args: _P.args, **kwargs: _P.kwargs) -> _T:
+        # a context can't be entered by several threads at the same time
+        return context.copy().run(func, *args, **kwargs)
+
+    return run
+
+
+@contextmanager
+def enable_deferred_groups():
+    """Let :func:`deferred_group` hold back the records in the block.
+
+    The filter is attached to the handlers of the root logger
+    only while the block runs, so the other records are not filtered.
+    """
+    handlers = [h for h in getLogger().handlers if _deferred_records not in h.filters]
+    for handler in handlers:
+        handler.addFilter(_deferred_records)
+    try:
+        yield
+    finally:
+        for handler in handlers:
+            handler.removeFilter(_deferred_records)
+
+
+@contextmanager
+def deferred_group(title: str, *, stream: TextIO | None = None):
+    """Buffer the log records of the current context and flush them as a group.
+
+    The records are written at once when the block exits,
+    so that groups running in parallel threads are not interleaved.
+    The records are held back only inside :func:`enable_deferred_groups`.
+    Worker threads started in the block join the group
+    only if they run functions wrapped by :func:`in_current_context`.
+    The output of subprocesses is not captured.
+    """
+    root = getLogger()
+    records: list[LogRecord] = []
+    token = _deferred_buffer.set(records)
+    try:
+        yield
+    finally:
+        # the records are not held back by this group anymore
+        _deferred_buffer.reset(token)
+        with _deferred_records.flush_lock, group(title, stream=stream):
+            for record in records:
+                root.callHandlers(record)
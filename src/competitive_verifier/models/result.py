@@ -42,6 +42,13 @@ class TestcaseResult(BaseModel):
     """The size of memory used in megabytes.
     """
 
+    cpu_time: float | None = Field(
+        default=None,
+        description="Number of seconds of the user and system CPU time for the test case.",
+    )
+    """Number of seconds of the user and system CPU time for the test case.
+    """
+
 
 class VerificationResult(BaseModel):
     verification_name: str | None = Field(
@@ -76,6 +83,13 @@ class VerificationResult(BaseModel):
     """Maximum size of memory used in megabytes.
     """
 
+    cpu_time: float | None = Field(
+        default=None,
+        description="Total number of seconds of the CPU time for all test cases.",
+    )
+    """Total number of seconds of the CPU time for all test cases.
+    """
+
     testcases: list[TestcaseResult] | None = Field(
         default=None,
         description="The results of each test case.",
@@ -90,6 +104,13 @@ class VerificationResult(BaseModel):
     """The time at which the last validation was performed.
     """
 
+    digest: str | None = Field(
+        default=None,
+        description="The digest of the contents of the dependencies and the verification.",
+    )
+    """The digest of the contents of the dependencies and the verification.
+    """
+
     @field_validator("status", mode="before")
     @classmethod
     def verification_list(cls, v: Any) -> Any:  # noqa: ANN401
@@ -16,6 +16,9 @@ class VerifcationTimeoutError(Exception):
 class VerificationParams(Protocol):
     default_tle: float | None
     default_mle: float | None
+    testcase_jobs: int
+    pin_cpu: bool
+    tle_by_cpu_time: bool
 
 
 class BaseVerification(BaseModel, ABC):
@@ -173,6 +176,9 @@ class ProblemVerification(BaseVerification):
             error=self.error,
             mle=self.mle or params.default_mle,
             deadline=deadline,
+            jobs=params.testcase_jobs,
+            pin_cpu=params.pin_cpu,
+            tle_by_cpu_time=params.tle_by_cpu_time,
         )
         result.verification_name = self.name
         return result
@@ -1,11 +1,14 @@
 from .tools.func import get_directory
+from .tools.oj_download import generate_library_checker_problems
 from .tools.oj_download import run_wrapper as download
-from .tools.oj_test import check_gnu_time
+from .tools.oj_test import can_measure_memory, check_gnu_time
 from .tools.oj_test import run_wrapper as test
 
 __all__ = [
+    "can_measure_memory",
     "check_gnu_time",
     "download",
+    "generate_library_checker_problems",
     "get_directory",
     "test",
 ]
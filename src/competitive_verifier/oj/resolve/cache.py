@@ -0,0 +1,146 @@
+import hashlib
+import importlib.metadata
+import pathlib
+import stat
+from collections.abc import Callable
+from logging import getLogger
+
+from pydantic import BaseModel, ValidationError
+
+from competitive_verifier import config
+from competitive_verifier.models import ForcePosixPath
+from competitive_verifier.util import hash_file
+
+logger = getLogger(__name__)
+
+
+def get_resolve_cache_dir() -> pathlib.Path:
+    return config.get_cache_dir() / "resolved"
+
+
+class ResolvedFile(BaseModel):
+    """The result of the analysis of a source file."""
+
+    dependencies: dict[ForcePosixPath, str]
+    """The dependencies of the file and their hashes"""
+    attributes: dict[str, str]
+    """The special comments of the file"""
+    bundled: bool = False
+    """Whether the bundled code is cached"""
+
+    def is_fresh(self, hasher: Callable[[pathlib.Path], str | None]) -> bool:
+        """Whether all dependencies are unchanged since the analysis.
+
+        Args:
+            hasher: The function which hashes a file, or returns None if it is not a file
+        """
+        return all(hasher(p) == digest for p, digest in self.dependencies.items())
+
+
+class ResolveCache:
+    """Cache of the results of ``oj-resolve``.
+
+    Each entry is keyed by the path and the contents of the file,
+    the language config and the resolve options.
+    The entry is used only if the contents of all files
+    which the file depends on are unchanged.
+    """
+
+    directory: pathlib.Path
+
+    def __init__(self, directory: pathlib.Path | None = None) -> None:
+        self.directory = directory or get_resolve_cache_dir()
+        self._file_hashes: dict[pathlib.Path, tuple[int, int, str]] = {}
+
+    def _hash_file(self, path: pathlib.Path) -> str | None:
+        """Hash the file once per run unless its size or modification time changes.
+
+        Shared headers are dependencies of many entries.
+        """
+        try:
+            st = path.stat()
+        except OSError:
+            return None
+        if not stat.S_ISREG(st.st_mode):
+            return None
+        cached = self._file_hashes.get(path)
+        if cached is not None and cached[:2] == (st.st_mtime_ns, st.st_size):
+            return cached[2]
+        digest = hash_file(path)
+        self._file_hashes[path] = (st.st_mtime_ns, st.st_size, digest)
+        return digest
+
+    def get_key(
+        self,
+        path: pathlib.Path,
+        *,
+        language_config: str,
+        basedir: pathlib.Path,
+        bundle: bool,
+    ) -> str:
+        h = hashlib.sha256()
+        for s in (
+            importlib.metadata.version("competitive-verifier"),
+            language_config,
+            basedir.as_posix(),
+            path.as_posix(),
+            self._hash_file(path) or "",
+            str(bundle),
+        ):
+            h.update(s.encode())
+            h.update(b"\0")
+        return h.hexdigest()
+
+    def _entry_path(self, key: str) -> pathlib.Path:
+        return self.directory / key[:2] / f"{key}.json"
+
+    def _bundled_path(self, key: str) -> pathlib.Path:
+        return self.directory / key[:2] / f"{key}.bundled"
+
+    def load(self, key: str) -> tuple[ResolvedFile, bytes | None] | None:
+        """Load the cached analysis.
+
+        Returns:
+            The analysis and the bundled code, or None if the cache is not available.
+        """
+        try:
+            resolved = ResolvedFile.model_validate_json(
+                self._entry_path(key).read_bytes()
+            )
+            bundled = self._bundled_path(key).read_bytes() if resolved.bundled else None
+        except FileNotFoundError:
+            return None
+        except (OSError, ValidationError):
+            logger.debug("resolve cache is broken: %s", key, exc_info=True)
+            return None
+
+        if not resolved.is_fresh(self._hash_file):
+            logger.debug("resolve cache is stale: %s", key)
+            return None
+        return resolved, bundled
+
+    def store(
+        self,
+        key: str,
+        *,
+        dependencies: set[pathlib.Path],
+        attributes: dict[str, str],
+        bundled: bytes | None,
+    ) -> None:
+        digests = {p: self._hash_file(p) for p in sorted(dependencies)}
+        if any(digest is None for digest in digests.values()):
+            return
+        resolved = ResolvedFile(
+            dependencies={p: digest for p, digest in digests.items() if digest},
+            attributes=attributes,
+            bundled=bundled is not None,
+        )
+        entry = self._entry_path(key)
+        try:
+            entry.parent.mkdir(parents=True, exist_ok=True)
+            if bundled is not None:
+                self._bundled_path(key).write_bytes(bundled)
+            # The json is written at last because it marks the entry completed
+            entry.write_text(resolved.model_dump_json(), encoding="utf-8")
+        except OSError:
+            logger.warning("Failed to store the resolve cache: %s", key)
@@ -1,3 +1,4 @@
+import concurrent.futures
 import fnmatch
 import hashlib
 import os
@@ -24,8 +25,9 @@ from competitive_verifier.models import (
     VerificationFile,
     VerificationInput,
 )
+from competitive_verifier.oj.resolve.cache import ResolveCache
 from competitive_verifier.oj.verify.list import OjVerifyConfig
-from competitive_verifier.oj.verify.models import LanguageEnvironment
+from competitive_verifier.oj.verify.models import Language, LanguageEnvironment
 
 logger = getLogger(__name__)
 
@@ -52,6 +54,8 @@ class OjResolver:
     include: list[str]
     exclude: list[str]
     config: OjVerifyConfig
+    jobs: int
+    cache: ResolveCache | None
     _match_exclude_cache: dict[pathlib.Path, bool]
 
     def __init__(
@@ -60,6 +64,8 @@ class OjResolver:
         include: list[str],
         exclude: list[str],
         config: OjVerifyConfig,
+        jobs: int = 1,
+        cache: ResolveCache | None = None,
     ) -> None:
         def _remove_slash(s: str):
             s = os.path.normpath(s)
@@ -70,6 +76,10 @@ class OjResolver:
         self.include = list(map(_remove_slash, include))
         self.exclude = list(map(_remove_slash, exclude))
         self.config = config
+        if jobs < 1:
+            raise ValueError("--jobs must be greater than 0.")
+        self.jobs = jobs
+        self.cache = cache
         self._match_exclude_cache = {}
 
     def _match_exclude2(self, paths: list[pathlib.Path]) -> bool:
@@ -175,11 +185,94 @@ class OjResolver:
                 )
                 yield ConstVerification(status=ResultStatus.SUCCESS)
 
+    @cached_property
+    def _config_json(self) -> str:
+        return self.config.model_dump_json()
+
+    def _analyze_file(
+        self,
+        path: pathlib.Path,
+        *,
+        language: Language,
+        bundle: bool,
+        basedir: pathlib.Path,
+    ) -> tuple[set[pathlib.Path], dict[str, str], AddtionalSource | None]:
+        key = None
+        if self.cache is not None:
+            key = self.cache.get_key(
+                path,
+                language_config=self._config_json,
+                basedir=basedir,
+                bundle=bundle,
+            )
+            cached = self.cache.load(key)
+            if cached is not None:
+                logger.debug("resolve cache hit: %s", path.as_posix())
+                resolved, bundled_code = cached
+                return (
+                    set(resolved.dependencies),
+                    resolved.attributes,
+                    (
+                        AddtionalSource(
+                            name="bundled",
+                            path=_write_bundled(bundled_code, path=path),
+                        )
+                        if bundled_code
+                        else None
+                    ),
+                )
+
+        deps = set(git.ls_files(*language.list_dependencies(path, basedir=basedir)))
+        attr = language.list_attributes(path, basedir=basedir)
+
+        bundled_code: bytes | None = None
+        bundled_source: AddtionalSource | None = None
+        if bundle:
+            try:
+                bundled_code = language.bundle(path, basedir=basedir) or b""
+                if bundled_code:
+                    dest_path = _write_bundled(bundled_code, path=path)
+                    bundled_source = AddtionalSource(name="bundled", path=dest_path)
+            except Exception:  # noqa: BLE001
+                dest_path = _write_bundled(traceback.format_exc().encode(), path=path)
+                # A bundle error is not cached so that it is retried next time.
+                return deps, attr, AddtionalSource(name="bundle error", path=dest_path)
+
+        if self.cache is not None and key is not None:
+            self.cache.store(
+                key, dependencies=deps, attributes=attr, bundled=bundled_code
+            )
+        return deps, attr, bundled_source
+
+    def _resolve_file(
+        self,
+        path: pathlib.Path,
+        *,
+        language: Language,
+        bundle: bool,
+        basedir: pathlib.Path,
+    ) -> VerificationFile:
+        deps, attr, bundled_source = self._analyze_file(
+            path, language=language, bundle=bundle, basedir=basedir
+        )
+        verifications = list(
+            chain.from_iterable(
+                self.env_to_verifications(vs, attr=attr, path=path, basedir=basedir)
+                for vs in language.list_environments(path, basedir=basedir)
+            )
+        )
+        return VerificationFile(
+            dependencies=deps,
+            verification=verifications,
+            document_attributes=attr,
+            additonal_sources=[bundled_source] if bundled_source else [],
+        )
+
     def resolve(self, *, bundle: bool) -> VerificationInput:
-        files: dict[pathlib.Path, VerificationFile] = {}
         basedir = pathlib.Path.cwd()
 
-        for path in git.ls_files(*self.include):
+        targets: list[tuple[pathlib.Path, Language]] = []
+        for path in sorted(git.ls_files(*self.include)):
             if self._match_exclude(path):
                 logger.debug("exclude=%s", path.as_posix())
                 continue
@@ -187,39 +280,34 @@ class OjResolver:
             language = self._lang_dict.get(path.suffix)
             if language is None:
                 continue
+            targets.append((path, language))
 
-            deps = set(git.ls_files(*language.list_dependencies(path, basedir=basedir)))
-            attr = language.list_attributes(path, basedir=basedir)
-
-            additonal_sources: list[AddtionalSource] = []
-            if bundle:
-                try:
-                    bundled_code = language.bundle(path, basedir=basedir)
-                    if bundled_code:
-                        dest_path = _write_bundled(bundled_code, path=path)
-                        additonal_sources.append(
-                            AddtionalSource(name="bundled", path=dest_path)
-                        )
-                except Exception:  # noqa: BLE001
-                    dest_path = _write_bundled(
-                        traceback.format_exc().encode(), path=path
-                    )
-                    additonal_sources.append(
-                        AddtionalSource(name="bundle error", path=dest_path)
-                    )
-
-            verifications = list(
-                chain.from_iterable(
-                    self.env_to_verifications(vs, attr=attr, path=path, basedir=basedir)
-                    for vs in language.list_environments(path, basedir=basedir)
+        if self.jobs <= 1:
+            files = {
+                path: self._resolve_file(
+                    path, language=language, bundle=bundle, basedir=basedir
                 )
-            )
-            files[path] = VerificationFile(
-                dependencies=deps,
-                verification=verifications,
-                document_attributes=attr,
-                additonal_sources=additonal_sources,
-            )
+                for path, language in targets
+            }
+            return VerificationInput(files=files)
+
+        # Each file is analyzed by external processes, so threads are enough.
+        # The results are assembled in the sorted order regardless of completion.
+        with concurrent.futures.ThreadPoolExecutor(max_workers=self.jobs) as executor:
+            futures = [
+                executor.submit(
+                    self._resolve_file,
+                    path,
+                    language=language,
+                    bundle=bundle,
+                    basedir=basedir,
+                )
+                for path, language in targets
+            ]
+            files = {
+                path: future.result()
+                for (path, _), future in zip(targets, futures, strict=True)
+            }
         return VerificationInput(files=files)
 
 
@@ -230,6 +318,8 @@ class OjResolve(IncludeExcludeArguments, VerboseArguments):
     )
     bundle: bool = True
     config: pathlib.Path | OjVerifyConfig | None = None
+    jobs: int = 1
+    resolve_cache: bool = False
 
     @classmethod
     def add_parser(cls, parser: ArgumentParser):
@@ -245,6 +335,18 @@ class OjResolve(IncludeExcludeArguments, VerboseArguments):
             help="config.toml",
             type=pathlib.Path,
         )
+        parser.add_argument(
+            "--jobs",
+            "-j",
+            type=int,
+            default=1,
+            help="The number of files resolved at the same time",
+        )
+        parser.add_argument(
+            "--resolve-cache",
+            action="store_true",
+            help="Reuse the results of the files whose dependencies are unchanged",
+        )
 
     def to_resolver(self) -> OjResolver:
         if self.config is None:
@@ -266,6 +368,8 @@ class OjResolve(IncludeExcludeArguments, VerboseArguments):
             include=self.include,
             exclude=self.exclude,
             config=config,
+            jobs=self.jobs,
+            cache=ResolveCache() if self.resolve_cache else None,
         )
 
     def _run(self) -> bool:
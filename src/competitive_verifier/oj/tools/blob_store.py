@@ -0,0 +1,202 @@
+import os
+import pathlib
+import re
+import shutil
+import stat
+import sys
+import tempfile
+import time
+from collections.abc import Callable
+from logging import getLogger
+from typing import Any
+
+from competitive_verifier import config
+from competitive_verifier.util import hash_file
+
+logger = getLogger(__name__)
+
+
+def get_blob_store_dir() -> pathlib.Path:
+    return config.get_cache_dir() / "blobs"
+
+
+BLOB_MODE = 0o444
+"""The blobs are read-only so that they are not modified through links"""
+
+DEFAULT_MAX_SIZE = 1 << 30
+"""The default total size in bytes of the blobs which are not linked from anywhere"""
+
+PRUNE_GRACE_SECONDS = 60 * 60
+"""The blobs changed recently are not pruned since they may be about to be linked"""
+
+
+def remove_read_only_file(path: pathlib.Path) -> None:
+    """Remove a blob or a link to it."""
+    # a read-only file cannot be removed on Windows
+    path.chmod(0o644)
+    path.unlink()
+
+
+def _remove_readonly(func: Callable[[str], Any], path: str, exc: BaseException) -> None:
+    if isinstance(exc, FileNotFoundError):
+        return
+    try:
+        # the links to the blobs are read-only and cannot be removed on Windows
+        os.chmod(path, stat.S_IWRITE)  # noqa: PTH101
+        func(path)
+    except OSError:
+        logger.debug("failed to remove: %s", path, exc_info=True)
+
+
+def remove_tree(path: pathlib.Path) -> None:
+    """Remove the directory which may contain the links to the blobs.
+
+    The errors are ignored like ``shutil.rmtree(path, ignore_errors=True)``.
+    """
+    if sys.version_info >= (3, 12):
+        shutil.rmtree(path, onexc=_remove_readonly)
+    else:
+        shutil.rmtree(
+            path,
+            onerror=lambda func, path, exc_info: _remove_readonly(
+                func, path, exc_info[1]
+            ),
+        )
+
+
+_DIGEST_RE = re.compile(r"[0-9a-f]{64}")
+
+
+class BlobStore:
+    """Content-addressed store of test case files.
+
+    The files in the test directories of problems are hard links to the blobs,
+    so the same contents are stored only once.
+    The blobs are read-only, and they are hashed again before they are reused
+    in case they are modified through links anyway.
+    """
+
+    directory: pathlib.Path
+    max_size: int
+
+    def __init__(
+        self,
+        directory: pathlib.Path | None = None,
+        *,
+        max_size: int = DEFAULT_MAX_SIZE,
+    ) -> None:
+        self.directory = directory or get_blob_store_dir()
+        self.max_size = max_size
+
+    def get_blob_path(self, digest: str) -> pathlib.Path:
+        return self.directory / digest[:2] / digest
+
+    def verify(self, digest: str) -> bool:
+        """Whether the blob exists and has the contents of the digest.
+
+        A modified blob is removed.
+        """
+        blob = self.get_blob_path(digest)
+        if not blob.exists():
+            return False
+        if hash_file(blob) == digest:
+            return True
+        logger.warning("the blob is modified: %s", blob)
+        remove_read_only_file(blob)
+        return False
+
+    def add(self, src: pathlib.Path, *, move: bool) -> str:
+        """Put the file into the store.
+
+        Args:
+            src: The file to be stored
+            move: If True, ``src`` is moved into the store.
+                Otherwise ``src`` is kept and hard-linked into the store,
+                or copied if the file system does not support hard links.
+                A linked blob is not made read-only since ``src`` may be rewritten,
+                but the contents are hashed again before the blob is reused.
+
+        Returns:
+            str: The digest of the file
+        """
+        digest = hash_file(src)
+        blob = self.get_blob_path(digest)
+        if self.verify(digest):
+            if move:
+                src.unlink()
+            return digest
+
+        blob.parent.mkdir(parents=True, exist_ok=True)
+        if move:
+            src.chmod(BLOB_MODE)
+            src.replace(blob)
+            return digest
+        # a partially written blob must not be visible
+        fd, name = tempfile.mkstemp(dir=blob.parent)
+        os.close(fd)
+        tmp = pathlib.Path(name)
+        try:
+            tmp.unlink()
+            try:
+                tmp.hardlink_to(src)
+            except OSError:
+                logger.debug("failed to link into the store: %s", src, exc_info=True)
+                shutil.copyfile(src, tmp)
+                tmp.chmod(BLOB_MODE)
+            tmp.replace(blob)
+        except BaseException:
+            tmp.unlink(missing_ok=True)
+            raise
+        return digest
+
+    def link(self, digest: str, dst: pathlib.Path) -> None:
+        """Link the blob from ``dst``.
+
+        The blob is copied if the file system does not support hard links.
+        """
+        blob = self.get_blob_path(digest)
+        # link to a temporary name at first since dst may exist
+        tmp = dst.with_name(f".{dst.name}.link")
+        tmp.unlink(missing_ok=True)
+        try:
+            tmp.hardlink_to(blob)
+        except OSError:
+            if not blob.exists():
+                raise
+            logger.debug("failed to link the blob: %s", dst, exc_info=True)
+            shutil.copyfile(blob, tmp)
+        tmp.replace(dst)
+
+    def prune(self) -> None:
+        """Remove the least recently used blobs which are not linked from anywhere.
+
+        The blobs are removed until their total size is at most ``max_size``.
+        The blobs linked from test directories are kept
+        since removing them does not free the disk space.
+        """
+        deadline = time.time() - PRUNE_GRACE_SECONDS
+        blobs: list[tuple[float, int, pathlib.Path]] = []
+        try:
+            for blob in self.directory.glob("*/*"):
+                if not _DIGEST_RE.fullmatch(blob.name):
+                    continue
+                try:
+                    st = blob.stat()
+                except OSError:
+                    continue
+                # the link count changes st_ctime on POSIX
+                last_used = max(st.st_mtime, st.st_ctime)
+                if st.st_nlink <= 1 and last_used < deadline:
+                    blobs.append((last_used, st.st_size, blob))
+        except OSError:
+            return
+        total = sum(size for _, size, _ in blobs)
+        for _, size, blob in sorted(blobs):
+            if total <= self.max_size:
+                break
+            logger.debug("remove the blob: %s", blob.name)
+            try:
+                remove_read_only_file(blob)
+            except OSError:
+                continue
+            total -= size
@@ -5,7 +5,13 @@ import urllib.parse
 
 from competitive_verifier import config
 
-from .service import LibraryCheckerProblem
+from .service import (
+    AOJArenaProblem,
+    AOJProblem,
+    LibraryCheckerProblem,
+    Problem,
+    YukicoderProblem,
+)
 
 checker_exe_name = "checker.exe" if sys.platform == "win32" else "checker"
 
@@ -14,10 +20,38 @@ def get_problem_cache_dir() -> pathlib.Path:
     return config.get_cache_dir() / "problems"
 
 
+def problem_from_url(url: str) -> Problem | None:
+    """Try getting problem.
+
+    Examples:
+        url: https://atcoder.jp/contests/abc077/tasks/arc084_b
+    """
+    for cls in (LibraryCheckerProblem, YukicoderProblem, AOJProblem, AOJArenaProblem):
+        problem = cls.from_url(url)
+        if problem is not None:
+            return problem
+    return None
+
+
+def get_canonical_url(url: str) -> str:
+    """Normalize the URL of a problem.
+
+    The URLs of the same problem, e.g. ``http://old.yosupo.jp/problem/aplusb``
+    and ``https://judge.yosupo.jp/problem/aplusb``, are normalized to the same URL.
+    Unsupported URLs are returned as they are.
+    """
+    problem = problem_from_url(url)
+    if problem is None:
+        return url
+    return problem.get_url()
+
+
 def get_directory(url: str) -> pathlib.Path:
     return (
         get_problem_cache_dir()
-        / hashlib.md5(url.encode(), usedforsecurity=False).hexdigest()
+        / hashlib.md5(
+            get_canonical_url(url).encode(), usedforsecurity=False
+        ).hexdigest()
     )
 
 
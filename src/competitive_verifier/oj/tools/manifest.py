@@ -0,0 +1,114 @@
+import pathlib
+from logging import getLogger
+
+from pydantic import BaseModel, ValidationError
+
+from competitive_verifier.util import hash_file
+
+from .blob_store import BlobStore, remove_read_only_file
+
+logger = getLogger(__name__)
+
+MANIFEST_FILE_NAME = "manifest.json"
+
+
+class ManifestFile(BaseModel):
+    size: int
+    """The size of the file in bytes"""
+    digest: str
+    """The SHA-256 hex digest of the file contents"""
+    mtime_ns: int | None = None
+    """The modification time of the file in the test directory when it was checked"""
+
+
+class ProblemManifest(BaseModel):
+    """The record of the test cases downloaded into a problem directory."""
+
+    url: str
+    """The URL of the problem"""
+    revision: str | None = None
+    """The revision of the source of the test cases if it is known"""
+    files: dict[str, ManifestFile]
+    """The files in the test directory by their names"""
+
+    @classmethod
+    def load(cls, directory: pathlib.Path) -> "ProblemManifest | None":
+        path = directory / MANIFEST_FILE_NAME
+        try:
+            return cls.model_validate_json(path.read_bytes())
+        except FileNotFoundError:
+            return None
+        except (OSError, ValidationError):
+            logger.warning("the manifest is broken: %s", path)
+            return None
+
+    def save(self, directory: pathlib.Path) -> None:
+        path = directory / MANIFEST_FILE_NAME
+        tmp = path.with_name(f".{path.name}.tmp")
+        tmp.write_text(self.model_dump_json(indent=2), encoding="utf-8")
+        tmp.replace(path)
+
+    def find_broken_files(self, test_directory: pathlib.Path) -> list[str]:
+        """List the files which are missing or have wrong contents.
+
+        The contents are hashed only if the size or the modification time
+        differs from the last check, and ``mtime_ns`` of the intact files is updated.
+        """
+        broken: list[str] = []
+        for name, file in self.files.items():
+            path = test_directory / name
+            try:
+                st = path.stat()
+            except OSError:
+                broken.append(name)
+                continue
+            if st.st_size != file.size:
+                broken.append(name)
+            elif st.st_mtime_ns != file.mtime_ns:
+                # the file may be modified in place with the same size
+                if hash_file(path) == file.digest:
+                    file.mtime_ns = st.st_mtime_ns
+                else:
+                    broken.append(name)
+        return broken
+
+    def repair(self, directory: pathlib.Path, *, store: BlobStore) -> bool:
+        """Restore the missing or broken test cases of the problem from the blob store.
+
+        The files which are not in the manifest are removed from the test directory.
+        The intact files are kept as they are,
+        so only the files whose blobs are missing need to be downloaded again.
+
+        Args:
+            directory: The problem directory which has the manifest
+            store: The blob store
+
+        Returns:
+            bool: True if all files are in the test directory
+        """
+        test_directory = directory / "test"
+        hints = {name: file.mtime_ns for name, file in self.files.items()}
+        broken = self.find_broken_files(test_directory)
+        test_directory.mkdir(parents=True, exist_ok=True)
+        restored = True
+        for name in broken:
+            file = self.files[name]
+            path = test_directory / name
+            try:
+                if not store.verify(file.digest):
+                    logger.debug("the blob is missing: %s", path)
+                    restored = False
+                    continue
+                store.link(file.digest, path)
+                file.mtime_ns = path.stat().st_mtime_ns
+            except OSError:
+                logger.debug("failed to link: %s", path, exc_info=True)
+                restored = False
+                continue
+            logger.debug("linked from the blob store: %s", path)
+        for path in test_directory.iterdir():
+            if path.name not in self.files and not path.is_dir():
+                remove_read_only_file(path)
+        if hints != {name: file.mtime_ns for name, file in self.files.items()}:
+            self.save(directory)
+        return restored
@@ -0,0 +1,134 @@
+"""This module provides the comparators accelerated by NumPy.
+
+NumPy is optional (``pip install competitive-verifier[numpy]``).
+Use the comparators only if ``HAS_NUMPY`` is True.
+"""
+
+import importlib.util
+import re
+from collections.abc import Iterator
+from logging import getLogger
+
+from .output_comparators import Buffer, OutputComparator
+
+HAS_NUMPY = importlib.util.find_spec("numpy") is not None
+
+logger = getLogger(__name__)
+
+# words and line separators. "\r" of "\r\n" is whitespace
+_TOKEN_RE = re.compile(rb"\S+|\n")
+_CHUNK_SIZE = 1 << 20
+"""The outputs are tokenized by chunks of about this bytes to bound the memory"""
+_MAX_WORD_LENGTH = 64
+"""The arrays of long words are too large. Such words are compared by fallback."""
+_LF = ord("\n")
+_CR = ord("\r")
+
+
+def _strip_trailing_newlines(buf: Buffer) -> int:
+    r"""Return the end of ``buf`` without the trailing ``"\n"`` and ``"\r\n"``."""
+    end = len(buf)
+    while end > 0 and buf[end - 1] == _LF:
+        end -= 1
+        if end > 0 and buf[end - 1] == _CR:
+            end -= 1
+    return end
+
+
+def _iter_token_chunks(buf: Buffer) -> Iterator[list[bytes]]:
+    """Tokenize ``buf`` by chunks which end at line separators."""
+    end = _strip_trailing_newlines(buf)
+    pos = 0
+    while pos < end:
+        stop = buf.find(b"\n", min(pos + _CHUNK_SIZE, end), end)
+        stop = end if stop < 0 else stop + 1
+        if tokens := _TOKEN_RE.findall(buf, pos, stop):
+            yield tokens
+        pos = stop
+
+
+class NumpyFloatingPointComparator(OutputComparator):
+    """Compare the outputs of floating point numbers in bulk.
+
+    The result is the same as
+    ``CRLFInsensitiveComparator(SplitLinesComparator(SplitComparator(FloatingPointNumberComparator(...))))``.
+    All words are parsed as arrays at once and compared in a vectorized way.
+    If some words are not numbers, ``fallback`` compares the outputs word by word.
+    """
+
+    def __init__(
+        self,
+        *,
+        rel_tol: float,
+        abs_tol: float,
+        fallback: OutputComparator,
+    ):
+        if not HAS_NUMPY:
+            raise RuntimeError("NumPy is not installed")
+        self.rel_tol = rel_tol
+        self.abs_tol = abs_tol
+        self.fallback = fallback
+
+    def __call__(self, actual: Buffer, expected: Buffer) -> bool:
+        if not HAS_NUMPY:
+            return self.fallback(actual, expected)
+        chunks_x = _iter_token_chunks(actual)
+        chunks_y = _iter_token_chunks(expected)
+        list_x: list[bytes] = []
+        list_y: list[bytes] = []
+        while True:
+            if not list_x:
+                list_x = next(chunks_x, list[bytes]())
+            if not list_y:
+                list_y = next(chunks_y, list[bytes]())
+            if not list_x or not list_y:
+                return not list_x and not list_y
+            # the chunks of two outputs are not aligned
+            n = min(len(list_x), len(list_y))
+            result = self._compare_tokens(list_x[:n], list_y[:n])
+            if result is None:
+                return self.fallback(actual, expected)
+            if not result:
+                return False
+            list_x = list_x[n:]
+            list_y = list_y[n:]
+
+    def _compare_tokens(self, list_x: list[bytes], list_y: list[bytes]) -> bool | None:
+        """Compare the same number of tokens.
+
+        Returns:
+            ``None`` if the tokens can't be compared as arrays of numbers.
+        """
+        import numpy as np  # noqa: PLC0415  # pyright: ignore[reportMissingImports]
+
+        if max(map(len, list_x), default=0) > _MAX_WORD_LENGTH or (
+            max(map(len, list_y), default=0) > _MAX_WORD_LENGTH
+        ):
+            return None
+
+        tokens_x = np.array(list_x, dtype=np.bytes_)
+        tokens_y = np.array(list_y, dtype=np.bytes_)
+        # the lines have the same numbers of words
+        # if and only if the separators are at the same positions
+        newlines = tokens_x == b"\n"
+        if not np.array_equal(newlines, tokens_y == b"\n"):
+            return False
+
+        words_x = tokens_x[~newlines]
+        words_y = tokens_y[~newlines]
+        try:
+            x = words_x.astype(np.float64)
+            y = words_y.astype(np.float64)
+        except ValueError:
+            logger.debug("the outputs contain words which are not numbers")
+            return None
+
+        # the same as math.isclose
+        with np.errstate(over="ignore", invalid="ignore"):
+            tolerance = np.maximum(
+                self.rel_tol * np.maximum(np.abs(x), np.abs(y)), self.abs_tol
+            )
+            close = (x == y) | (
+                np.isfinite(x) & np.isfinite(y) & (np.abs(x - y) <= tolerance)
+            )
+        return bool(close.all())
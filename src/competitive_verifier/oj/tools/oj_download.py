@@ -1,7 +1,8 @@
 import os
 import pathlib
 import shutil
-from collections.abc import Iterator
+import threading
+from collections.abc import Iterable
 from contextlib import nullcontext
 from itertools import chain
 from logging import getLogger
@@ -10,18 +11,18 @@ import requests.exceptions
 
 from competitive_verifier import log
 
+from .blob_store import BlobStore, remove_tree
 from .func import (
     get_checker_path,
     get_directory,
     is_yukicoder,
+    problem_from_url,
 )
+from .manifest import MANIFEST_FILE_NAME, ManifestFile, ProblemManifest
 from .service import (
-    AOJArenaProblem,
-    AOJProblem,
     LibraryCheckerProblem,
     NotLoggedInError,
     Problem,
-    TestCase,
     YukicoderProblem,
 )
 
@@ -32,18 +33,20 @@ def _run_library_checker(
     *,
     problem: LibraryCheckerProblem,
     directory: pathlib.Path,
+    store: BlobStore,
     dry_run: bool = False,
-) -> bool:
+) -> dict[str, ManifestFile] | None:
     problem.generate_test_cases_in_cloned_repository()
     path = problem.get_problem_directory_path()
+    files: dict[str, ManifestFile] = {}
     for file in chain(path.glob("in/*.in"), path.glob("out/*.out")):
-        dst = directory / "test" / file.name
-        if dst.exists():
-            logger.error("Failed to download since file already exists: %s", str(dst))
-            return False
-        if not dry_run:
-            dst.parent.mkdir(parents=True, exist_ok=True)
-            shutil.move(file, dst)
+        # The generated files are kept in the cloned repository
+        # not to be generated again at the next update,
+        # and they share the disk space with the blobs by hard links
+        files[file.name] = ManifestFile(
+            size=file.stat().st_size,
+            digest=store.add(file, move=False),
+        )
 
     checker_path = get_checker_path(problem)
     if checker_path and checker_path.exists() and not dry_run:
@@ -52,108 +55,176 @@ def _run_library_checker(
         except Exception:
             logger.exception("Failed to copy checker")
             shutil.rmtree(directory)
-            return False
-    return True
+            return None
+    return files
 
 
-def _run_services(problem: Problem):
+def _run_services(
+    problem: Problem, *, directory: pathlib.Path
+) -> list[pathlib.Path] | None:
     headers: dict[str, str] | None = None
     if isinstance(problem, YukicoderProblem):
         yukicoder_token = os.environ.get("YUKICODER_TOKEN")
         if yukicoder_token:
             headers = {"Authorization": f"Bearer {yukicoder_token}"}
     try:
-        return problem.download_system_cases(headers=headers)
+        return problem.download_system_cases_to(directory, headers=headers)
     except requests.exceptions.RequestException:
         logger.exception("Failed to download samples from the server")
         return None
 
 
-# prepare files to write
-def _iterate_files_to_write(
-    sample: TestCase,
-    *,
-    directory: pathlib.Path,
-) -> Iterator[tuple[str, pathlib.Path, bytes]]:
-    for ext in ["in", "out"]:
-        data = getattr(sample, ext + "put_data")
-        if data is None:
-            continue
-        filename = pathlib.Path(sample.name).with_suffix(f".{ext}").name
-        path: pathlib.Path = directory / "test" / filename
-        yield ext, path, data
-
-
-def problem_from_url(url: str) -> Problem | None:
-    """Try getting problem.
-
-    Examples:
-        url: https://atcoder.jp/contests/abc077/tasks/arc084_b
-    """
-    for cls in (LibraryCheckerProblem, YukicoderProblem, AOJProblem, AOJArenaProblem):
-        problem = cls.from_url(url)
-        if problem is not None:
-            return problem
-    return None
-
-
 def run(
     *,
     url: str,
     directory: pathlib.Path,
     dry_run: bool = False,
+    store: BlobStore | None = None,
 ) -> bool:
     # prepare values
     problem = problem_from_url(url)
     if problem is None:
         logger.error('The URL "%s" is not supported', url)
         return False
+    if store is None:
+        store = BlobStore()
 
     if isinstance(problem, LibraryCheckerProblem):
-        return _run_library_checker(
+        files = _run_library_checker(
             problem=problem,
             directory=directory,
+            store=store,
+            dry_run=dry_run,
         )
+        revision = LibraryCheckerProblem.get_cloned_repository_revision()
+    else:
+        files = _download_services(problem, directory=directory, store=store)
+        revision = None
+    if not files:
+        return False
+    if dry_run:
+        return True
+
+    # The manifest is written before the test directory,
+    # so that the interrupted files are restored from the blob store.
+    manifest = ProblemManifest(url=url, revision=revision, files=files)
+    manifest.save(directory)
+    if not manifest.repair(directory, store=store):
+        logger.error("Failed to link the test cases: %s", directory / "test")
+        return False
+    store.prune()
+    return True
 
-    # get samples from the server
-    samples = _run_services(problem)
 
-    if not samples:
-        if samples is not None:
-            logger.error("Sample not found")
-        return False
+def _download_services(
+    problem: Problem,
+    *,
+    directory: pathlib.Path,
+    store: BlobStore,
+) -> dict[str, ManifestFile] | None:
+    # The samples are written into the staging directory as they arrive,
+    # and they are moved into the blob store after all of them are downloaded
+    staging_directory = directory / "test.partial"
+    remove_tree(staging_directory)
+    try:
+        # get samples from the server
+        written = _run_services(problem, directory=staging_directory)
+        if not written:
+            if written is not None:
+                logger.error("Sample not found")
+            return None
+        return {
+            file.name: ManifestFile(
+                size=file.stat().st_size,
+                digest=store.add(file, move=True),
+            )
+            for file in written
+        }
+    finally:
+        remove_tree(staging_directory)
 
-    # write samples to files
-    for _i, sample in enumerate(samples):
-        for _, path, data in _iterate_files_to_write(sample, directory=directory):
-            if not dry_run:
-                if path.exists():
-                    logger.error(
-                        "Failed to download since file already exists: %s", str(path)
-                    )
-                path.parent.mkdir(parents=True, exist_ok=True)
-                with path.open("wb") as fh:
-                    fh.write(data)
-                logger.debug("saved to: %s", path)
 
-    return True
+_directory_locks: dict[pathlib.Path, threading.Lock] = {}
+_directory_locks_guard = threading.Lock()
+
+
+def _directory_lock(directory: pathlib.Path) -> threading.Lock:
+    with _directory_locks_guard:
+        return _directory_locks.setdefault(directory, threading.Lock())
 
 
 def run_wrapper(url: str, *, group_log: bool = False) -> bool:
     directory = get_directory(url)
+    with _directory_lock(directory):
+        return _run_wrapper(url, directory=directory, group_log=group_log)
+
+
+def _is_downloaded(directory: pathlib.Path, *, store: BlobStore) -> bool:
+    """Whether the test cases are downloaded into the problem directory.
+
+    The files which are missing or broken are restored from the blob store,
+    so the caller must hold the lock of the directory.
+    """
     test_directory = directory / "test"
+    manifest = ProblemManifest.load(directory)
+    if manifest is None:
+        # downloaded by the older versions
+        return test_directory.exists() and any(test_directory.iterdir())
+    return manifest.repair(directory, store=store)
+
+
+def generate_library_checker_problems(urls: Iterable[str]) -> None:
+    """Generate the test cases of Library Checker problems at once.
+
+    The problems which are already downloaded are skipped.
+    If it fails, each problem is generated again when it is downloaded.
+    """
+    store = BlobStore()
+    problems: list[LibraryCheckerProblem] = []
+    for url in urls:
+        problem = LibraryCheckerProblem.from_url(url)
+        if problem is None:
+            continue
+        directory = get_directory(url)
+        # the check repairs the test directory, which may be being downloaded
+        with _directory_lock(directory):
+            if _is_downloaded(directory, store=store):
+                continue
+        problems.append(problem)
+    if not problems:
+        return
+    with log.group("generate: Library Checker"):
+        try:
+            LibraryCheckerProblem.generate_test_cases(problems)
+        except Exception:
+            logger.warning(
+                "Failed to generate the test cases of Library Checker at once",
+                exc_info=True,
+            )
+
+
+def _run_wrapper(url: str, *, directory: pathlib.Path, group_log: bool) -> bool:
+    test_directory = directory / "test"
+
+    store = BlobStore()
 
     logger.info("download[Start]: %s into %s", url, test_directory)
-    if not (test_directory).exists() or list((test_directory).iterdir()) == []:
+    if not _is_downloaded(directory, store=store):
         logger.info("download[Run]: %s", url)
 
         with log.group(f"download[Run]: {url}") if group_log else nullcontext():
             directory.mkdir(parents=True, exist_ok=True)
+            if ProblemManifest.load(directory) is None:
+                # remove the rest of the interrupted download or the older versions
+                remove_tree(test_directory)
+                (directory / MANIFEST_FILE_NAME).unlink(missing_ok=True)
+            # otherwise the intact files are kept and the others are linked again
 
             try:
                 run(
                     url=url,
                     directory=directory,
+                    store=store,
                 )
             except Exception as e:
                 if isinstance(e, NotLoggedInError) and is_yukicoder(url):
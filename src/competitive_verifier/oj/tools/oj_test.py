@@ -1,16 +1,25 @@
+import collections
+import concurrent.futures
+import contextlib
+import logging
+import mmap
+import os
 import pathlib
 import platform
+import queue
 import subprocess
 import tempfile
+import threading
 import time
-from collections.abc import Callable
+from collections.abc import Generator
 from logging import getLogger
 from subprocess import Popen
-from typing import Annotated, Any
+from typing import Annotated, Protocol
 
 from pydantic import BaseModel, Field
 from pydantic.functional_validators import BeforeValidator
 
+from competitive_verifier import log
 from competitive_verifier.models import (
     JudgeStatus,
     ResultStatus,
@@ -19,13 +28,21 @@ from competitive_verifier.models import (
     VerificationResult,
 )
 
-from . import output_comparators, pretty_printers, utils
+from . import numpy_comparators, output_comparators, pretty_printers, utils
 from .func import checker_exe_name, get_directory
+from .output_comparators import Buffer
 from .service import format_utils as fmtutils
 
 logger = getLogger(__name__)
 
 
+CPU_TIME_WALL_TIMEOUT_FACTOR = 2.0
+"""The wall-clock time limit relative to the TLE when TLE is judged by the CPU time"""
+
+PIPELINE_DEPTH_PER_JOB = 2
+"""The number of test cases executed ahead of judging for each job"""
+
+
 class OjTestArguments(BaseModel):
     """Parameters for oj-test command.
 
@@ -46,11 +63,39 @@ class OjTestArguments(BaseModel):
     silent: bool = False
     ignore_backup: bool = True
     deadline: float = float("inf")
+    jobs: int = 1
+    """The number of test cases executed at the same time.
+    """
+    pin_cpu: bool = False
+    """Pin each test case executor to a dedicated CPU.
+    """
+    tle_by_cpu_time: bool = False
+    """Judge TLE by the CPU time instead of the wall-clock time.
+
+    The wall-clock time is still limited to kill blocked commands.
+    """
+
+    def get_wall_timeout(self) -> float | None:
+        if self.tle is not None and self.tle_by_cpu_time:
+            return self.tle * CPU_TIME_WALL_TIMEOUT_FACTOR
+        return self.tle
+
+
+@contextlib.contextmanager
+def open_output(path: pathlib.Path) -> Generator[Buffer, None, None]:
+    """Map the output file into memory instead of reading it."""
+    with path.open("rb") as fh:
+        if os.fstat(fh.fileno()).st_size == 0:
+            # an empty file cannot be mapped
+            yield b""
+            return
+        with mmap.mmap(fh.fileno(), 0, access=mmap.ACCESS_READ) as mm:
+            yield mm
 
 
 def display_result(
     proc: Popen[bytes],
-    answer: bytes,
+    answer: Buffer,
     memory: float | None,
     test_input_path: pathlib.Path,
     test_output_path: pathlib.Path | None,
@@ -59,6 +104,8 @@ def display_result(
     does_print_input: bool,
     silent: bool,
     match_result: bool | None,
+    cpu_tle: bool = False,
+    timed_out: bool = False,
 ) -> JudgeStatus:
     """display_result prints the result of the test and its statistics.
 
@@ -71,17 +118,26 @@ def display_result(
         nonlocal is_input_printed
         if does_print_input and not is_input_printed:
             is_input_printed = True
-            with test_input_path.open("rb") as inf:
+            if logger.isEnabledFor(logging.INFO):
                 logger.info(
                     "input:\n%s",
-                    pretty_printers.make_pretty_large_file_content(
-                        inf.read(), limit=40, head=20, tail=10
+                    pretty_printers.make_pretty_file_content(
+                        test_input_path, limit=40, head=20, tail=10
                     ),
                 )
 
+    def print_output() -> None:
+        if logger.isEnabledFor(logging.INFO):
+            logger.info(
+                "output:\n%s",
+                pretty_printers.make_pretty_large_file_content(
+                    answer, limit=40, head=20, tail=10
+                ),
+            )
+
     # check TLE, RE or not
     status = JudgeStatus.AC
-    if proc.returncode is None:
+    if proc.returncode is None or timed_out or cpu_tle:
         logger.info("%s%s", utils.FAILURE, utils.red("TLE"))
         status = JudgeStatus.TLE
         if not silent:
@@ -107,31 +163,21 @@ def display_result(
         status = JudgeStatus.WA
         if not silent:
             print_input()
-            if test_output_path is not None:
-                with test_output_path.open("rb") as outf:
-                    expected = outf.read().decode()
-            else:
-                expected = ""
-            logger.info(
-                "output:\n%s",
-                pretty_printers.make_pretty_large_file_content(
-                    answer, limit=40, head=20, tail=10
-                ),
-            )
-            logger.info(
-                "expected:\n%s",
-                pretty_printers.make_pretty_large_file_content(
-                    expected.encode(), limit=40, head=20, tail=10
-                ),
-            )
+            print_output()
+            if logger.isEnabledFor(logging.INFO):
+                logger.info(
+                    "expected:\n%s",
+                    pretty_printers.make_pretty_file_content(
+                        test_output_path, limit=40, head=20, tail=10
+                    )
+                    if test_output_path is not None
+                    else pretty_printers.make_pretty_large_file_content(
+                        b"", limit=40, head=20, tail=10
+                    ),
+                )
     if match_result is None and not silent:
         print_input()
-        logger.info(
-            "output:\n%s",
-            pretty_printers.make_pretty_large_file_content(
-                answer, limit=40, head=20, tail=10
-            ),
-        )
+        print_output()
     if status == JudgeStatus.AC:
         logger.info("%s%s", utils.SUCCESS, utils.green("AC"))
 
@@ -148,6 +194,7 @@ class OjTestcaseResult(BaseModel):
     status: JudgeStatus
     elapsed: float
     memory: float | None = None
+    cpu_time: float | None = None
     exitcode: Annotated[
         int | None, BeforeValidator(lambda v: v if isinstance(v, int) else None)
     ]
@@ -197,111 +244,158 @@ def check_gnu_time(gnu_time: str | None = None) -> bool:
     return False
 
 
+def can_measure_memory(gnu_time: str | None = None) -> bool:
+    """Whether the memory usage of test cases is measured."""
+    return (gnu_time is None and utils.HAS_RUSAGE) or check_gnu_time(gnu_time)
+
+
 class SpecialJudge:
-    def __init__(self, judge_command: str, *, is_silent: bool):
-        self.judge_command = judge_command  # already quoted and joined command
+    def __init__(self, judge_command: list[str], *, is_silent: bool):
+        self.judge_command = judge_command
         self.is_silent = is_silent
 
     def run(
         self,
         *,
-        actual_output: bytes,
+        actual_output_path: pathlib.Path,
         input_path: pathlib.Path,
         expected_output_path: pathlib.Path | None,
     ) -> bool:
-        with tempfile.TemporaryDirectory() as tempdir:
-            actual_output_path = pathlib.Path(tempdir) / "actual.out"
-            with actual_output_path.open("wb") as fh:
-                fh.write(actual_output)
-
-            # if you use shlex.quote, it fails on Windows. why?
-            command = " ".join(
-                [
-                    self.judge_command,  # already quoted and joined command
-                    str(input_path.resolve()),
-                    str(actual_output_path.resolve()),
-                    str(
-                        expected_output_path.resolve()
-                        if expected_output_path is not None
-                        else ""
-                    ),
-                ]
+        """Run the checker with the files of the test case.
+
+        The actual output is passed as it is written by the tested command,
+        so it is never copied.
+        """
+        command = [
+            *self.judge_command,
+            str(input_path.resolve()),
+            str(actual_output_path.resolve()),
+        ]
+        if expected_output_path is not None:
+            command.append(str(expected_output_path.resolve()))
+
+        logger.debug("$ %s", command)
+        info, proc = utils.measure_command(command)
+        if logger.isEnabledFor(logging.DEBUG):
+            logger.debug(
+                "judge's output:\n%s",
+                pretty_printers.make_pretty_large_file_content(
+                    info.answer or b"", limit=40, head=20, tail=10
+                ),
             )
-
-            logger.debug("$ %s", command)
-            info, proc = utils.measure_command(command)
-        logger.debug(
-            "judge's output:\n%s",
-            pretty_printers.make_pretty_large_file_content(
-                info.answer or b"", limit=40, head=20, tail=10
-            ),
-        )
         return proc.returncode == 0
 
 
+class MatchFunction(Protocol):
+    def __call__(
+        self,
+        actual: Buffer,
+        expected: Buffer,
+        /,
+        *,
+        test_input_path: pathlib.Path,
+        test_output_path: pathlib.Path | None,
+        actual_output_path: pathlib.Path,
+    ) -> bool:
+        """Compare the actual output and the expected output of a test case.
+
+        The paths are used by the special judge.
+        """
+        ...
+
+
 def build_match_function(
     *,
     error: float | None,
-    judge_command: str | None,
+    judge_command: list[str] | None,
     silent: bool,
-    test_input_path: pathlib.Path,
-    test_output_path: pathlib.Path | None,
-) -> Callable[[bytes, bytes], bool]:
+) -> MatchFunction:
     """build_match_function builds the function to compare actual outputs and expected outputs.
 
+    The function is built once for a problem and shared by its test cases.
     This function doesn't any I/O.
     """
     if judge_command is not None:
         special_judge = SpecialJudge(judge_command=judge_command, is_silent=silent)
 
-        def run_judge_command(actual: bytes, _: bytes) -> bool:
-            # the second argument is ignored
+        def run_judge_command(
+            _actual: Buffer,
+            _expected: Buffer,
+            *,
+            test_input_path: pathlib.Path,
+            test_output_path: pathlib.Path | None,
+            actual_output_path: pathlib.Path,
+        ) -> bool:
+            # the checker reads the files by itself
             return special_judge.run(
-                actual_output=actual,
+                actual_output_path=actual_output_path,
                 input_path=test_input_path,
                 expected_output_path=test_output_path,
             )
 
         return run_judge_command
 
-    is_exact = False
     if error is None:
-        is_exact = True
-        file_comparator = output_comparators.CRLFInsensitiveComparator(
-            output_comparators.ExactComparator()
-        )
-    else:
-        word_comparator: output_comparators.OutputComparator = (
-            output_comparators.FloatingPointNumberComparator(
-                rel_tol=error, abs_tol=error
+        exact_comparator = output_comparators.ExactMatchComparator()
+
+        def compare_exactly(
+            actual: Buffer,
+            expected: Buffer,
+            *,
+            test_input_path: pathlib.Path,  # noqa: ARG001
+            test_output_path: pathlib.Path | None,  # noqa: ARG001
+            actual_output_path: pathlib.Path,  # noqa: ARG001
+        ) -> bool:
+            result = exact_comparator.compare(actual, expected)
+            if result.first_difference is not None:
+                logger.info(
+                    "the first difference: line %d, column %d",
+                    *result.first_difference,
+                )
+            if not result.matched and result.matched_ignoring_spaces:
+                logger.warning(
+                    "This was AC if spaces and newlines were ignored. Please use --ignore-spaces (-S) option or --ignore-spaces-and-newline (-N) option."
+                )
+            return result.matched
+
+        return compare_exactly
+
+    word_comparator: output_comparators.OutputComparator = (
+        output_comparators.FloatingPointNumberComparator(rel_tol=error, abs_tol=error)
+    )
+    file_comparator: output_comparators.OutputComparator = (
+        output_comparators.CRLFInsensitiveComparator(
+            output_comparators.SplitLinesComparator(
+                output_comparators.SplitComparator(word_comparator)
             )
         )
-        file_comparator = output_comparators.SplitLinesComparator(
-            output_comparators.SplitComparator(word_comparator)
+    )
+    if numpy_comparators.HAS_NUMPY:
+        file_comparator = numpy_comparators.NumpyFloatingPointComparator(
+            rel_tol=error, abs_tol=error, fallback=file_comparator
         )
-        file_comparator = output_comparators.CRLFInsensitiveComparator(file_comparator)
 
-    def compare_outputs(actual: bytes, expected: bytes) -> bool:
-        result = file_comparator(actual, expected)
-        if not result and is_exact:
-            non_stcict_comparator = output_comparators.CRLFInsensitiveComparator(
-                output_comparators.SplitComparator(output_comparators.ExactComparator())
-            )
-            if non_stcict_comparator(actual, expected):
-                logger.warning(
-                    "This was AC if spaces and newlines were ignored. Please use --ignore-spaces (-S) option or --ignore-spaces-and-newline (-N) option."
-                )
-        return result
+    def compare_outputs(
+        actual: Buffer,
+        expected: Buffer,
+        *,
+        test_input_path: pathlib.Path,  # noqa: ARG001
+        test_output_path: pathlib.Path | None,  # noqa: ARG001
+        actual_output_path: pathlib.Path,  # noqa: ARG001
+    ) -> bool:
+        return file_comparator(actual, expected)
 
     return compare_outputs
 
 
 def run_checking_output(
     *,
-    answer: bytes,
+    answer: Buffer,
+    test_input_path: pathlib.Path,
     test_output_path: pathlib.Path | None,
+    actual_output_path: pathlib.Path,
     is_special_judge: bool,
-    match_function: Callable[[bytes, bytes], bool],
+    match_function: MatchFunction,
 ) -> bool | None:
     """run_checking_output executes matching of the actual output and the expected output.
 
@@ -310,52 +404,108 @@ def run_checking_output(
     if test_output_path is None and not is_special_judge:
         return None
     if test_output_path is not None:
-        with test_output_path.open("rb") as outf:
-            expected = outf.read()
-    else:
-        # only if --judge option
-        expected = b""
-        logger.warning("expected output is not found")
-    return match_function(answer, expected)
+        with open_output(test_output_path) as expected:
+            return match_function(
+                answer,
+                expected,
+                test_input_path=test_input_path,
+                test_output_path=test_output_path,
+                actual_output_path=actual_output_path,
+            )
+    # only if --judge option
+    logger.warning("expected output is not found")
+    return match_function(
+        answer,
+        b"",
+        test_input_path=test_input_path,
+        test_output_path=test_output_path,
+        actual_output_path=actual_output_path,
+    )
 
 
-def test_single_case(
-    test_name: str,
+def execute_single_case(
     test_input_path: pathlib.Path,
-    test_output_path: pathlib.Path | None,
     *,
     args: OjTestArguments,
-) -> dict[str, Any]:
-    logger.info("%s", test_name)
+    output_path: pathlib.Path,
+) -> tuple[utils.OjExecInfo, Popen[bytes]]:
+    """execute_single_case runs the binary with the test case.
 
-    # run the binary
-    with test_input_path.open("rb") as inf:
-        info, proc = utils.measure_command(
+    The output is written to ``output_path`` instead of being kept in memory.
+    This function doesn't print any logs of the test case.
+    """
+    if time.perf_counter() > args.deadline:
+        raise VerifcationTimeoutError
+    with (
+        _cpu_pool.pin()
+        if args.pin_cpu and _can_pin_cpu()
+        else contextlib.nullcontext(),
+        test_input_path.open("rb") as inf,
+        output_path.open("wb") as outf,
+    ):
+        return utils.measure_command(
             args.command,
             env=args.env,
             stdin=inf,
-            timeout=args.tle,
+            timeout=args.get_wall_timeout(),
             gnu_time=args.gnu_time,
+            stdout=outf,
         )
-        answer = info.answer or b""
-        elapsed: float = info.elapsed
-        memory: float | None = info.memory
 
+
+def judge_single_case(
+    test_name: str,
+    test_input_path: pathlib.Path,
+    test_output_path: pathlib.Path | None,
+    *,
+    info: utils.OjExecInfo,
+    proc: Popen[bytes],
+    args: OjTestArguments,
+    output_path: pathlib.Path,
+    match_function: MatchFunction,
+) -> OjTestcaseResult:
+    with open_output(output_path) as answer:
+        return _judge_output(
+            test_name,
+            test_input_path,
+            test_output_path,
+            answer=answer,
+            info=info,
+            proc=proc,
+            args=args,
+            output_path=output_path,
+            match_function=match_function,
+        )
+
+
+def _judge_output(
+    test_name: str,
+    test_input_path: pathlib.Path,
+    test_output_path: pathlib.Path | None,
+    *,
+    answer: Buffer,
+    info: utils.OjExecInfo,
+    proc: Popen[bytes],
+    args: OjTestArguments,
+    output_path: pathlib.Path,
+    match_function: MatchFunction,
+) -> OjTestcaseResult:
+    elapsed: float = info.elapsed
+    memory: float | None = info.memory
+    cpu_time: float | None = info.cpu_time
+
+    if cpu_time is not None:
+        logger.info("cpu time: %f sec", cpu_time)
     if memory:
         logger.info("time: %f sec, memory: %f MB", elapsed, memory)
     else:
         logger.info("time: %f sec", elapsed)
 
-    match_function = build_match_function(
-        error=args.error,
-        judge_command=str(args.judge) if args.judge else None,
-        silent=args.silent,
-        test_input_path=test_input_path,
-        test_output_path=test_output_path,
-    )
     match_result = run_checking_output(
         answer=answer,
+        test_input_path=test_input_path,
         test_output_path=test_output_path,
+        actual_output_path=output_path,
         is_special_judge=args.judge is not None,
         match_function=match_function,
     )
@@ -369,36 +519,221 @@ def test_single_case(
         does_print_input=args.print_input,
         silent=args.silent,
         match_result=match_result,
+        timed_out=info.timed_out,
+        cpu_tle=(
+            args.tle_by_cpu_time
+            and args.tle is not None
+            and cpu_time is not None
+            and cpu_time > args.tle
+        ),
     )
 
     # return the result
-    testcase = {
-        "name": test_name,
-        "input": str(test_input_path.resolve()),
-    }
-    if test_output_path:
-        testcase["output"] = str(test_output_path.resolve())
-    return {
-        "status": status.value,
-        "testcase": testcase,
-        "output": answer,
-        "exitcode": proc.returncode,
-        "elapsed": elapsed,
-        "memory": memory,
-    }
+    return OjTestcaseResult(
+        status=status,
+        testcase=TestCase(
+            name=test_name,
+            input=test_input_path.resolve(),
+            output=test_output_path.resolve() if test_output_path else None,
+        ),
+        # the exit code of the killed process is meaningless
+        exitcode=None if info.timed_out else proc.returncode,
+        elapsed=elapsed,
+        memory=memory,
+        cpu_time=cpu_time,
+    )
 
 
-def run(args: OjTestArguments) -> OjTestResult:
-    # list tests
-    if not args.test:
-        args.test = fmtutils.glob_with_format(args.directory, args.format)  # by default
-    if args.ignore_backup:
-        args.test = fmtutils.drop_backup_or_hidden_files(args.test)
-    tests = fmtutils.construct_relationship_of_files(
-        args.test, args.directory, args.format
+class _CpuPool:
+    """The CPUs shared by all test cases executed in the process.
+
+    The problems verified at the same time take CPUs from the same pool,
+    so their test cases do not share CPUs while the other CPUs are idle.
+    """
+
+    def __init__(self) -> None:
+        self._lock = threading.Lock()
+        self._size = 0
+        self._cpus: queue.SimpleQueue[int] | None = None
+
+    def _get_cpus(self) -> "queue.SimpleQueue[int]":
+        with self._lock:
+            if self._cpus is None:
+                available = sorted(os.sched_getaffinity(0))
+                self._size = len(available)
+                self._cpus = queue.SimpleQueue()
+                for cpu in available:
+                    self._cpus.put(cpu)
+            return self._cpus
+
+    @property
+    def size(self) -> int:
+        self._get_cpus()
+        return self._size
+
+    @contextlib.contextmanager
+    def pin(self) -> Generator[None, None, None]:
+        """Pin the calling thread to a free CPU during the context.
+
+        On Linux, the affinity is set for the calling thread
+        and inherited by the processes spawned from it.
+        If all CPUs are in use, this waits for one of them.
+        """
+        cpus = self._get_cpus()
+        cpu = cpus.get()
+        previous = os.sched_getaffinity(0)
+        try:
+            os.sched_setaffinity(0, {cpu})
+            logger.debug("test case is pinned to CPU %d", cpu)
+            yield
+        finally:
+            os.sched_setaffinity(0, previous)
+            cpus.put(cpu)
+
+
+_cpu_pool = _CpuPool()
+
+
+def _can_pin_cpu() -> bool:
+    return hasattr(os, "sched_setaffinity")
+
+
+def _make_executor(args: OjTestArguments) -> concurrent.futures.ThreadPoolExecutor:
+    if args.pin_cpu and _can_pin_cpu() and _cpu_pool.size < args.jobs:
+        logger.warning(
+            "The number of jobs is limited to %d by available CPUs", _cpu_pool.size
+        )
+    return concurrent.futures.ThreadPoolExecutor(max_workers=args.jobs)
+
+
+def _judge_and_remove(
+    name: str,
+    paths: dict[str, pathlib.Path],
+    *,
+    info: utils.OjExecInfo,
+    proc: Popen[bytes],
+    args: OjTestArguments,
+    output_path: pathlib.Path,
+    match_function: MatchFunction,
+) -> OjTestcaseResult:
+    logger.info("%s", name)
+    try:
+        return judge_single_case(
+            name,
+            paths["in"],
+            paths.get("out"),
+            info=info,
+            proc=proc,
+            args=args,
+            output_path=output_path,
+            match_function=match_function,
+        )
+    finally:
+        # the outputs may be large, so they are not kept until all cases finish
+        output_path.unlink(missing_ok=True)
+
+
+def _run_sequential(
+    tests: dict[str, dict[str, pathlib.Path]],
+    args: OjTestArguments,
+    *,
+    output_dir: pathlib.Path,
+    match_function: MatchFunction,
+) -> list[OjTestcaseResult]:
+    """Execute and judge test cases one by one in name order."""
+    history: list[OjTestcaseResult] = []
+    for i, (name, paths) in enumerate(sorted(tests.items())):
+        output_path = output_dir / f"{i}.out"
+        info, proc = execute_single_case(
+            paths["in"], args=args, output_path=output_path
+        )
+        history.append(
+            _judge_and_remove(
+                name,
+                paths,
+                info=info,
+                proc=proc,
+                args=args,
+                output_path=output_path,
+                match_function=match_function,
+            )
+        )
+    return history
+
+
+def _run_pipeline(
+    tests: dict[str, dict[str, pathlib.Path]],
+    args: OjTestArguments,
+    *,
+    output_dir: pathlib.Path,
+    match_function: MatchFunction,
+) -> list[OjTestcaseResult]:
+    """Execute test cases in the executor and judge them in name order.
+
+    The test cases are judged in the calling thread,
+    so judging a test case overlaps with executing the next ones.
+    At most ``PIPELINE_DEPTH_PER_JOB * args.jobs`` test cases are executed ahead of judging.
+    """
+    cases = iter(
+        (name, paths, output_dir / f"{i}.out")
+        for i, (name, paths) in enumerate(sorted(tests.items()))
     )
+    history: list[OjTestcaseResult] = []
+    with _make_executor(args) as executor:
+        # the logs of the workers belong to the group of the caller
+        execute_case_in_context = log.in_current_context(execute_single_case)
+        in_flight: collections.deque[
+            tuple[
+                str,
+                dict[str, pathlib.Path],
+                pathlib.Path,
+                concurrent.futures.Future[tuple[utils.OjExecInfo, Popen[bytes]]],
+            ]
+        ] = collections.deque()
+
+        def submit_next() -> None:
+            case = next(cases, None)
+            if case is None:
+                return
+            name, paths, output_path = case
+            future = executor.submit(
+                execute_case_in_context,
+                paths["in"],
+                args=args,
+                output_path=output_path,
+            )
+            in_flight.append((name, paths, output_path, future))
+
+        try:
+            for _ in range(PIPELINE_DEPTH_PER_JOB * args.jobs):
+                submit_next()
+            while in_flight:
+                name, paths, output_path, future = in_flight.popleft()
+                info, proc = future.result()
+                submit_next()
+                history.append(
+                    _judge_and_remove(
+                        name,
+                        paths,
+                        info=info,
+                        proc=proc,
+                        args=args,
+                        output_path=output_path,
+                        match_function=match_function,
+                    )
+                )
+        finally:
+            for *_, future in in_flight:
+                future.cancel()
+    return history
+
+
+def _prepare_gnu_time(args: OjTestArguments) -> None:
+    if args.gnu_time is None and utils.HAS_RUSAGE:
+        # os.wait4 measures the memory usage without GNU time
+        logger.debug("memory usage is measured by os.wait4")
+        return
 
-    # check wheather GNU time is available
     if args.gnu_time is None:
         if platform.system() == "Darwin":
             args.gnu_time = "gtime"
@@ -414,15 +749,43 @@ def run(args: OjTestArguments) -> OjTestResult:
     if args.mle is not None and args.gnu_time is None:
         raise RuntimeError("--mle is used but GNU time does not exist")
 
-    # run tests
-    history: list[OjTestcaseResult] = []
-    for name, paths in sorted(tests.items()):
-        if time.perf_counter() > args.deadline:
-            raise VerifcationTimeoutError
 
-        history.append(
-            OjTestcaseResult.model_validate(
-                test_single_case(name, paths["in"], paths.get("out"), args=args),
+def run(args: OjTestArguments) -> OjTestResult:
+    # list tests
+    if not args.test:
+        args.test = fmtutils.glob_with_format(args.directory, args.format)  # by default
+    if args.ignore_backup:
+        args.test = fmtutils.drop_backup_or_hidden_files(args.test)
+    tests = fmtutils.construct_relationship_of_files(
+        args.test, args.directory, args.format
+    )
+
+    # check wheather GNU time is available
+    _prepare_gnu_time(args)
+    if args.pin_cpu and not _can_pin_cpu():
+        logger.warning("CPU pinning is not supported on this platform")
+
+    # run tests
+    # outputs are written to files to compare them without keeping them in memory
+    match_function = build_match_function(
+        error=args.error,
+        judge_command=[str(args.judge)] if args.judge else None,
+        silent=args.silent,
+    )
+    with tempfile.TemporaryDirectory() as tempdir:
+        history = (
+            _run_pipeline(
+                tests,
+                args,
+                output_dir=pathlib.Path(tempdir),
+                match_function=match_function,
+            )
+            if args.jobs > 1
+            else _run_sequential(
+                tests,
+                args,
+                output_dir=pathlib.Path(tempdir),
+                match_function=match_function,
             )
         )
 
@@ -483,6 +846,9 @@ def run_wrapper(
     mle: float | None,
     error: float | None,
     deadline: float = float("inf"),
+    jobs: int = 1,
+    pin_cpu: bool = False,
+    tle_by_cpu_time: bool = False,
 ) -> VerificationResult:
     directory = get_directory(url)
     test_directory = directory / "test"
@@ -501,19 +867,29 @@ def run_wrapper(
         print_input=True,
         judge=checker_path,
         deadline=deadline,
+        jobs=jobs,
+        pin_cpu=pin_cpu,
+        tle_by_cpu_time=tle_by_cpu_time,
     )
     result = run(args)
+    cpu_times = [case.cpu_time for case in result.testcases]
 
     return VerificationResult(
         status=ResultStatus.SUCCESS if result.is_success else ResultStatus.FAILURE,
         elapsed=result.elapsed,
         slowest=result.slowest,
         heaviest=result.heaviest,
+        cpu_time=(
+            sum(t for t in cpu_times if t is not None)
+            if cpu_times and None not in cpu_times
+            else None
+        ),
         testcases=[
             TestcaseResult(
                 name=case.testcase.name,
                 elapsed=case.elapsed,
                 memory=case.memory,
+                cpu_time=case.cpu_time,
                 status=case.status,
             )
             for case in result.testcases
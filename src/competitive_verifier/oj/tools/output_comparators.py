@@ -1,30 +1,299 @@
-"""This module collects helper classes to compare outputs for `test` subcommand."""
+"""This module collects helper classes to compare outputs for `test` subcommand.
+
+The outputs may be memory-mapped files,
+so the comparators scan them incrementally instead of copying whole contents.
+"""
 
 import abc
 import enum
+import itertools
 import math
+import mmap
+import re
+from collections.abc import Iterator
 from logging import getLogger
+from typing import NamedTuple, TypeAlias
 
 logger = getLogger(__name__)
 
+Buffer: TypeAlias = bytes | mmap.mmap
+"""The contents of an output. A memory-mapped file is also accepted."""
+
+Span: TypeAlias = tuple[int, int]
+
+_CHUNK_SIZE = 1 << 20
+# the same whitespace as bytes.split()
+_WORD_RE = re.compile(rb"\S+")
+_SPACES_RE = re.compile(rb"\s+")
+_LF_RE = re.compile(rb"\n")
+_CRLF_RE = re.compile(rb"\r?\n")
+_LF = ord("\n")
+_CR = ord("\r")
+
+
+def _iter_chunks(buf: Buffer, start: int, end: int) -> Iterator[bytes]:
+    for i in range(start, end, _CHUNK_SIZE):
+        yield buf[i : min(i + _CHUNK_SIZE, end)]
+
+
+def _iter_crlf_normalized_segments(buf: Buffer) -> Iterator[tuple[int, bytes, bytes]]:
+    """Iterate the raw offsets, raw chunks and normalized chunks of a buffer."""
+    pending = b""
+    for i in range(0, len(buf), _CHUNK_SIZE):
+        chunk = pending + buf[i : i + _CHUNK_SIZE]
+        start = i - len(pending)
+        # "\r" at the end may be followed by "\n" in the next chunk
+        pending = chunk[-1:] if chunk.endswith(b"\r") else b""
+        raw = chunk[: len(chunk) - len(pending)]
+        yield start, raw, raw.replace(b"\r\n", b"\n")
+    yield len(buf) - len(pending), pending, pending
+
+
+def _iter_crlf_normalized_chunks(buf: Buffer) -> Iterator[bytes]:
+    for _, _, chunk in _iter_crlf_normalized_segments(buf):
+        yield chunk
+
+
+def _equal_chunks(xs: Iterator[bytes], ys: Iterator[bytes]) -> bool:
+    x = y = b""
+    while True:
+        while not x and (chunk := next(xs, None)) is not None:
+            x = chunk
+        while not y and (chunk := next(ys, None)) is not None:
+            y = chunk
+        if not x or not y:
+            return not x and not y
+        n = min(len(x), len(y))
+        if x[:n] != y[:n]:
+            return False
+        x = x[n:]
+        y = y[n:]
+
+
+def _iter_lines(buf: Buffer, span: Span, *, crlf: bool) -> Iterator[Span]:
+    r"""Iterate lines like ``buf.rstrip(b"\n").split(b"\n")``.
+
+    If ``crlf`` is True, ``"\r\n"`` is also a line separator.
+    """
+    start, end = span
+    while end > start and buf[end - 1] == _LF:
+        end -= 1
+        if crlf and end > start and buf[end - 1] == _CR:
+            end -= 1
+    pos = start
+    for m in (_CRLF_RE if crlf else _LF_RE).finditer(buf, start, end):
+        yield pos, m.start()
+        pos = m.end()
+    yield pos, end
+
+
+def _first_difference(x: bytes, x_start: int, y: bytes, y_start: int, n: int) -> int:
+    """Find the first differing offset of two unequal parts of length ``n``.
+
+    The parts are bisected so that each byte is compared a constant number of times
+    by ``memcmp`` instead of in a Python loop.
+    """
+    lo, hi = 0, n
+    while hi - lo > 1:
+        mid = (lo + hi) // 2
+        if x[x_start + lo : x_start + mid] == y[y_start + lo : y_start + mid]:
+            lo = mid
+        else:
+            hi = mid
+    return lo
+
+
+def _advance(
+    position: tuple[int, int], chunk: bytes, start: int, end: int
+) -> tuple[int, int]:
+    line, column = position
+    newlines = chunk.count(b"\n", start, end)
+    if newlines:
+        return line + newlines, end - chunk.rfind(b"\n", start, end)
+    return line, column + end - start
+
+
+class _NormalizedCursor:
+    r"""A position in the chunks of a buffer normalized ``"\r\n"`` to ``"\n"``."""
+
+    def __init__(self, buf: Buffer) -> None:
+        self.buf = buf
+        self._segments = _iter_crlf_normalized_segments(buf)
+        self.raw_start = 0
+        self.raw = b""
+        self.chunk = b""
+        self.pos = 0
+
+    def fill(self) -> bool:
+        """Move to the next chunk if the current one is consumed.
+
+        Returns:
+            bool: False if the whole buffer is consumed
+        """
+        while self.pos >= len(self.chunk):
+            segment = next(self._segments, None)
+            if segment is None:
+                return False
+            self.raw_start, self.raw, self.chunk = segment
+            self.pos = 0
+        return True
+
+    @property
+    def rest(self) -> int:
+        return len(self.chunk) - self.pos
+
+    def raw_offset(self) -> int:
+        """The offset in the original buffer of the current position."""
+        # the largest raw offset whose normalized length is self.pos
+        lo, hi = 0, len(self.raw)
+        while lo < hi:
+            mid = (lo + hi + 1) // 2
+            if mid - self.raw.count(b"\r\n", 0, mid) <= self.pos:
+                lo = mid
+            else:
+                hi = mid - 1
+        return self.raw_start + lo
+
+    def line_start(self) -> int:
+        """The offset in the original buffer of the line of the current position."""
+        return self.buf.rfind(b"\n", 0, self.raw_offset()) + 1
+
+
+def _iter_joined_words(buf: Buffer, start: int) -> Iterator[bytes]:
+    """Iterate chunks of ``b" ".join(buf[start:].split())``."""
+    started = pending_space = False
+    for chunk in _iter_chunks(buf, start, len(buf)):
+        joined = _SPACES_RE.sub(b" ", chunk)
+        words = joined.strip(b" ")
+        if not words:
+            pending_space = pending_space or (started and bool(joined))
+            continue
+        if started and (pending_space or joined.startswith(b" ")):
+            yield b" "
+        yield words
+        started = True
+        pending_space = joined.endswith(b" ")
+
 
 class OutputComparator(abc.ABC):
     @abc.abstractmethod
-    def __call__(self, actual: bytes, expected: bytes) -> bool:
+    def __call__(self, actual: Buffer, expected: Buffer) -> bool:
         """Compare two byte strings.
 
         Args:
-            actual (bytes): Actual output
-            expected (bytes): Expected output
+            actual (Buffer): Actual output
+            expected (Buffer): Expected output
         Returns:
             bool: True if they are considered equal
         """
         ...
 
+    def compare_span(
+        self,
+        actual: Buffer,
+        actual_span: Span,
+        expected: Buffer,
+        expected_span: Span,
+    ) -> bool:
+        """Compare the parts of two byte strings.
+
+        Subclasses override this to avoid copying the parts.
+        """
+        return self(
+            actual[actual_span[0] : actual_span[1]],
+            expected[expected_span[0] : expected_span[1]],
+        )
+
+    def compare_crlf_insensitive(self, actual: Buffer, expected: Buffer) -> bool:
+        r"""Compare two byte strings regarding ``"\r\n"`` as ``"\n"``.
+
+        Subclasses override this to avoid copying the whole contents.
+        """
+        return self(
+            bytes(actual).replace(b"\r\n", b"\n"),
+            bytes(expected).replace(b"\r\n", b"\n"),
+        )
+
 
 class ExactComparator(OutputComparator):
-    def __call__(self, actual: bytes, expected: bytes) -> bool:
-        return actual == expected
+    def __call__(self, actual: Buffer, expected: Buffer) -> bool:
+        return self.compare_span(actual, (0, len(actual)), expected, (0, len(expected)))
+
+    def compare_span(
+        self,
+        actual: Buffer,
+        actual_span: Span,
+        expected: Buffer,
+        expected_span: Span,
+    ) -> bool:
+        if actual_span[1] - actual_span[0] != expected_span[1] - expected_span[0]:
+            return False
+        return _equal_chunks(
+            _iter_chunks(actual, *actual_span), _iter_chunks(expected, *expected_span)
+        )
+
+    def compare_crlf_insensitive(self, actual: Buffer, expected: Buffer) -> bool:
+        return _equal_chunks(
+            _iter_crlf_normalized_chunks(actual),
+            _iter_crlf_normalized_chunks(expected),
+        )
+
+
+class ExactMatchResult(NamedTuple):
+    matched: bool
+    r"""True if the outputs are equal regarding ``"\r\n"`` as ``"\n"``"""
+    matched_ignoring_spaces: bool
+    """True if the outputs are equal when spaces and newlines are ignored"""
+    first_difference: tuple[int, int] | None
+    """The 1-based line and column in bytes where the outputs differ first"""
+
+
+class ExactMatchComparator(OutputComparator):
+    r"""Compare outputs exactly regarding ``"\r\n"`` as ``"\n"``.
+
+    This is the same as ``CRLFInsensitiveComparator(ExactComparator())``,
+    but :meth:`compare` also tells where the outputs differ
+    and whether they are equal ignoring spaces in the same pass.
+    """
+
+    def __call__(self, actual: Buffer, expected: Buffer) -> bool:
+        return self.compare(actual, expected).matched
+
+    def compare(self, actual: Buffer, expected: Buffer) -> ExactMatchResult:
+        # Compare the normalized chunks once, tracking the position.
+        # Only the chunk containing the first difference is bisected to locate it.
+        x = _NormalizedCursor(actual)
+        y = _NormalizedCursor(expected)
+        position = (1, 1)
+        while True:
+            has_x = x.fill()
+            has_y = y.fill()
+            if not has_x and not has_y:
+                return ExactMatchResult(
+                    matched=True, matched_ignoring_spaces=True, first_difference=None
+                )
+            if not has_x or not has_y:
+                break
+            n = min(x.rest, y.rest)
+            differs = x.chunk[x.pos : x.pos + n] != y.chunk[y.pos : y.pos + n]
+            if differs:
+                n = _first_difference(x.chunk, x.pos, y.chunk, y.pos, n)
+            position = _advance(position, x.chunk, x.pos, x.pos + n)
+            x.pos += n
+            y.pos += n
+            if differs:
+                break
+
+        # The outputs are equal before the first difference,
+        # so the words are compared from the line containing it.
+        return ExactMatchResult(
+            matched=False,
+            matched_ignoring_spaces=_equal_chunks(
+                _iter_joined_words(actual, x.line_start()),
+                _iter_joined_words(expected, y.line_start()),
+            ),
+            first_difference=position,
+        )
 
 
 class FloatingPointNumberComparator(OutputComparator):
@@ -38,12 +307,15 @@ class FloatingPointNumberComparator(OutputComparator):
         self.rel_tol = rel_tol
         self.abs_tol = abs_tol
 
-    def __call__(self, actual: bytes, expected: bytes) -> bool:
+    def __call__(self, actual: Buffer, expected: Buffer) -> bool:
         """Assume that both actual and expected are floating point numbers.
 
         Returns:
         True if the relative error or absolute error is smaller than the accepted error
         """
+        # words are small, so copying them is cheap
+        actual = bytes(actual)
+        expected = bytes(expected)
         try:
             x: float | None = float(actual)
         except ValueError:
@@ -61,30 +333,73 @@ class SplitComparator(OutputComparator):
     def __init__(self, word_comparator: OutputComparator):
         self.word_comparator = word_comparator
 
-    def __call__(self, actual: bytes, expected: bytes) -> bool:
-        # str.split() also removes trailing '\r'
-        actual_words = actual.split()
-        expected_words = expected.split()
-        if len(actual_words) != len(expected_words):
-            return False
-        return all(
-            self.word_comparator(x, y)
-            for x, y in zip(actual_words, expected_words, strict=False)
-        )
+    def __call__(self, actual: Buffer, expected: Buffer) -> bool:
+        return self.compare_span(actual, (0, len(actual)), expected, (0, len(expected)))
+
+    def compare_span(
+        self,
+        actual: Buffer,
+        actual_span: Span,
+        expected: Buffer,
+        expected_span: Span,
+    ) -> bool:
+        # the whitespace of bytes.split() also contains '\r'
+        for x, y in itertools.zip_longest(
+            _WORD_RE.finditer(actual, *actual_span),
+            _WORD_RE.finditer(expected, *expected_span),
+        ):
+            if x is None or y is None:
+                return False
+            if not self.word_comparator(x.group(), y.group()):
+                return False
+        return True
+
+    def compare_crlf_insensitive(self, actual: Buffer, expected: Buffer) -> bool:
+        # "\r" is removed as whitespace
+        return self(actual, expected)
 
 
 class SplitLinesComparator(OutputComparator):
     def __init__(self, line_comparator: OutputComparator):
         self.line_comparator = line_comparator
 
-    def __call__(self, actual: bytes, expected: bytes) -> bool:
-        actual_lines = actual.rstrip(b"\n").split(b"\n")
-        expected_lines = expected.rstrip(b"\n").split(b"\n")
-        if len(actual_lines) != len(expected_lines):
-            return False
-        return all(
-            self.line_comparator(x, y)
-            for x, y in zip(actual_lines, expected_lines, strict=False)
+    def _compare_lines(
+        self,
+        actual: Buffer,
+        actual_span: Span,
+        expected: Buffer,
+        expected_span: Span,
+        *,
+        crlf: bool,
+    ) -> bool:
+        for x, y in itertools.zip_longest(
+            _iter_lines(actual, actual_span, crlf=crlf),
+            _iter_lines(expected, expected_span, crlf=crlf),
+        ):
+            if x is None or y is None:
+                return False
+            if not self.line_comparator.compare_span(actual, x, expected, y):
+                return False
+        return True
+
+    def __call__(self, actual: Buffer, expected: Buffer) -> bool:
+        return self.compare_span(actual, (0, len(actual)), expected, (0, len(expected)))
+
+    def compare_span(
+        self,
+        actual: Buffer,
+        actual_span: Span,
+        expected: Buffer,
+        expected_span: Span,
+    ) -> bool:
+        return self._compare_lines(
+            actual, actual_span, expected, expected_span, crlf=False
+        )
+
+    def compare_crlf_insensitive(self, actual: Buffer, expected: Buffer) -> bool:
+        # Lines never contain "\r\n" when it is a separator too
+        return self._compare_lines(
+            actual, (0, len(actual)), expected, (0, len(expected)), crlf=True
         )
 
 
@@ -92,10 +407,8 @@ class CRLFInsensitiveComparator(OutputComparator):
     def __init__(self, file_comparator: OutputComparator):
         self.file_comparator = file_comparator
 
-    def __call__(self, actual: bytes, expected: bytes) -> bool:
-        return self.file_comparator(
-            actual.replace(b"\r\n", b"\n"), expected.replace(b"\r\n", b"\n")
-        )
+    def __call__(self, actual: Buffer, expected: Buffer) -> bool:
+        return self.file_comparator.compare_crlf_insensitive(actual, expected)
 
 
 class CompareMode(enum.Enum):
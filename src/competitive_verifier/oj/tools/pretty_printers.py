@@ -1,4 +1,7 @@
 import enum
+import mmap
+import os
+import pathlib
 import shutil
 from collections.abc import Iterable
 from logging import getLogger
@@ -147,6 +150,62 @@ def _tokenize_large_file_content(
     return _warn_if_empty(tokens)
 
 
+_UTF8_CONTINUATION_MASK = 0xC0
+_UTF8_CONTINUATION = 0x80
+
+
+def _align_to_character(content: bytes, pos: int) -> int:
+    """Move ``pos`` back to the start of the UTF-8 character which contains it."""
+    for _ in range(3):
+        if (
+            not 0 < pos < len(content)
+            or content[pos] & _UTF8_CONTINUATION_MASK != _UTF8_CONTINUATION
+        ):
+            break
+        pos -= 1
+    return pos
+
+
+def _tokenize_windows(
+    *,
+    head_content: bytes,
+    tail_content: bytes,
+    size: int,
+    head: int,
+    tail: int,
+    char_in_line: int,
+) -> list[_PrettyToken]:
+    """Construct the intermediate representations only from the both ends of the content.
+
+    The middle of the content is never read, so the omitted lines are not counted.
+    """
+    head_bytes = b"".join(head_content.splitlines(keepends=True)[:head])
+    if len(head_bytes) > char_in_line * head:
+        # the windows may split multibyte characters
+        end = _align_to_character(head_bytes, char_in_line * head)
+        head_bytes = head_bytes[:end].rstrip()
+    tail_bytes = b"".join(tail_content.splitlines(keepends=True)[-tail:])
+    if len(tail_bytes) > char_in_line * tail:
+        start = _align_to_character(tail_bytes, len(tail_bytes) - char_in_line * tail)
+        tail_bytes = tail_bytes[start:]
+    omitted = size - len(head_bytes) - len(tail_bytes)
+
+    head_hints, head_text = _decode_with_recovery(head_bytes)
+    tail_hints, tail_text = _decode_with_recovery(tail_bytes)
+    tokens: list[_PrettyToken] = head_hints + tail_hints
+    for line in head_text.splitlines(keepends=True):
+        tokens += _tokenize_line(line)
+    tokens.append(
+        _PrettyToken(
+            _PrettyTokenType.HINT,
+            f"... ({omitted} bytes) ..." + ("\n" if head_text.endswith("\n") else ""),
+        )
+    )
+    for line in tail_text.splitlines(keepends=True):
+        tokens += _tokenize_line(line)
+    return _warn_if_empty(tokens)
+
+
 def _replace_whitespace(s: str) -> str:
     return s.replace(" ", "_").replace("\t", "\\t").replace("\r", "\\r")
 
@@ -202,11 +261,70 @@ def _get_terminal_size() -> int:
     )  # shutil.get_terminal_size() may return too small values (e.g. (0, 0) on Circle CI) successfully (i.e. fallback is not used). see https://github.com/kmyk/online-judge-tools/pull/611
 
 
+def _get_window_size(limit: int, char_in_line: int) -> int:
+    # the bytes enough to render the limit
+    return char_in_line * limit
+
+
 def make_pretty_large_file_content(
-    content: bytes, limit: int, head: int, tail: int
+    content: bytes | mmap.mmap, limit: int, head: int, tail: int
 ) -> str:
+    """Render the content to print.
+
+    Only the both ends of a large content are sliced, so a memory-mapped file is not read entirely.
+    """
     char_in_line = _get_terminal_size()
-    tokens = _tokenize_large_file_content(
-        content=content, limit=limit, head=head, tail=tail, char_in_line=char_in_line
+    window = _get_window_size(limit, char_in_line)
+    if len(content) <= 2 * window:
+        return _render_tokens(
+            tokens=_tokenize_large_file_content(
+                content=bytes(content),
+                limit=limit,
+                head=head,
+                tail=tail,
+                char_in_line=char_in_line,
+            )
+        )
+    return _render_tokens(
+        tokens=_tokenize_windows(
+            head_content=content[:window],
+            tail_content=content[-window:],
+            size=len(content),
+            head=head,
+            tail=tail,
+            char_in_line=char_in_line,
+        )
     )
+
+
+def make_pretty_file_content(
+    path: pathlib.Path, limit: int, head: int, tail: int
+) -> str:
+    """Render the file to print.
+
+    Only the both ends of a large file are read.
+    """
+    char_in_line = _get_terminal_size()
+    window = _get_window_size(limit, char_in_line)
+    with path.open("rb") as fh:
+        size = os.fstat(fh.fileno()).st_size
+        if size <= 2 * window:
+            tokens = _tokenize_large_file_content(
+                content=fh.read(),
+                limit=limit,
+                head=head,
+                tail=tail,
+                char_in_line=char_in_line,
+            )
+        else:
+            head_content = fh.read(window)
+            fh.seek(-window, os.SEEK_END)
+            tokens = _tokenize_windows(
+                head_content=head_content,
+                tail_content=fh.read(window),
+                size=size,
+                head=head,
+                tail=tail,
+                char_in_line=char_in_line,
+            )
     return _render_tokens(tokens=tokens)
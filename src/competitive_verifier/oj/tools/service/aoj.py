@@ -1,54 +1,112 @@
+import concurrent.futures
 import json
+import pathlib
 import re
 import urllib.parse
+from collections.abc import Callable
 from logging import getLogger
-from typing import Optional
+from typing import Any, ClassVar, Optional, TypeVar
 
-import requests
+from competitive_verifier import log
 
+from .session import download_to_file, get_session
 from .text import normpath
-from .type import Problem, TestCase
+from .type import Problem, TestCase, get_testcase_path
 
 logger = getLogger(__name__)
 
+_T = TypeVar("_T")
+
 
 class AOJProblem(Problem):
+    judgedat_url: ClassVar[str] = "https://judgedat.u-aizu.ac.jp"
+    """The base URL of the testcases API"""
+    testcase_jobs: ClassVar[int] = 8
+    """The number of testcases downloaded at the same time for each problem
+
+    The requests to the same host are limited by ``session.REQUESTS_PER_HOST``
+    even if several problems are downloaded at the same time.
+    """
+
     def __init__(self, *, problem_id: str):
         self.problem_id = problem_id
 
     def download_system_cases(
         self, *, headers: dict[str, str] | None = None
     ) -> list[TestCase]:
+        return self._map_testcases(
+            self._download_testcase, self._get_testcase_headers(headers=headers)
+        )
+
+    def download_system_cases_to(
+        self,
+        directory: pathlib.Path,
+        *,
+        headers: dict[str, str] | None = None,
+    ) -> list[pathlib.Path]:
+        testcase_headers = self._get_testcase_headers(headers=headers)
+        directory.mkdir(parents=True, exist_ok=True)
+
+        def download(header: dict[str, Any]) -> list[pathlib.Path]:
+            written: list[pathlib.Path] = []
+            for ext in ("in", "out"):
+                path = get_testcase_path(directory, header["name"], ext)
+                with path.open("wb") as fh:
+                    download_to_file(f"{self._get_testcase_url(header)}/{ext}", fh)
+                written.append(path)
+            return written
+
+        return [
+            path
+            for paths in self._map_testcases(download, testcase_headers)
+            for path in paths
+        ]
+
+    def _get_testcase_headers(
+        self, *, headers: dict[str, str] | None
+    ) -> list[dict[str, Any]]:
         # get header
         # reference: http://developers.u-aizu.ac.jp/api?key=judgedat%2Ftestcases%2F%7BproblemId%7D%2Fheader_GET
-        url = f"https://judgedat.u-aizu.ac.jp/testcases/{self.problem_id}/header"
-        resp = requests.get(url, headers=headers, allow_redirects=True, timeout=10)
+        url = f"{self.judgedat_url}/testcases/{self.problem_id}/header"
+        resp = get_session().get(url, headers=headers, allow_redirects=True, timeout=10)
         resp.raise_for_status()
         header_res = json.loads(resp.text)
+        return header_res["headers"]
 
+    def _map_testcases(
+        self,
+        func: Callable[[dict[str, Any]], _T],
+        testcase_headers: list[dict[str, Any]],
+    ) -> list[_T]:
         # get testcases via the official API
-        testcases: list[TestCase] = []
-        for header in header_res["headers"]:
-            # NOTE: the endpoints are not same to http://developers.u-aizu.ac.jp/api?key=judgedat%2Ftestcases%2F%7BproblemId%7D%2F%7Bserial%7D_GET since the json API often says "..... (terminated because of the limitation)"
-            # NOTE: even when using https://judgedat.u-aizu.ac.jp/testcases/PROBLEM_ID/SERIAL, there is the 1G limit (see https://twitter.com/beet_aizu/status/1194947611100188672)
-            serial = header["serial"]
-            url = f"https://judgedat.u-aizu.ac.jp/testcases/{self.problem_id}/{serial}"
-
-            resp_in = requests.get(url + "/in", allow_redirects=True, timeout=10)
-            resp_in.raise_for_status()
-            resp_out = requests.get(url + "/out", allow_redirects=True, timeout=10)
-            resp_out.raise_for_status()
-
-            testcases += [
-                TestCase(
-                    header["name"],
-                    header["name"],
-                    resp_in.content,
-                    header["name"],
-                    resp_out.content,
-                )
-            ]
-        return testcases
+        if len(testcase_headers) <= 1:
+            return [func(header) for header in testcase_headers]
+        with concurrent.futures.ThreadPoolExecutor(
+            max_workers=min(self.testcase_jobs, len(testcase_headers))
+        ) as executor:
+            return list(executor.map(log.in_current_context(func), testcase_headers))
+
+    def _get_testcase_url(self, header: dict[str, Any]) -> str:
+        # NOTE: the endpoints are not same to http://developers.u-aizu.ac.jp/api?key=judgedat%2Ftestcases%2F%7BproblemId%7D%2F%7Bserial%7D_GET since the json API often says "..... (terminated because of the limitation)"
+        # NOTE: even when using https://judgedat.u-aizu.ac.jp/testcases/PROBLEM_ID/SERIAL, there is the 1G limit (see https://twitter.com/beet_aizu/status/1194947611100188672)
+        serial = header["serial"]
+        return f"{self.judgedat_url}/testcases/{self.problem_id}/{serial}"
+
+    def _download_testcase(self, header: dict[str, Any]) -> TestCase:
+        url = self._get_testcase_url(header)
+        session = get_session()
+        resp_in = session.get(url + "/in", allow_redirects=True, timeout=10)
+        resp_in.raise_for_status()
+        resp_out = session.get(url + "/out", allow_redirects=True, timeout=10)
+        resp_out.raise_for_status()
+
+        return TestCase(
+            header["name"],
+            header["name"],
+            resp_in.content,
+            header["name"],
+            resp_out.content,
+        )
 
     def get_url(self) -> str:
         return f"http://judge.u-aizu.ac.jp/onlinejudge/description.jsp?id={self.problem_id}"
@@ -110,7 +168,7 @@ class AOJArenaProblem(Problem):
     def get_problem_id(self) -> str:
         if self._problem_id is None:
             url = f"https://judgeapi.u-aizu.ac.jp/arenas/{self.arena_id}/problems"
-            resp = requests.get(url, allow_redirects=True, timeout=10)
+            resp = get_session().get(url, allow_redirects=True, timeout=10)
             resp.raise_for_status()
             problems = json.loads(resp.text)
             for problem in problems:
@@ -129,6 +187,16 @@ class AOJArenaProblem(Problem):
             headers=headers
         )
 
+    def download_system_cases_to(
+        self,
+        directory: pathlib.Path,
+        *,
+        headers: dict[str, str] | None = None,
+    ) -> list[pathlib.Path]:
+        return AOJProblem(problem_id=self.get_problem_id()).download_system_cases_to(
+            directory, headers=headers
+        )
+
     def get_url(self) -> str:
         return f"https://onlinejudge.u-aizu.ac.jp/services/room.html#{self.arena_id}/problems/{self.alphabet}"
 
@@ -1,14 +1,18 @@
 # Python Version: 3.x
-import glob
+import concurrent.futures
+import os
 import pathlib
 import re
 import subprocess
 import sys
+import threading
 import urllib.parse
+from collections import defaultdict
+from collections.abc import Iterable
 from logging import getLogger
-from typing import Optional
+from typing import ClassVar, Optional
 
-from competitive_verifier import config
+from competitive_verifier import config, log
 
 from . import testcase_zipper
 from .type import Problem, TestCase
@@ -32,10 +36,51 @@ class LibraryCheckerProblem(Problem):
 
     def generate_test_cases_in_cloned_repository(self) -> None:
         self.update_cloned_repository()
-        path = self.get_cloned_repository_path()
+        with self._generated_lock:
+            if self.problem_id in self._generated_problems:
+                return
+        self._run_generate([self])
 
-        problem_spec = str(self.get_problem_directory_path() / "info.toml")
-        command = [sys.executable, str(path / "generate.py"), problem_spec]
+    @classmethod
+    def generate_test_cases(
+        cls,
+        problems: Iterable["LibraryCheckerProblem"],
+        *,
+        jobs: int | None = None,
+    ) -> None:
+        """Generate the test cases of the problems at once.
+
+        The problems are split into ``jobs`` groups,
+        and ``generate.py`` runs for each group at the same time.
+        The generated problems are not generated again in this process.
+        """
+        cls.update_cloned_repository()
+        with cls._generated_lock:
+            targets = {
+                p.problem_id: p
+                for p in problems
+                if p.problem_id not in cls._generated_problems
+            }
+        if not targets:
+            return
+        jobs = min(jobs or os.cpu_count() or 1, len(targets))
+        groups = [list(targets.values())[i::jobs] for i in range(jobs)]
+        if jobs == 1:
+            cls._run_generate(groups[0])
+            return
+        with concurrent.futures.ThreadPoolExecutor(max_workers=jobs) as executor:
+            run_generate = log.in_current_context(cls._run_generate)
+            for future in [executor.submit(run_generate, g) for g in groups]:
+                future.result()
+
+    @classmethod
+    def _run_generate(cls, problems: list["LibraryCheckerProblem"]) -> None:
+        path = cls.get_cloned_repository_path()
+
+        problem_specs = [
+            str(p.get_problem_directory_path() / "info.toml") for p in problems
+        ]
+        command = [sys.executable, str(path / "generate.py"), *problem_specs]
         logger.info("$ %s", " ".join(command))
         try:
             subprocess.check_call(command, stdout=sys.stderr, stderr=sys.stderr)
@@ -44,14 +89,29 @@ class LibraryCheckerProblem(Problem):
                 "the generate.py failed: check https://github.com/yosupo06/library-checker-problems/issues"
             )
             raise
+        with cls._generated_lock:
+            cls._generated_problems.update(p.problem_id for p in problems)
 
     def get_problem_directory_path(self) -> pathlib.Path:
-        path = self.get_cloned_repository_path()
-        info_tomls = list(path.glob(f"**/{glob.escape(self.problem_id)}/info.toml"))
-        if len(info_tomls) != 1:
+        info_dirs = self.get_problem_directory_index().get(self.problem_id, [])
+        if len(info_dirs) != 1:
             logger.error("the problem %s not found or broken", self.problem_id)
             raise RuntimeError
-        return info_tomls[0].parent
+        return info_dirs[0]
+
+    @classmethod
+    def get_problem_directory_index(cls) -> dict[str, list[pathlib.Path]]:
+        """The directories of the problems in the cloned repository by the ids.
+
+        The index is built at once instead of searching the repository for each problem.
+        """
+        with cls._index_lock:
+            if cls._problem_directories is None:
+                index: defaultdict[str, list[pathlib.Path]] = defaultdict(list)
+                for info_toml in cls.get_cloned_repository_path().glob("**/info.toml"):
+                    index[info_toml.parent.name].append(info_toml.parent)
+                cls._problem_directories = dict(index)
+            return cls._problem_directories
 
     def get_url(self) -> str:
         return f"https://judge.yosupo.jp/problem/{self.problem_id}"
@@ -77,10 +137,38 @@ class LibraryCheckerProblem(Problem):
     def get_cloned_repository_path(cls) -> pathlib.Path:
         return config.get_cache_dir() / "library-checker-problems"
 
+    @classmethod
+    def get_cloned_repository_revision(cls) -> str | None:
+        """The commit of the cloned repository."""
+        try:
+            return subprocess.check_output(
+                [  # noqa: S607
+                    "git",
+                    "-C",
+                    str(cls.get_cloned_repository_path()),
+                    "rev-parse",
+                    "HEAD",
+                ],
+                stderr=subprocess.DEVNULL,
+                text=True,
+            ).strip()
+        except (OSError, subprocess.CalledProcessError):
+            return None
+
     is_repository_updated = False
+    _repository_lock = threading.Lock()
+    _problem_directories: ClassVar[dict[str, list[pathlib.Path]] | None] = None
+    _index_lock = threading.Lock()
+    _generated_problems: ClassVar[set[str]] = set()
+    _generated_lock = threading.Lock()
 
     @classmethod
     def update_cloned_repository(cls) -> None:
+        with cls._repository_lock:
+            cls._update_cloned_repository()
+
+    @classmethod
+    def _update_cloned_repository(cls) -> None:
         if cls.is_repository_updated:
             return
 
@@ -114,3 +202,6 @@ class LibraryCheckerProblem(Problem):
             )
 
         cls.is_repository_updated = True
+        # the problems may be added or moved
+        with cls._index_lock:
+            cls._problem_directories = None
@@ -0,0 +1,102 @@
+import contextlib
+import functools
+import threading
+import urllib.parse
+from collections.abc import Generator
+from typing import Any, BinaryIO
+
+import requests
+import requests.adapters
+from urllib3.util import Retry
+
+POOL_SIZE = 16
+"""The number of connections kept alive for each host"""
+
+REQUESTS_PER_HOST = 8
+"""The number of requests sent to the same host at the same time in the process.
+
+This is applied to each request, so it is kept however many problems
+and test cases are downloaded at the same time. It must not exceed ``POOL_SIZE``.
+"""
+
+_host_semaphores: dict[str, threading.BoundedSemaphore] = {}
+_host_semaphores_guard = threading.Lock()
+
+
+@contextlib.contextmanager
+def host_slot(url: str) -> Generator[None, None, None]:
+    """Wait until a request can be sent to the host of the URL."""
+    host = urllib.parse.urlparse(url).netloc
+    with _host_semaphores_guard:
+        semaphore = _host_semaphores.setdefault(
+            host, threading.BoundedSemaphore(REQUESTS_PER_HOST)
+        )
+    with semaphore:
+        yield
+
+
+class HostLimitedSession(requests.Session):
+    """A session which limits the requests to each host by ``host_slot``.
+
+    A streamed response keeps the connection after ``request`` returns,
+    so the callers of streamed requests hold ``host_slot`` by themselves
+    until the body is consumed.
+    """
+
+    def request(  # pyright: ignore[reportIncompatibleMethodOverride]
+        self, method: str, url: str | bytes, *args: Any, **kwargs: Any
+    ) -> requests.Response:
+        if kwargs.get("stream"):
+            return super().request(method, url, *args, **kwargs)
+        with host_slot(url if isinstance(url, str) else url.decode()):
+            return super().request(method, url, *args, **kwargs)
+
+
+_CHUNK_SIZE = 1 << 20
+
+
+def create_session() -> requests.Session:
+    """Create a session which keeps connections alive and retries failed requests."""
+    retry = Retry(
+        total=3,
+        backoff_factor=0.5,
+        status_forcelist=(429, 500, 502, 503, 504),
+        allowed_methods=("GET",),
+        # the callers check the status by themselves
+        raise_on_status=False,
+    )
+    adapter = requests.adapters.HTTPAdapter(
+        pool_connections=POOL_SIZE,
+        pool_maxsize=POOL_SIZE,
+        max_retries=retry,
+    )
+    session = HostLimitedSession()
+    session.mount("http://", adapter)
+    session.mount("https://", adapter)
+    return session
+
+
+@functools.cache
+def get_session() -> requests.Session:
+    """Get the session shared by the services.
+
+    The connection pool is thread-safe, so the threads downloading problems share it.
+    """
+    return create_session()
+
+
+def download_to_file(
+    url: str,
+    fh: BinaryIO,
+    *,
+    headers: dict[str, str] | None = None,
+) -> None:
+    """Write the response body into ``fh`` without keeping it in memory."""
+    with (
+        host_slot(url),
+        get_session().get(
+            url, headers=headers, allow_redirects=True, timeout=10, stream=True
+        ) as resp,
+    ):
+        resp.raise_for_status()
+        fh.writelines(resp.iter_content(chunk_size=_CHUNK_SIZE))
@@ -1,41 +1,49 @@
 import collections
 import io
+import pathlib
+import shutil
 import zipfile
-from collections.abc import Iterator
+from collections.abc import Iterable, Iterator
 from logging import getLogger
+from typing import BinaryIO
 
 from . import format_utils as fmtutils
-from .type import TestCase
+from .type import TestCase, get_testcase_path
 
 logger = getLogger(__name__)
 
+_CHUNK_SIZE = 1 << 20
 
-def extract_from_files(
-    files: Iterator[tuple[str, bytes]],
+
+def match_files(
+    filenames: Iterable[str],
     fmt: str = "%s.%e",
     suffix: str = "out",
     *,
     ignore_unmatched_samples: bool = False,
-) -> list[TestCase]:
-    """Extract test case from files.
+) -> list[tuple[str, str, str]]:
+    """Pair the input files and the output files of test cases.
 
     Args:
-        files (Iterator[tuple[str, bytes]]): A list of test case files.
+        filenames (Iterable[str]): A list of test case files.
         fmt (str): The format of filename.
         suffix (str): The extension for output files.
         ignore_unmatched_samples (bool): If true, ignore unmatched sample error.
+
+    Returns:
+        list[tuple[str, str, str]]: The names, the input files and the output files
     """
     table = {
         "s": r"[^/]+",
         "e": rf"(in|{suffix})",
     }
-    names: dict[str, dict[str, tuple[str, bytes]]] = collections.defaultdict(dict)
-    for filename, content in files:
+    names: dict[str, dict[str, str]] = collections.defaultdict(dict)
+    for filename in filenames:
         m = fmtutils.percentparse(filename, fmt, table)
         if not m or m["e"] in names[m["s"]]:
             raise ValueError
-        names[m["s"]][m["e"]] = (filename, content)
-    testcases: list[TestCase] = []
+        names[m["s"]][m["e"]] = filename
+    matched: list[tuple[str, str, str]] = []
     for name in sorted(names.keys()):
         data = names[name]
         if "in" not in data or suffix not in data:
@@ -43,8 +51,36 @@ def extract_from_files(
             if not ignore_unmatched_samples:
                 raise RuntimeError(f"unmatched sample found: {data}")
         else:
-            testcases += [TestCase(name, *data["in"], *data[suffix])]
-    return testcases
+            matched.append((name, data["in"], data[suffix]))
+    return matched
+
+
+def extract_from_files(
+    files: Iterator[tuple[str, bytes]],
+    fmt: str = "%s.%e",
+    suffix: str = "out",
+    *,
+    ignore_unmatched_samples: bool = False,
+) -> list[TestCase]:
+    """Extract test case from files.
+
+    Args:
+        files (Iterator[tuple[str, bytes]]): A list of test case files.
+        fmt (str): The format of filename.
+        suffix (str): The extension for output files.
+        ignore_unmatched_samples (bool): If true, ignore unmatched sample error.
+    """
+    files_list = list(files)
+    contents = dict(files_list)
+    return [
+        TestCase(name, in_file, contents[in_file], out_file, contents[out_file])
+        for name, in_file, out_file in match_files(
+            (filename for filename, _ in files_list),
+            fmt,
+            suffix,
+            ignore_unmatched_samples=ignore_unmatched_samples,
+        )
+    ]
 
 
 def extract_from_zip(
@@ -65,3 +101,32 @@ def extract_from_zip(
             suffix=out,
             ignore_unmatched_samples=ignore_unmatched_samples,
         )
+
+
+def extract_zip_to_directory(
+    zip_file: BinaryIO,
+    fmt: str,
+    directory: pathlib.Path,
+    out: str = "out",
+    *,
+    ignore_unmatched_samples: bool = False,
+) -> list[pathlib.Path]:
+    """Extract test cases from the zip file into ``directory`` member by member.
+
+    Returns:
+        list[pathlib.Path]: The written files
+    """
+    written: list[pathlib.Path] = []
+    with zipfile.ZipFile(zip_file) as fh:
+        for name, in_file, out_file in match_files(
+            (filename for filename in fh.namelist() if not filename.endswith("/")),
+            fmt,
+            out,
+            ignore_unmatched_samples=ignore_unmatched_samples,
+        ):
+            for ext, filename in (("in", in_file), ("out", out_file)):
+                path = get_testcase_path(directory, name, ext)
+                with fh.open(filename) as src, path.open("wb") as dst:
+                    shutil.copyfileobj(src, dst, _CHUNK_SIZE)
+                written.append(path)
+    return written
@@ -1,3 +1,4 @@
+import pathlib
 from abc import ABC, abstractmethod
 from typing import (
     NamedTuple,
@@ -22,6 +23,11 @@ class TestCase(NamedTuple):
     output_data: bytes
 
 
+def get_testcase_path(directory: pathlib.Path, name: str, ext: str) -> pathlib.Path:
+    """The path of the input or output file of the test case."""
+    return directory / pathlib.Path(name).with_suffix(f".{ext}").name
+
+
 class Problem(ABC):
     def __repr__(self) -> str:
         return f"{self.__class__.__name__}.from_url({self.get_url()!r})"  # pragma: no cover
@@ -32,6 +38,29 @@ class Problem(ABC):
     ) -> list[TestCase]:
         raise NotImplementedError
 
+    def download_system_cases_to(
+        self,
+        directory: pathlib.Path,
+        *,
+        headers: dict[str, str] | None = None,
+    ) -> list[pathlib.Path]:
+        """Download the system cases and write them into ``directory``.
+
+        Subclasses override this to write each case as it arrives
+        instead of keeping the whole test set in memory.
+
+        Returns:
+            list[pathlib.Path]: The written files
+        """
+        directory.mkdir(parents=True, exist_ok=True)
+        written: list[pathlib.Path] = []
+        for case in self.download_system_cases(headers=headers):
+            for ext, data in (("in", case.input_data), ("out", case.output_data)):
+                path = get_testcase_path(directory, case.name, ext)
+                path.write_bytes(data)
+                written.append(path)
+        return written
+
     @abstractmethod
     def get_url(self) -> str:
         raise NotImplementedError
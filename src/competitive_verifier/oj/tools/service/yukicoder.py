@@ -1,11 +1,12 @@
+import pathlib
 import posixpath
+import tempfile
 import urllib.parse
 from logging import getLogger
 from typing import Optional
 
-import requests
-
 from . import testcase_zipper
+from .session import download_to_file, get_session
 from .text import normpath
 from .type import NotLoggedInError, Problem, TestCase
 
@@ -47,12 +48,29 @@ class YukicoderProblem(Problem):
         if not self._is_logged_in(headers=headers):
             raise NotLoggedInError
         url = f"{self.get_url()}/testcase.zip"
-        resp = requests.get(url, headers=headers, allow_redirects=True, timeout=10)
+        resp = get_session().get(url, headers=headers, allow_redirects=True, timeout=10)
         fmt = "test_%e/%s"
         return testcase_zipper.extract_from_zip(
             resp.content, fmt, ignore_unmatched_samples=True
         )  # NOTE: yukicoder's test sets sometimes contain garbages. The owner insists that this is an intended behavior, so we need to ignore them.
 
+    def download_system_cases_to(
+        self,
+        directory: pathlib.Path,
+        *,
+        headers: dict[str, str] | None = None,
+    ) -> list[pathlib.Path]:
+        if not self._is_logged_in(headers=headers):
+            raise NotLoggedInError
+        directory.mkdir(parents=True, exist_ok=True)
+        # the zip file needs seeking, so it is written to a file at first
+        with tempfile.TemporaryFile(dir=directory) as fh:
+            download_to_file(f"{self.get_url()}/testcase.zip", fh, headers=headers)
+            fh.seek(0)
+            return testcase_zipper.extract_zip_to_directory(
+                fh, "test_%e/%s", directory, ignore_unmatched_samples=True
+            )
+
     def get_url(self) -> str:
         return f"https://yukicoder.me/problems/{self.problem}"
 
@@ -76,6 +94,6 @@ class YukicoderProblem(Problem):
 
     def _is_logged_in(self, *, headers: dict[str, str] | None = None) -> bool:
         url = "https://yukicoder.me"
-        resp = requests.get(url, headers=headers, allow_redirects=True, timeout=10)
+        resp = get_session().get(url, headers=headers, allow_redirects=True, timeout=10)
         resp.raise_for_status()
         return "login-btn" not in str(resp.content)
@@ -1,18 +1,24 @@
 import contextlib
 import os
 import platform
+import select
 import shlex
 import signal
 import subprocess
 import sys
 import tempfile
+import threading
 import time
 from logging import getLogger
-from typing import BinaryIO
+from typing import TYPE_CHECKING, BinaryIO
 
 import colorama
 from pydantic import BaseModel, Field
 
+if TYPE_CHECKING:
+    import resource
+    from collections.abc import Callable
+
 logger = getLogger(__name__)
 
 # These strings can control logging output.
@@ -31,6 +37,146 @@ class OjExecInfo(BaseModel):
     memory: float | None = Field(
         description="The maximum memory usage of the executed command in megabytes"
     )
+    cpu_time: float | None = Field(
+        default=None,
+        description="The user and system CPU time of the executed command in seconds",
+    )
+    timed_out: bool = Field(
+        default=False,
+        description="Whether the executed command was stopped by the timeout",
+    )
+
+
+HAS_RUSAGE = os.name == "posix" and hasattr(os, "wait4") and hasattr(os, "waitid")
+"""Whether the resource usage of a child process can be measured by ``os.wait4``."""
+
+
+# GNU time may write other messages before them, so they are placed at the end
+_GNU_TIME_FORMAT = "%U %S\n%M"
+
+
+def _parse_gnu_time(reported: str) -> tuple[float | None, float | None]:
+    """Parse the output of GNU time in ``_GNU_TIME_FORMAT``.
+
+    Returns:
+        The memory usage in megabytes and the CPU time in seconds.
+    """
+    lines = reported.splitlines()
+    if not lines or not lines[-1].isdigit():
+        return None, None
+    memory = int(lines[-1]) / 1000
+    try:
+        user, system = lines[-2].split()
+        cpu_time = float(user) + float(system)
+    except (IndexError, ValueError):
+        cpu_time = None
+    return memory, cpu_time
+
+
+def _maxrss_to_megabytes(maxrss: int) -> float:
+    # ru_maxrss is in bytes on macOS and in kilobytes on the other systems
+    if platform.system() == "Darwin":
+        return maxrss / 1000 / 1000
+    return maxrss / 1000
+
+
+def _start_thread(target: "Callable[[], object]") -> threading.Thread:
+    thread = threading.Thread(target=target, daemon=True)
+    thread.start()
+    return thread
+
+
+_POLL_INTERVAL = 0.01
+"""The longest interval to check the exit of a process without pidfd"""
+
+
+def _wait_for_exit(pid: int, timeout: float | None) -> bool:
+    """Wait until the process exits without reaping it.
+
+    Returns:
+        bool: False if the process doesn't exit until the timeout
+    """
+    if hasattr(os, "pidfd_open"):
+        try:
+            pidfd = os.pidfd_open(pid)
+        except OSError:
+            # pidfd is not supported by the kernel
+            pidfd = None
+        if pidfd is not None:
+            try:
+                poller = select.poll()
+                poller.register(pidfd, select.POLLIN)
+                return bool(poller.poll(None if timeout is None else timeout * 1000))
+            finally:
+                os.close(pidfd)
+
+    deadline = None if timeout is None else time.perf_counter() + timeout
+    interval = 0.001
+    while os.waitid(os.P_PID, pid, os.WEXITED | os.WNOWAIT | os.WNOHANG) is None:
+        remaining = None if deadline is None else deadline - time.perf_counter()
+        if remaining is not None and remaining <= 0:
+            return False
+        time.sleep(interval if remaining is None else min(interval, remaining))
+        interval = min(interval * 2, _POLL_INTERVAL)
+    return True
+
+
+def _communicate_with_rusage(
+    proc: subprocess.Popen[bytes],
+    *,
+    input: bytes | None,  # noqa: A002
+    timeout: float | None,
+) -> tuple[bytes | None, "resource.struct_rusage | None"]:
+    """Communicate with the process and reap it by ``os.wait4``.
+
+    The process must be a leader of a new session.
+    If it doesn't exit until the timeout, its process group is killed
+    and it is reaped before ``subprocess.TimeoutExpired`` is raised.
+
+    Returns:
+        The standard output and the resource usage of the process.
+    """
+    deadline = None if timeout is None else time.perf_counter() + timeout
+
+    def _remaining() -> float | None:
+        return None if deadline is None else max(0.0, deadline - time.perf_counter())
+
+    if input is not None and proc.stdin is not None:
+        stdin = proc.stdin
+
+        def _write() -> None:
+            with contextlib.suppress(BrokenPipeError), stdin:
+                stdin.write(input)
+
+        _start_thread(_write)
+
+    chunks: list[bytes] = []
+    reader = None
+    if proc.stdout is not None:
+        stdout = proc.stdout
+
+        def _read() -> None:
+            with stdout:
+                chunks.append(stdout.read())
+
+        reader = _start_thread(_read)
+
+    # wait for the exit without reaping, so that the pid is not reused until killpg
+    exited = _wait_for_exit(proc.pid, _remaining())
+
+    # kill orphans or the process itself on timeout
+    with contextlib.suppress(ProcessLookupError, PermissionError):
+        os.killpg(proc.pid, signal.SIGTERM if exited else signal.SIGKILL)
+    _, status, rusage = os.wait4(proc.pid, 0)
+    proc.returncode = os.waitstatus_to_exitcode(status)
+    if not exited:
+        raise subprocess.TimeoutExpired(proc.args, timeout or 0.0)
+
+    if reader is not None:
+        reader.join(_remaining())
+        if reader.is_alive():
+            return None, rusage
+    return (b"".join(chunks) if reader is not None else None), rusage
 
 
 def measure_command(
@@ -41,7 +187,15 @@ def measure_command(
     input: bytes | None = None,  # noqa: A002
     timeout: float | None = None,
     gnu_time: str | None = None,
+    stdout: BinaryIO | None = None,
 ) -> tuple[OjExecInfo, subprocess.Popen[bytes]]:
+    """Run the command and measure its time and memory usage.
+
+    The memory usage is measured by ``gnu_time`` if it is given,
+    otherwise by ``os.wait4`` if it is available.
+    If ``stdout`` is given, the output of the command is written to it
+    instead of being kept in ``OjExecInfo.answer``.
+    """
     if input is not None:
         if stdin is not None:
             raise ValueError(
@@ -51,6 +205,7 @@ def measure_command(
 
     if isinstance(command, str):
         command = shlex.split(command)
+    use_rusage = gnu_time is None and HAS_RUSAGE
     with (
         contextlib.nullcontext()
         if gnu_time is None
@@ -59,11 +214,11 @@ def measure_command(
         if fh is not None:
             if gnu_time is None:
                 raise ValueError("invalid state: gnu_time is None")
-            command = [gnu_time, "-f", "%M", "-o", fh.name, "--", *command]
+            command = [gnu_time, "-f", _GNU_TIME_FORMAT, "-o", fh.name, "--", *command]
         begin = time.perf_counter()
 
         # We need kill processes called from the "time" command using process groups. Without this, orphans spawn. see https://github.com/kmyk/online-judge-tools/issues/640
-        start_new_session = gnu_time is not None and os.name == "posix"
+        start_new_session = (gnu_time is not None or use_rusage) and os.name == "posix"
 
         try:
             if env:
@@ -71,7 +226,7 @@ def measure_command(
             proc = subprocess.Popen(
                 command,
                 stdin=stdin,
-                stdout=subprocess.PIPE,
+                stdout=subprocess.PIPE if stdout is None else stdout,
                 env=env,
                 stderr=sys.stderr,
                 start_new_session=start_new_session,
@@ -83,28 +238,42 @@ def measure_command(
             logger.exception("Permission denied: %s", command)
             sys.exit(1)
         answer: bytes | None = None
+        rusage = None
+        timed_out = False
         try:
-            answer, _ = proc.communicate(input=input, timeout=timeout)
+            if use_rusage:
+                answer, rusage = _communicate_with_rusage(
+                    proc, input=input, timeout=timeout
+                )
+            else:
+                answer, _ = proc.communicate(input=input, timeout=timeout)
         except subprocess.TimeoutExpired:
-            pass
+            timed_out = True
         finally:
             if start_new_session:
-                with contextlib.suppress(ProcessLookupError):
-                    os.killpg(os.getpgid(proc.pid), signal.SIGTERM)
+                # The pid is the process group id since it is a session leader
+                with contextlib.suppress(ProcessLookupError, PermissionError):
+                    if proc.returncode is None:
+                        os.killpg(proc.pid, signal.SIGTERM)
             else:
                 proc.terminate()
 
         end = time.perf_counter()
         memory: float | None = None
+        cpu_time: float | None = None
         if fh is not None:
-            reported = fh.read().strip()
+            reported = fh.read().decode(errors="replace").strip()
             logger.debug("GNU time says:\n%s", reported)
-            if reported.strip() and reported.splitlines()[-1].isdigit():
-                memory = int(reported.splitlines()[-1]) / 1000
+            memory, cpu_time = _parse_gnu_time(reported)
+        elif rusage is not None:
+            memory = _maxrss_to_megabytes(rusage.ru_maxrss)
+            cpu_time = rusage.ru_utime + rusage.ru_stime
         return OjExecInfo(
             answer=answer,
             elapsed=end - begin,
             memory=memory,
+            cpu_time=cpu_time,
+            timed_out=timed_out,
         ), proc
 
 
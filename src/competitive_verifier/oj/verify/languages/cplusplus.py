@@ -3,9 +3,10 @@ import functools
 import os
 import pathlib
 import platform
+import re
 import shutil
 from logging import getLogger
-from typing import Any
+from typing import Any, Literal
 
 from pydantic import BaseModel
 
@@ -32,6 +33,8 @@ class OjVerifyCPlusPlusConfigEnv(BaseModel):
 
 class OjVerifyCPlusPlusConfig(OjVerifyLanguageConfig):
     environments: list[OjVerifyCPlusPlusConfigEnv] | None = None
+    include_scanner: Literal["compiler", "native"] | None = None
+    """How to list dependencies. ``native`` scans ``#include`` without the compiler"""
 
 
 class CPlusPlusLanguageEnvironment(LanguageEnvironment):
@@ -100,6 +103,145 @@ def _cplusplus_list_depending_files(
     return [pathlib.Path(path).resolve() for path in makefile_rule[1:]]
 
 
+class UndecidableIncludeError(Exception):
+    pass
+
+
+_COMMENT_OR_LITERAL_RE = re.compile(
+    r"//[^\n]*|/\*.*?\*/|\"(?:\\.|[^\"\\\n])*\"|'(?:\\.|[^'\\\n])*'",
+    re.DOTALL,
+)
+_DIRECTIVE_RE = re.compile(r"^\s*#\s*(\w+)(.*)$", re.MULTILINE)
+_INCLUDE_ARG_RE = re.compile(r'\s*(?:"([^"]+)"|<([^>]+)>)\s*$')
+
+
+def _strip_comments(code: str) -> str:
+    def _replace(m: re.Match[str]) -> str:
+        s = m.group()
+        if s.startswith("/"):
+            # keep line numbers and separate tokens
+            return " " + "\n" * s.count("\n")
+        return s
+
+    return _COMMENT_OR_LITERAL_RE.sub(_replace, code.replace("\\\n", ""))
+
+
+@functools.cache
+def _scan_include_directives(path: pathlib.Path) -> list[tuple[str, bool]]:
+    """List ``#include`` directives of the file.
+
+    Returns:
+        The pairs of the header name and whether it is quoted.
+
+    Raises:
+        UndecidableIncludeError: ``#include`` depends on the state of the preprocessor.
+    """
+    code = _strip_comments(path.read_text(encoding="utf-8", errors="replace"))
+    directives = [
+        (m.group(1), m.group(2).strip()) for m in _DIRECTIVE_RE.finditer(code)
+    ]
+
+    # #ifndef HOGE_H / #define HOGE_H at the beginning is an include guard
+    has_guard = (
+        len(directives) >= 2  # noqa: PLR2004
+        and directives[0][0] == "ifndef"
+        and directives[1][0] == "define"
+        and directives[1][1].split()[:1] == [directives[0][1]]
+    )
+
+    includes: list[tuple[str, bool]] = []
+    # True for include guards
+    conditions: list[bool] = []
+    for i, (name, arg) in enumerate(directives):
+        if name in ("if", "ifdef", "ifndef"):
+            conditions.append(has_guard and i == 0)
+        elif name in ("elif", "else", "elifdef", "elifndef"):
+            if conditions:
+                conditions[-1] = False
+        elif name == "endif":
+            if conditions:
+                conditions.pop()
+        elif name == "include":
+            if not all(conditions):
+                raise UndecidableIncludeError(
+                    f"{path}: #include in #if / #ifdef / #ifndef"
+                )
+            m = _INCLUDE_ARG_RE.match(arg)
+            if m is None:
+                raise UndecidableIncludeError(f"{path}: #include {arg}")
+            if m.group(1) is not None:
+                includes.append((m.group(1), True))
+            else:
+                includes.append((m.group(2), False))
+    return includes
+
+
+def _parse_include_dirs(
+    CXXFLAGS: list[str],
+) -> tuple[tuple[pathlib.Path, ...], tuple[pathlib.Path, ...]]:
+    """Parse ``-iquote`` and ``-I`` options.
+
+    Returns:
+        The directories for ``#include "..."`` only and the directories for both.
+    """
+    quote_dirs: list[pathlib.Path] = []
+    include_dirs: list[pathlib.Path] = []
+    it = iter(CXXFLAGS)
+    for flag in it:
+        for option, dirs in (("-iquote", quote_dirs), ("-I", include_dirs)):
+            if flag == option:
+                value = next(it, None)
+                if value is not None:
+                    dirs.append(pathlib.Path(value).resolve())
+                break
+            if flag.startswith(option):
+                dirs.append(pathlib.Path(flag[len(option) :]).resolve())
+                break
+    return tuple(quote_dirs), tuple(include_dirs)
+
+
+@functools.cache
+def _list_included_files(
+    path: pathlib.Path,
+    *,
+    quote_dirs: tuple[pathlib.Path, ...],
+    include_dirs: tuple[pathlib.Path, ...],
+) -> list[pathlib.Path]:
+    """List the headers directly included by the file except system headers."""
+    files: list[pathlib.Path] = []
+    for name, quoted in _scan_include_directives(path):
+        candidates = (
+            (path.parent, *quote_dirs, *include_dirs) if quoted else include_dirs
+        )
+        for d in candidates:
+            header = d / name
+            if header.is_file():
+                files.append(header.resolve())
+                break
+        else:
+            if quoted:
+                # The compiler looks for it in the system directories or reports an error
+                raise UndecidableIncludeError(f'{path}: #include "{name}"')
+    return files
+
+
+def cplusplus_scan_depending_files(
+    path: pathlib.Path, *, CXXFLAGS: list[str]
+) -> list[pathlib.Path]:
+    """List dependencies like ``-MM`` without running the compiler."""
+    quote_dirs, include_dirs = _parse_include_dirs(CXXFLAGS)
+    visited = {path: None}
+    stack = [path]
+    while stack:
+        for header in _list_included_files(
+            stack.pop(), quote_dirs=quote_dirs, include_dirs=include_dirs
+        ):
+            if header not in visited:
+                visited[header] = None
+                stack.append(header)
+    return list(visited)
+
+
 @functools.cache
 def _cplusplus_list_defined_macros(
     path: pathlib.Path, *, CXX: pathlib.Path, joined_CXXFLAGS: str
@@ -239,9 +381,13 @@ class CPlusPlusLanguage(Language):
         self, path: pathlib.Path, *, basedir: pathlib.Path
     ) -> list[pathlib.Path]:
         env = self._list_environments()[0]
-        joined_CXXFLAGS = " ".join(  # noqa: N806
-            map(shlex.quote, [*env.cxx_flags, "-I", str(basedir)])
-        )
+        CXXFLAGS = [*env.cxx_flags, "-I", str(basedir)]  # noqa: N806
+        if self.config.include_scanner == "native":
+            try:
+                return cplusplus_scan_depending_files(path.resolve(), CXXFLAGS=CXXFLAGS)
+            except UndecidableIncludeError as e:
+                logger.info("fallback to %s -MM: %s", env.cxx, e)
+        joined_CXXFLAGS = " ".join(map(shlex.quote, CXXFLAGS))  # noqa: N806
         return _cplusplus_list_depending_files(
             path.resolve(), CXX=env.cxx, joined_CXXFLAGS=joined_CXXFLAGS
         )
@@ -1,14 +1,18 @@
 # Python Version: 3.x
 import contextlib
+import enum
 import functools
+import hashlib
 import json
 import os
 import pathlib
 import re
 import shutil
+import tempfile
 from logging import getLogger
-from typing import Any
+from typing import Any, NamedTuple
 
+from competitive_verifier import config
 from competitive_verifier.oj.verify.utils import exec_command
 
 logger = getLogger(__name__)
@@ -165,10 +169,56 @@ TR1_LIBS = {
 }
 
 
+UNCOMMENTED_CACHE_MAX_SIZE = 1 << 26
+"""The default total size of the cached uncommented codes in bytes"""
+
+_UNCOMMENTED_CACHE_KEY_RE = re.compile(r"[0-9a-f]{64}")
+
+
+def get_uncommented_cache_dir() -> pathlib.Path:
+    return config.get_cache_dir() / "uncommented"
+
+
+def prune_uncommented_cache(max_size: int = UNCOMMENTED_CACHE_MAX_SIZE) -> None:
+    """Remove the least recently used uncommented codes to keep the total size."""
+    entries: list[tuple[int, int, pathlib.Path]] = []
+    try:
+        for entry in get_uncommented_cache_dir().glob("*/*"):
+            # skip the temporary files being written
+            if not _UNCOMMENTED_CACHE_KEY_RE.fullmatch(entry.name):
+                continue
+            try:
+                stat = entry.stat()
+            except OSError:
+                continue
+            entries.append((stat.st_mtime_ns, stat.st_size, entry))
+    except OSError:
+        return
+    total = sum(size for _, size, _ in entries)
+    for _, size, entry in sorted(entries):
+        if total <= max_size:
+            break
+        logger.debug("remove the uncommented code: %s", entry.name)
+        with contextlib.suppress(OSError):
+            entry.unlink()
+        total -= size
+
+
+@functools.cache
+def _prune_uncommented_cache_once() -> None:
+    # a run writes many small files, so the cache is scanned only at the first one
+    prune_uncommented_cache()
+
+
+@functools.cache
+def _get_compiler_version(compiler: str) -> str:
+    return exec_command([compiler, "--version"]).stdout.decode()
+
+
 @functools.cache
 def _check_compiler(compiler: str) -> str:
     # Executables named "g++" are not always g++, due to the fake g++ of macOS
-    version = exec_command([compiler, "--version"]).stdout.decode()
+    version = _get_compiler_version(compiler)
     if "clang" in version.lower() or "Apple LLVM".lower() in version.lower():
         return "clang"
     if "g++" in version.lower():
@@ -176,6 +226,31 @@ def _check_compiler(compiler: str) -> str:
     return "unknown"  # default
 
 
+def _get_uncommented_cache_path(
+    path: pathlib.Path, *, iquotes_options: tuple[str, ...], compiler: str
+) -> pathlib.Path:
+    h = hashlib.sha256()
+    for s in (_get_compiler_version(compiler), path.as_posix(), *iquotes_options):
+        h.update(s.encode())
+        h.update(b"\0")
+    h.update(path.read_bytes())
+    key = h.hexdigest()
+    return get_uncommented_cache_dir() / key[:2] / key
+
+
+def _write_uncommented_cache(cache_path: pathlib.Path, code: bytes) -> None:
+    try:
+        cache_path.parent.mkdir(parents=True, exist_ok=True)
+        # write atomically since files may be bundled concurrently
+        with tempfile.NamedTemporaryFile(dir=cache_path.parent, delete=False) as fp:
+            fp.write(code)
+        pathlib.Path(fp.name).replace(cache_path)
+    except OSError:
+        logger.warning("Failed to store the uncommented code: %s", str(cache_path))
+        return
+    _prune_uncommented_cache_once()
+
+
 @functools.cache
 def _get_uncommented_code(
     path: pathlib.Path, *, iquotes_options: tuple[str, ...], compiler: str
@@ -192,6 +267,19 @@ def _get_uncommented_code(
         raise BundleError(
             f"It's not g++. Please specify g++ with $CXX envvar.: {compiler}"
         )
+
+    # The result depends only on the compiler and the contents,
+    # so it is shared between runs keyed by them.
+    cache_path = _get_uncommented_cache_path(
+        path, iquotes_options=iquotes_options, compiler=compiler
+    )
+    with contextlib.suppress(OSError):
+        code = cache_path.read_bytes()
+        # the modification time records the last use
+        with contextlib.suppress(OSError):
+            os.utime(cache_path)
+        return code
+
     command = [
         compiler,
         "-x",
@@ -202,7 +290,10 @@ def _get_uncommented_code(
         "-E",
         str(path),
     ]
-    return exec_command(command).stdout
+    proc = exec_command(command)
+    if proc.returncode == 0:
+        _write_uncommented_cache(cache_path, proc.stdout)
+    return proc.stdout
 
 
 def get_uncommented_code(
@@ -226,6 +317,30 @@ def get_uncommented_code(
     return b"".join(lines)
 
 
+@functools.cache
+def _read_header(
+    path: pathlib.Path, *, iquotes: tuple[pathlib.Path, ...], compiler: str
+) -> tuple[tuple[bytes, ...], tuple[bytes, ...]]:
+    """Read the lines of the file and the corresponding uncommented lines.
+
+    Shared headers are included by many files, so they are read once per run.
+    """
+    code = path.read_bytes()
+    if not code.endswith(b"\n"):
+        # ファイルの末尾に改行がなかったら足す
+        code += b"\n"
+
+    lines = code.splitlines(keepends=True)
+    uncommented_lines = get_uncommented_code(
+        path, iquotes=list(iquotes), compiler=compiler
+    ).splitlines(keepends=True)
+    uncommented_lines.extend(
+        [b""] * (len(lines) - len(uncommented_lines))
+    )  # trailing comment lines are removed
+    assert len(lines) == len(uncommented_lines)
+    return tuple(lines), tuple(uncommented_lines)
+
+
 class BundleError(Exception):
     pass
 
@@ -240,6 +355,183 @@ class BundleErrorAt(BundleError):  # noqa: N818
         super().__init__(message, *args, **kwargs)
 
 
+class _HeaderLineType(enum.Enum):
+    LINE = "LINE"
+    BLANK = "BLANK"
+    PRAGMA_ONCE = "PRAGMA_ONCE"
+    GUARD_DEFINE = "GUARD_DEFINE"
+    SYSTEM_INCLUDE = "SYSTEM_INCLUDE"
+    INCLUDE = "INCLUDE"
+    ERROR = "ERROR"
+
+
+class _HeaderLine(NamedTuple):
+    type: _HeaderLineType
+    line: bytes
+    """The original line, or the error message of ``ERROR``"""
+    lineno: int
+    included: str = ""
+    toplevel: bool = True
+    """False if the line is in ``#if`` other than the include guard"""
+
+
+@functools.cache
+def _analyze_header(
+    path: pathlib.Path, *, iquotes: tuple[pathlib.Path, ...], compiler: str
+) -> tuple[_HeaderLine, ...]:
+    """Analyze the include guard, ``#pragma once`` and ``#include`` of the file.
+
+    The result depends only on the file, so it is shared between bundles.
+    The analysis ends with an ``ERROR`` line if the file is not bundlable,
+    which is raised when the bundle reaches it.
+    """
+    lines, uncommented_lines = _read_header(path, iquotes=iquotes, compiler=compiler)
+    result: list[_HeaderLine] = []
+    error: tuple[int, str] | None = None
+
+    # include guard のまわりの変数
+    # NOTE: include guard に使われたマクロがそれ以外の用途にも使われたり #undef されたりすると壊れるけど、無視します
+    non_guard_line_found = False
+    pragma_once_found = False
+    include_guard_macro = None
+    include_guard_define_found = False
+    include_guard_endif_found = False
+    preprocess_if_nest = 0
+
+    for i, (line, uncommented_line) in enumerate(
+        zip(lines, uncommented_lines, strict=False)
+    ):
+        lineno = i + 1
+        # nest の処理
+        if re.match(rb"\s*#\s*(if|ifdef|ifndef)\s.*", uncommented_line):
+            preprocess_if_nest += 1
+        if (
+            re.match(rb"\s*#\s*(else\s*|elif\s.*)", uncommented_line)
+            and preprocess_if_nest == 0
+        ):
+            error = (lineno, "unmatched #else / #elif")
+            break
+        if re.match(rb"\s*#\s*endif\s*", uncommented_line):
+            preprocess_if_nest -= 1
+            if preprocess_if_nest < 0:
+                error = (lineno, "unmatched #endif")
+                break
+        is_toplevel = preprocess_if_nest == 0 or (
+            preprocess_if_nest == 1 and include_guard_macro is not None
+        )
+
+        # #pragma once
+        if re.match(
+            rb"\s*#\s*pragma\s+once\s*", line
+        ):  # #pragma once は comment 扱いで消されてしまう
+            logger.debug("%s: line %s: #pragma once", str(path), lineno)
+            if non_guard_line_found:
+                # 先頭以外で #pragma once されてた場合は諦める
+                error = (lineno, "#pragma once found in a non-first line")
+                break
+            if include_guard_macro is not None:
+                error = (lineno, "#pragma once found in an include guard with #ifndef")
+                break
+            pragma_once_found = True
+            result.append(_HeaderLine(_HeaderLineType.PRAGMA_ONCE, line, lineno))
+            continue
+
+        matched: re.Match[bytes] | None
+        # #ifndef HOGE_H as guard
+        if (
+            not pragma_once_found
+            and not non_guard_line_found
+            and include_guard_macro is None
+        ):
+            matched = re.match(rb"\s*#\s*ifndef\s+(\w+)\s*", uncommented_line)
+            if matched:
+                include_guard_macro = matched.group(1).decode()
+                logger.debug(
+                    "%s: line %s: #ifndef %s", str(path), lineno, include_guard_macro
+                )
+                result.append(_HeaderLine(_HeaderLineType.BLANK, line, lineno))
+                continue
+
+        # #define HOGE_H as guard
+        if include_guard_macro is not None and not include_guard_define_found:
+            matched = re.match(rb"\s*#\s*define\s+(\w+)\s*", uncommented_line)
+            if matched and matched.group(1).decode() == include_guard_macro:
+                logger.debug(
+                    "%s: line %s: #define %s", str(path), lineno, include_guard_macro
+                )
+                include_guard_define_found = True
+                result.append(_HeaderLine(_HeaderLineType.GUARD_DEFINE, line, lineno))
+                continue
+
+        # #endif as guard
+        if (
+            include_guard_define_found
+            and preprocess_if_nest == 0
+            and not include_guard_endif_found
+        ) and re.match(rb"\s*#\s*endif\s*", uncommented_line):
+            include_guard_endif_found = True
+            result.append(_HeaderLine(_HeaderLineType.BLANK, line, lineno))
+            continue
+
+        if uncommented_line and not re.match(rb"^\s*$", uncommented_line):
+            non_guard_line_found = True
+            if include_guard_macro is not None and not include_guard_define_found:
+                # 先頭に #ifndef が見付かっても #define が続かないならそれは include guard ではない
+                include_guard_macro = None
+            if include_guard_endif_found:
+                # include guard の外側にコードが書かれているとまずいので検出する
+                error = (lineno, "found codes out of include guard")
+                break
+
+        # #include <...>
+        matched = re.match(rb"\s*#\s*include\s*<(.*)>\s*", uncommented_line)
+        if matched:
+            included = matched.group(1).decode()
+            logger.debug("%s: line %s: #include <%s>", str(path), lineno, included)
+            result.append(
+                _HeaderLine(
+                    _HeaderLineType.SYSTEM_INCLUDE,
+                    line,
+                    lineno,
+                    included=included,
+                    toplevel=is_toplevel,
+                )
+            )
+            continue
+
+        # #include "..."
+        matched = re.match(rb'\s*#\s*include\s*"(.*)"\s*', uncommented_line)
+        if matched:
+            included = matched.group(1).decode()
+            logger.debug('%s: line %s: #include "%s"', str(path), lineno, included)
+            if not is_toplevel:
+                # #if の中から #include されると #pragma once 系の判断が不可能になるので諦める
+                error = (
+                    lineno,
+                    "unable to process #include in #if / #ifdef / #ifndef other than include guards",
+                )
+                break
+            result.append(
+                _HeaderLine(_HeaderLineType.INCLUDE, line, lineno, included=included)
+            )
+            continue
+
+        # otherwise
+        result.append(_HeaderLine(_HeaderLineType.LINE, line, lineno))
+
+    else:
+        # #if #endif の対応が壊れてたら諦める
+        if preprocess_if_nest != 0:
+            error = (len(lines), "unmatched #if / #ifdef / #ifndef")
+        elif include_guard_macro is not None and not include_guard_endif_found:
+            error = (len(lines), "unmatched #ifndef")
+
+    if error is not None:
+        lineno, message = error
+        result.append(_HeaderLine(_HeaderLineType.ERROR, message.encode(), lineno))
+    return tuple(result)
+
+
 class Bundler:
     iquotes: list[pathlib.Path]
     pragma_once: set[pathlib.Path]
@@ -298,209 +590,80 @@ class Bundler:
             raise BundleErrorAt(path, -1, "cycle found in inclusion relations")
         self.path_stack.add(path)
         try:
-            code = path.read_bytes()
-            if not code.endswith(b"\n"):
-                # ファイルの末尾に改行がなかったら足す
-                code += b"\n"
-
-            # include guard のまわりの変数
-            # NOTE: include guard に使われたマクロがそれ以外の用途にも使われたり #undef されたりすると壊れるけど、無視します
-            non_guard_line_found = False
-            pragma_once_found = False
-            include_guard_macro = None
-            include_guard_define_found = False
-            include_guard_endif_found = False
-            preprocess_if_nest = 0
-
-            lines = code.splitlines(keepends=True)
-            uncommented_lines = get_uncommented_code(
-                path, iquotes=self.iquotes, compiler=self.compiler
-            ).splitlines(keepends=True)
-            uncommented_lines.extend(
-                [b""] * (len(lines) - len(uncommented_lines))
-            )  # trailing comment lines are removed
-            assert len(lines) == len(uncommented_lines)
+            header = _analyze_header(
+                path.resolve(),
+                iquotes=tuple(self.iquotes),
+                compiler=self.compiler,
+            )
             self._line(1, path)
-            for i, (line, uncommented_line) in enumerate(
-                zip(lines, uncommented_lines, strict=False)
-            ):
-                # nest の処理
-                if re.match(rb"\s*#\s*(if|ifdef|ifndef)\s.*", uncommented_line):
-                    preprocess_if_nest += 1
-                if (
-                    re.match(rb"\s*#\s*(else\s*|elif\s.*)", uncommented_line)
-                    and preprocess_if_nest == 0
-                ):
-                    raise BundleErrorAt(path, i + 1, "unmatched #else / #elif")
-                if re.match(rb"\s*#\s*endif\s*", uncommented_line):
-                    preprocess_if_nest -= 1
-                    if preprocess_if_nest < 0:
-                        raise BundleErrorAt(path, i + 1, "unmatched #endif")
-                is_toplevel = preprocess_if_nest == 0 or (
-                    preprocess_if_nest == 1 and include_guard_macro is not None
-                )
-
-                # #pragma once
-                if re.match(
-                    rb"\s*#\s*pragma\s+once\s*", line
-                ):  # #pragma once は comment 扱いで消されてしまう
-                    logger.debug("%s: line %s: #pragma once", str(path), i + 1)
-                    if non_guard_line_found:
-                        # 先頭以外で #pragma once されてた場合は諦める
-                        raise BundleErrorAt(
-                            path, i + 1, "#pragma once found in a non-first line"
-                        )
-                    if include_guard_macro is not None:
-                        raise BundleErrorAt(
-                            path,
-                            i + 1,
-                            "#pragma once found in an include guard with #ifndef",
-                        )
-                    if path.resolve() in self.pragma_once:
-                        return
-                    pragma_once_found = True
-                    self.pragma_once.add(path.resolve())
-                    self._line(i + 2, path)
-                    continue
-
-                matched: re.Match[bytes] | None
-                # #ifndef HOGE_H as guard
-                if (
-                    not pragma_once_found
-                    and not non_guard_line_found
-                    and include_guard_macro is None
-                ):
-                    matched = re.match(rb"\s*#\s*ifndef\s+(\w+)\s*", uncommented_line)
-                    if matched:
-                        include_guard_macro = matched.group(1).decode()
-                        logger.debug(
-                            "%s: line %s: #ifndef %s",
-                            str(path),
-                            i + 1,
-                            include_guard_macro,
-                        )
-                        self.result_lines.append(b"\n")
-                        continue
-
-                # #define HOGE_H as guard
-                if include_guard_macro is not None and not include_guard_define_found:
-                    matched = re.match(rb"\s*#\s*define\s+(\w+)\s*", uncommented_line)
-                    if matched and matched.group(1).decode() == include_guard_macro:
+            for header_line in header:
+                line = header_line.line
+                lineno = header_line.lineno
+                match header_line.type:
+                    case _HeaderLineType.ERROR:
+                        raise BundleErrorAt(path, lineno, line.decode())
+                    case _HeaderLineType.PRAGMA_ONCE:
+                        if path.resolve() in self.pragma_once:
+                            return
                         self.pragma_once.add(path.resolve())
-                        logger.debug(
-                            "%s: line %s: #define %s",
-                            str(path),
-                            i + 1,
-                            include_guard_macro,
-                        )
-                        include_guard_define_found = True
+                        self._line(lineno + 1, path)
+                    case _HeaderLineType.GUARD_DEFINE:
+                        self.pragma_once.add(path.resolve())
+                        self.result_lines.append(b"\n")
+                    case _HeaderLineType.BLANK:
                         self.result_lines.append(b"\n")
-                        continue
-
-                # #endif as guard
-                if (
-                    include_guard_define_found
-                    and preprocess_if_nest == 0
-                    and not include_guard_endif_found
-                ) and re.match(rb"\s*#\s*endif\s*", uncommented_line):
-                    include_guard_endif_found = True
-                    self.result_lines.append(b"\n")
-                    continue
-
-                if uncommented_line and not re.match(rb"^\s*$", uncommented_line):
-                    non_guard_line_found = True
-                    if (
-                        include_guard_macro is not None
-                        and not include_guard_define_found
-                    ):
-                        # 先頭に #ifndef が見付かっても #define が続かないならそれは include guard ではない
-                        include_guard_macro = None
-                    if include_guard_endif_found:
-                        # include guard の外側にコードが書かれているとまずいので検出する
-                        raise BundleErrorAt(
-                            path, i + 1, "found codes out of include guard"
+                    case _HeaderLineType.SYSTEM_INCLUDE:
+                        self._include_system(header_line, path)
+                    case _HeaderLineType.INCLUDE:
+                        self.update(
+                            self._resolve(
+                                pathlib.Path(header_line.included), included_from=path
+                            )
                         )
-
-                # #include <...>
-                matched = re.match(rb"\s*#\s*include\s*<(.*)>\s*", uncommented_line)
-                if matched:
-                    included = matched.group(1).decode()
-                    logger.debug(
-                        "%s: line %s: #include <%s>", str(path), i + 1, str(included)
-                    )
-                    if included in self.pragma_once_system:
-                        self._line(i + 2, path)
-                    elif not is_toplevel:
-                        # #pragma once 系の判断ができない場合はそっとしておく
-                        self.result_lines.append(line)
-                    elif (
-                        included in C_STANDARD_LIBS
-                        or included in CXX_STANDARD_LIBS
-                        or included in CXX_C_ORIGIN_LIBS
-                    ):
-                        if BITS_STDCXX_H in self.pragma_once_system:
-                            self._line(i + 2, path)
-                        else:
-                            self.pragma_once_system.add(included)
-                            self.result_lines.append(line)
-                    elif included in EXT_LIBS:
-                        if BITS_EXTCXX_H in self.pragma_once_system:
-                            self._line(i + 2, path)
-                        else:
-                            self.pragma_once_system.add(included)
-                            self.result_lines.append(line)
-                    elif included in TR1_LIBS:
-                        if BITS_STDTR1CXX_H in self.pragma_once_system:
-                            self._line(i + 2, path)
-                        else:
-                            self.pragma_once_system.add(included)
-                            self.result_lines.append(line)
-                    else:
-                        # possibly: bits/*, tr2/* boost/*, c-posix library, etc.
-                        self.pragma_once_system.add(included)
+                        self._line(lineno + 1, path)
+                        # #include "iostream" みたいに書いたときの挙動をはっきりさせる
+                        # #include <iostream> /* とかをやられた場合を落とす
+                    case _HeaderLineType.LINE:
                         self.result_lines.append(line)
-                        if included in [BITS_EXTCXX_H, BITS_STDTR1CXX_H]:
-                            self.pragma_once_system.add(BITS_STDCXX_H)
-                    continue
-
-                # #include "..."
-                matched = re.match(rb'\s*#\s*include\s*"(.*)"\s*', uncommented_line)
-                if matched:
-                    included = matched.group(1).decode()
-                    logger.debug(
-                        '%s: line %s: #include "%s"', str(path), i + 1, included
-                    )
-                    if not is_toplevel:
-                        # #if の中から #include されると #pragma once 系の判断が不可能になるので諦める
-                        raise BundleErrorAt(
-                            path,
-                            i + 1,
-                            "unable to process #include in #if / #ifdef / #ifndef other than include guards",
-                        )
-                    self.update(
-                        self._resolve(pathlib.Path(included), included_from=path)
-                    )
-                    self._line(i + 2, path)
-                    # #include "iostream" みたいに書いたときの挙動をはっきりさせる
-                    # #include <iostream> /* とかをやられた場合を落とす
-                    continue
-
-                # otherwise
-                self.result_lines.append(line)
-
-            # #if #endif の対応が壊れてたら諦める
-            last_index = i + 1  # pyright: ignore[reportPossiblyUnboundVariable]
-
-            if preprocess_if_nest != 0:
-                raise BundleErrorAt(
-                    path, last_index, "unmatched #if / #ifdef / #ifndef"
-                )
-            if include_guard_macro is not None and not include_guard_endif_found:
-                raise BundleErrorAt(path, last_index, "unmatched #ifndef")
-
         finally:
             # 中で return することがあるので finally 節に入れておく
             self.path_stack.remove(path)
 
+    def _include_system(self, header_line: _HeaderLine, path: pathlib.Path) -> None:
+        included = header_line.included
+        if included in self.pragma_once_system:
+            self._line(header_line.lineno + 1, path)
+        elif not header_line.toplevel:
+            # #pragma once 系の判断ができない場合はそっとしておく
+            self.result_lines.append(header_line.line)
+        elif (
+            included in C_STANDARD_LIBS
+            or included in CXX_STANDARD_LIBS
+            or included in CXX_C_ORIGIN_LIBS
+        ):
+            if BITS_STDCXX_H in self.pragma_once_system:
+                self._line(header_line.lineno + 1, path)
+            else:
+                self.pragma_once_system.add(included)
+                self.result_lines.append(header_line.line)
+        elif included in EXT_LIBS:
+            if BITS_EXTCXX_H in self.pragma_once_system:
+                self._line(header_line.lineno + 1, path)
+            else:
+                self.pragma_once_system.add(included)
+                self.result_lines.append(header_line.line)
+        elif included in TR1_LIBS:
+            if BITS_STDTR1CXX_H in self.pragma_once_system:
+                self._line(header_line.lineno + 1, path)
+            else:
+                self.pragma_once_system.add(included)
+                self.result_lines.append(header_line.line)
+        else:
+            # possibly: bits/*, tr2/* boost/*, c-posix library, etc.
+            self.pragma_once_system.add(included)
+            self.result_lines.append(header_line.line)
+            if included in [BITS_EXTCXX_H, BITS_STDTR1CXX_H]:
+                self.pragma_once_system.add(BITS_STDCXX_H)
+
     def get(self) -> bytes:
         return b"".join(self.result_lines)
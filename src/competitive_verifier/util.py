@@ -1,3 +1,4 @@
+import hashlib
 import pathlib
 from os import PathLike
 from typing import Any
@@ -21,3 +22,12 @@ def read_text_normalized(path: PathLike[Any]) -> str:
 
 def normalize_bytes_text(b: bytes) -> str:
     return str(from_bytes(b).best())
+
+
+def hash_file(path: PathLike[Any]) -> str:
+    """Calculate the SHA-256 hex digest of the file contents."""
+    h = hashlib.sha256()
+    with pathlib.Path(path).open("rb") as fp:
+        while chunk := fp.read(1 << 20):
+            h.update(chunk)
+    return h.hexdigest()
@@ -0,0 +1,227 @@
+import functools
+import hashlib
+import json
+import os
+import pathlib
+import re
+import shlex
+import shutil
+from logging import getLogger
+
+from competitive_verifier import config, oj
+from competitive_verifier.exec import exec_command
+from competitive_verifier.models import (
+    CommandVerification,
+    ProblemVerification,
+    ShellCommand,
+    Verification,
+)
+from competitive_verifier.oj.tools.manifest import MANIFEST_FILE_NAME
+
+logger = getLogger(__name__)
+
+_FILES_JSON = "files.json"
+
+DEFAULT_MAX_SIZE = 1 << 30
+"""The default total size of the cached artifacts in bytes"""
+
+# `--version` of these programs prints the version without side effects.
+# e.g. g++, g++-13, clang++-17, python3.12, rustc.exe
+_KNOWN_COMPILER_RE = re.compile(
+    r"(gcc|g\+\+|cc|c\+\+|clang|clang\+\+|rustc|cargo|go|javac|kotlinc|ghc"
+    r"|python|python3|pypy|pypy3|nim|dmd|ldc2|dotnet|swiftc)"
+    r"(-?[0-9][0-9.]*)?(\.exe)?"
+)
+
+# the downloaded files in the directory of a problem are not artifacts
+_EXCLUDED_NAMES = frozenset({"test", "test.partial", MANIFEST_FILE_NAME})
+
+
+def get_compile_cache_dir() -> pathlib.Path:
+    return config.get_cache_dir() / "compiled"
+
+
+def _get_workdir(
+    verification: ProblemVerification | CommandVerification,
+) -> pathlib.Path | None:
+    """The directory into which the compile command writes its artifacts."""
+    if isinstance(verification, ProblemVerification):
+        return oj.get_directory(verification.problem)
+    return verification.tempdir
+
+
+def _get_program(command: ShellCommand) -> str | None:
+    args = (
+        shlex.split(command.command)
+        if isinstance(command.command, str)
+        else command.command
+    )
+    for i, arg in enumerate(args):
+        # skip `env` and assignments of environment variables
+        if (i == 0 and arg == "env") or "=" in arg:
+            continue
+        return arg
+    return None
+
+
+@functools.cache
+def _get_compiler_version(program: str) -> str:
+    """Get the version of the compiler.
+
+    Only the known compilers are run, since the first word of a compile command
+    may be a script or ``make`` which does something with ``--version``.
+    """
+    if not _KNOWN_COMPILER_RE.fullmatch(pathlib.PurePath(program).name):
+        return ""
+    try:
+        return exec_command(
+            [program, "--version"], text=True, capture_output=True
+        ).stdout
+    except OSError:
+        return ""
+
+
+def _snapshot(workdir: pathlib.Path) -> dict[pathlib.Path, int]:
+    """The modification times of the files which the compile command may write."""
+    result: dict[pathlib.Path, int] = {}
+    for root, dirs, files in os.walk(workdir):
+        root_path = pathlib.Path(root)
+        if root_path == workdir:
+            dirs[:] = [d for d in dirs if d not in _EXCLUDED_NAMES]
+            files = [f for f in files if f not in _EXCLUDED_NAMES]  # noqa: PLW2901
+        for f in files:
+            p = root_path / f
+            result[p.relative_to(workdir)] = p.stat().st_mtime_ns
+    return result
+
+
+def _get_entry_size(entry: pathlib.Path) -> int:
+    return sum(p.stat().st_size for p in entry.rglob("*") if p.is_file())
+
+
+class CompileCache:
+    """Cache of compiled artifacts.
+
+    The artifacts are the files which the compile command creates or updates
+    in the working directory of the verification. They are keyed by
+    the compile command, the version of the compiler
+    and the contents of all files the source depends on.
+
+    The least recently used entries are removed
+    when the total size exceeds ``max_size``.
+    """
+
+    directory: pathlib.Path
+    max_size: int
+
+    def __init__(
+        self,
+        directory: pathlib.Path | None = None,
+        *,
+        max_size: int = DEFAULT_MAX_SIZE,
+    ) -> None:
+        self.directory = directory or get_compile_cache_dir()
+        self.max_size = max_size
+
+    def get_key(self, command: ShellCommand, *, sources_digest: str) -> str:
+        program = _get_program(command)
+        h = hashlib.sha256()
+        h.update(command.model_dump_json().encode())
+        h.update(b"\0")
+        h.update(_get_compiler_version(program).encode() if program else b"")
+        h.update(b"\0")
+        h.update(sources_digest.encode())
+        return h.hexdigest()
+
+    def restore(self, key: str, workdir: pathlib.Path) -> bool:
+        entry = self.directory / key
+        try:
+            files: list[str] = json.loads(
+                (entry / _FILES_JSON).read_text(encoding="utf-8")
+            )
+            workdir.mkdir(parents=True, exist_ok=True)
+            for f in files:
+                dst = workdir / f
+                dst.parent.mkdir(parents=True, exist_ok=True)
+                shutil.copy2(entry / f, dst)
+            # the modification time of files.json records the last use
+            (entry / _FILES_JSON).touch()
+        except (OSError, ValueError):
+            logger.debug("compile cache is not available: %s", key, exc_info=True)
+            return False
+        return True
+
+    def prune(self) -> None:
+        """Remove the least recently used entries to keep the total size."""
+        entries: list[tuple[int, int, pathlib.Path]] = []
+        try:
+            for entry in self.directory.iterdir():
+                try:
+                    last_used = (entry / _FILES_JSON).stat().st_mtime_ns
+                except OSError:
+                    # the entry may be being stored
+                    continue
+                entries.append((last_used, _get_entry_size(entry), entry))
+        except OSError:
+            return
+        total = sum(size for _, size, _ in entries)
+        for _, size, entry in sorted(entries):
+            if total <= self.max_size:
+                break
+            logger.debug("remove the compile cache: %s", entry.name)
+            shutil.rmtree(entry, ignore_errors=True)
+            total -= size
+
+    def store(
+        self,
+        key: str,
+        workdir: pathlib.Path,
+        *,
+        before: dict[pathlib.Path, int],
+    ) -> None:
+        files = [p for p, mtime in _snapshot(workdir).items() if before.get(p) != mtime]
+        if not files:
+            return
+        entry = self.directory / key
+        try:
+            for f in files:
+                dst = entry / f
+                dst.parent.mkdir(parents=True, exist_ok=True)
+                shutil.copy2(workdir / f, dst)
+            # files.json is written at last because it marks the entry completed
+            (entry / _FILES_JSON).write_text(
+                json.dumps([f.as_posix() for f in files]), encoding="utf-8"
+            )
+        except OSError:
+            logger.warning("Failed to store the compile cache: %s", key)
+            shutil.rmtree(entry, ignore_errors=True)
+            return
+        self.prune()
+
+    def run_compile_command(
+        self,
+        verification: Verification,
+        *,
+        sources_digest: str,
+    ) -> bool:
+        """Run the compile command unless its artifacts are cached."""
+        if (
+            not isinstance(verification, (ProblemVerification, CommandVerification))
+            or verification.compile is None
+            or (workdir := _get_workdir(verification)) is None
+        ):
+            return verification.run_compile_command()
+
+        key = self.get_key(
+            ShellCommand.parse_command_like(verification.compile),
+            sources_digest=sources_digest,
+        )
+        if self.restore(key, workdir):
+            logger.info("compile cache hit: %s", key)
+            return True
+
+        before = _snapshot(workdir)
+        if not verification.run_compile_command():
+            return False
+        self.store(key, workdir, before=before)
+        return True
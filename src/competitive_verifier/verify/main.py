@@ -20,6 +20,8 @@ from competitive_verifier.models import (
     VerifyCommandResult,
 )
 
+from .compile_cache import CompileCache
+from .split_state import SplitStrategy
 from .verifier import SplitState, Verifier
 
 logger = getLogger(__name__)
@@ -38,15 +40,22 @@ class Verify(
     timeout: float = math.inf
     default_tle: float | None = None
     default_mle: float | None = None
+    tle_by_cpu_time: bool = False
 
     prev_result: pathlib.Path | None = None
 
     download: bool = True
+    compile_cache: bool = False
 
     output: pathlib.Path | None = None
 
     split: int | None = None
     split_index: int | None = None
+    split_strategy: SplitStrategy = "count"
+
+    jobs: int = 1
+    testcase_jobs: int = 1
+    pin_cpu: bool = False
 
     @field_validator("timeout", mode="after")
     @classmethod
@@ -69,7 +78,9 @@ class Verify(
                 raise VerifierError(
                     "--split-index must be greater than 0 and less than --split."
                 )
-            return SplitState(size=split, index=split_index)
+            return SplitState(
+                size=split, index=split_index, strategy=self.split_strategy
+            )
 
         if split is not None:
             raise VerifierError("--split argument requires --split-index argument.")
@@ -102,6 +113,11 @@ class Verify(
             default=None,
             help="Threshold memory usage (MB) to be MLE",
         )
+        parser.add_argument(
+            "--tle-by-cpu-time",
+            action="store_true",
+            help="Judge TLE by the CPU time instead of the wall-clock time",
+        )
         parser.add_argument(
             "--prev-result",
             type=pathlib.Path,
@@ -115,6 +131,11 @@ class Verify(
             dest="download",
             help="Suppress `oj download`",
         )
+        parser.add_argument(
+            "--compile-cache",
+            action="store_true",
+            help="Reuse compiled artifacts if the sources and the compiler are unchanged",
+        )
         parser.add_argument(
             "--output",
             "-o",
@@ -135,6 +156,32 @@ class Verify(
             help="Parallel job index",
             required=False,
         )
+        parallel_group.add_argument(
+            "--split-strategy",
+            choices=["count", "cost"],
+            default="count",
+            help="How to split the files. "
+            "`count` splits them into chunks of the same size. "
+            "`cost` balances the elapsed times in --prev-result",
+        )
+        parallel_group.add_argument(
+            "--jobs",
+            "-j",
+            type=int,
+            default=1,
+            help="The number of files verified at the same time",
+        )
+        parallel_group.add_argument(
+            "--testcase-jobs",
+            type=int,
+            default=1,
+            help="The number of test cases executed at the same time",
+        )
+        parallel_group.add_argument(
+            "--pin-cpu",
+            action="store_true",
+            help="Pin each test case executor to a dedicated CPU (Linux only)",
+        )
 
     def _run(self) -> bool:
         logger.debug("arguments:%s", self)
@@ -155,6 +202,11 @@ class Verify(
             default_mle=self.default_mle,
             prev_result=prev_result,
             split_state=self.split_state,
+            jobs=self.jobs,
+            testcase_jobs=self.testcase_jobs,
+            pin_cpu=self.pin_cpu,
+            tle_by_cpu_time=self.tle_by_cpu_time,
+            compile_cache=CompileCache() if self.compile_cache else None,
         )
         result = verifier.verify(download=self.download)
         self.write_result(result)
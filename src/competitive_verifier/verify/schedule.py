@@ -0,0 +1,59 @@
+import pathlib
+from typing import TypeVar
+
+from competitive_verifier.models import FileResult, ResultStatus, VerifyCommandResult
+
+T = TypeVar("T")
+
+
+def estimate_cost(file_result: FileResult | None) -> float | None:
+    """Estimate the seconds to verify the file from the previous result.
+
+    The verifications which were skipped, including those interrupted by the timeout,
+    have only a part of the elapsed time, so the cost of such a file is unknown.
+
+    Returns:
+        ``None`` if the previous result has no complete elapsed time.
+    """
+    if file_result is None or not file_result.verifications:
+        return None
+    if any(r.status == ResultStatus.SKIPPED for r in file_result.verifications):
+        return None
+    return sum(r.elapsed for r in file_result.verifications)
+
+
+def has_passed(file_result: FileResult | None) -> bool:
+    """Whether all verifications of the file succeeded in the previous result."""
+    return (
+        file_result is not None
+        and bool(file_result.verifications)
+        and all(r.status == ResultStatus.SUCCESS for r in file_result.verifications)
+    )
+
+
+def schedule_by_history(
+    files: dict[pathlib.Path, T],
+    prev_result: VerifyCommandResult | None,
+) -> dict[pathlib.Path, T]:
+    """Order the files to complete as many verifications as possible before a deadline.
+
+    The files which have never passed are verified first,
+    since their results are the most informative.
+    The others follow in ascending order of the elapsed time in ``prev_result``.
+
+    Args:
+        files: The files to be verified
+        prev_result: The previous result
+
+    Returns:
+        The same files in the order of verification
+    """
+    prev_files = prev_result.files if prev_result else {}
+
+    def key(path: pathlib.Path) -> tuple[bool, float, pathlib.Path]:
+        file_result = prev_files.get(path)
+        cost = estimate_cost(file_result)
+        # the files without history are assumed to be cheap
+        return has_passed(file_result), cost or 0.0, path
+
+    return {p: files[p] for p in sorted(files, key=key)}
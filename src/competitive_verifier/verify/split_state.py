@@ -1,13 +1,24 @@
-from typing import TypeVar
+import heapq
+import statistics
+from collections.abc import Sequence
+from typing import Literal, TypeVar
 
 from pydantic import BaseModel
 
 T = TypeVar("T")
 
+SplitStrategy = Literal["count", "cost"]
+
 
 class SplitState(BaseModel):
     size: int
     index: int
+    strategy: SplitStrategy = "count"
+    """How to split the files.
+
+    ``count`` splits them into chunks of the same size
+    and ``cost`` balances the chunks by the costs of the files.
+    """
 
     def __str__(self) -> str:
         return f"{self.index}/{self.size}"
@@ -41,3 +52,45 @@ class SplitState(BaseModel):
         from_index = len(lst) * self.index // self.size
         to_index = len(lst) * (self.index + 1) // self.size
         return lst[from_index:to_index]
+
+    def split_by_cost(
+        self,
+        lst: list[T],
+        costs: Sequence[float | None],
+    ) -> list[T]:
+        """Split list balancing the total costs of the chunks.
+
+        The items are assigned by the longest-processing-time-first rule:
+        the most costly item goes to the chunk with the least total cost.
+        The result depends only on the arguments,
+        so every job computes the same assignment.
+
+        Args:
+            lst (list[T]): Target list
+            costs (Sequence[float | None]): The costs of the items.
+                ``None`` is regarded as the median of the known costs.
+
+        Returns:
+            list[T]: Splited list in the original order
+
+        Example:
+            state = SplitState(size=2, index=0, strategy="cost")
+            assert state.split_by_cost([0, 1, 2, 3], [5, 1, 1, 3]) == [0]
+            state = SplitState(size=2, index=1, strategy="cost")
+            assert state.split_by_cost([0, 1, 2, 3], [5, 1, 1, 3]) == [1, 2, 3]
+        """
+        if len(lst) != len(costs):
+            raise ValueError("lst and costs must have the same length.")
+        known = [c for c in costs if c is not None]
+        default = statistics.median(known) if known else 1.0
+        filled = [default if c is None else c for c in costs]
+
+        # (total cost, chunk index); ties are broken by the index
+        chunks = [(0.0, i) for i in range(self.size)]
+        assigned: list[int] = []
+        for i in sorted(range(len(lst)), key=lambda i: (-filled[i], i)):
+            total, chunk = heapq.heappop(chunks)
+            if chunk == self.index:
+                assigned.append(i)
+            heapq.heappush(chunks, (total + filled[i], chunk))
+        return [lst[i] for i in sorted(assigned)]
@@ -1,15 +1,21 @@
+import concurrent.futures
 import datetime
+import hashlib
+import math
 import pathlib
+import threading
 import time
-import traceback
 from abc import ABC, abstractmethod
 from functools import cached_property
 from logging import getLogger
 
-from competitive_verifier import git, github, log
+from competitive_verifier import git, github, log, oj
 from competitive_verifier.download import download_files as run_download
+from competitive_verifier.download import parse_urls
 from competitive_verifier.models import (
+    CommandVerification,
     FileResult,
+    ProblemVerification,
     ResultStatus,
     VerifcationTimeoutError,
     Verification,
@@ -20,6 +26,9 @@ from competitive_verifier.models import (
     VerifyCommandResult,
 )
 from competitive_verifier.resource import ulimit_stack
+from competitive_verifier.util import hash_file
+from competitive_verifier.verify.compile_cache import CompileCache
+from competitive_verifier.verify.schedule import estimate_cost, schedule_by_history
 from competitive_verifier.verify.split_state import SplitState
 
 logger = getLogger(__name__)
@@ -43,10 +52,70 @@ class InputContainer(ABC):
         self.verification_time = verification_time
         self.prev_result = prev_result
         self.split_state = split_state
+        self._file_hashes: dict[pathlib.Path, str] = {}
 
     @abstractmethod
     def get_file_timestamp(self, path: pathlib.Path) -> datetime.datetime: ...
 
+    def _hash_file(self, path: pathlib.Path) -> str:
+        h = self._file_hashes.get(path)
+        if h is None:
+            h = self._file_hashes[path] = hash_file(path) if path.exists() else ""
+        return h
+
+    def dependencies_digest(self, path: pathlib.Path) -> str:
+        """The digest of the contents of all files which the file depends on."""
+        h = hashlib.sha256()
+        for dep in sorted(self.verifications.transitive_depends_on[path]):
+            h.update(dep.as_posix().encode())
+            h.update(b"\0")
+            h.update(self._hash_file(dep).encode())
+            h.update(b"\0")
+        return h.hexdigest()
+
+    def get_verification_digest(
+        self,
+        path: pathlib.Path,
+        verification: Verification,
+    ) -> str | None:
+        """The digest to decide whether the result of the verification is reusable.
+
+        Returns:
+            ``None`` if the digest is not used.
+        """
+        return None
+
+    def content_digest(self, path: pathlib.Path, verification: Verification) -> str:
+        """The digest of the contents of the dependencies and the verification."""
+        h = hashlib.sha256()
+        h.update(self.dependencies_digest(path).encode())
+        h.update(b"\0")
+        h.update(verification.model_dump_json().encode())
+        return h.hexdigest()
+
+    def _need_verification_by_digest(
+        self,
+        path: pathlib.Path,
+        file_result: FileResult,
+    ) -> bool | None:
+        """Compare the digests with the previous result.
+
+        Returns:
+            ``None`` if the digests are not available.
+        """
+        file = self.verifications.files.get(path)
+        prev_digests = [r.digest for r in file_result.verifications]
+        if file is None or not prev_digests or None in prev_digests:
+            return None
+        digests = [
+            self.get_verification_digest(path, v) for v in file.verification_list
+        ]
+        if None in digests:
+            return None
+        if digests != prev_digests:
+            return True
+        return any(r.status != ResultStatus.SUCCESS for r in file_result.verifications)
+
     def file_need_verification(
         self,
         path: pathlib.Path,
@@ -54,6 +123,15 @@ class InputContainer(ABC):
     ) -> bool:
         if not path.exists():
             return False
+        result = self._need_verification_by_digest(path, file_result)
+        if result is not None:
+            logger.info(
+                "%s %s verification. digest: %s",
+                path.as_posix(),
+                "needs" if result else "doesn't need",
+                "changed" if result else "unchanged",
+            )
+            return result
         base_time = min(self.verification_time, self.get_file_timestamp(path))
         result = file_result.need_verification(base_time)
         if result:
@@ -118,6 +196,13 @@ class InputContainer(ABC):
         lst = [(p, f) for p, f in self.remaining_verification_files.items()]
         lst.sort(key=lambda tup: tup[0])
 
+        if self.split_state.strategy == "cost":
+            prev_files = self.prev_result.files if self.prev_result else {}
+            return dict(
+                self.split_state.split_by_cost(
+                    lst, [estimate_cost(prev_files.get(p)) for p, _ in lst]
+                )
+            )
         return dict(self.split_state.split(lst))
 
 
@@ -126,8 +211,14 @@ class BaseVerifier(InputContainer):
     default_tle: float | None
     default_mle: float | None
     split_state: SplitState | None
+    jobs: int
+    testcase_jobs: int
+    pin_cpu: bool
+    tle_by_cpu_time: bool
+    compile_cache: CompileCache | None
 
     _result: VerifyCommandResult | None
+    _workdir_locks: dict[str | pathlib.Path, threading.Lock]
 
     def __init__(
         self,
@@ -139,6 +230,11 @@ class BaseVerifier(InputContainer):
         prev_result: VerifyCommandResult | None,
         split_state: SplitState | None,
         verification_time: datetime.datetime | None = None,
+        jobs: int = 1,
+        testcase_jobs: int = 1,
+        pin_cpu: bool = False,
+        tle_by_cpu_time: bool = False,
+        compile_cache: CompileCache | None = None,
     ) -> None:
         super().__init__(
             verifications=verifications,
@@ -146,11 +242,22 @@ class BaseVerifier(InputContainer):
             prev_result=prev_result,
             split_state=split_state,
         )
+        if jobs < 1:
+            raise VerifierError("--jobs must be greater than 0.")
+        if testcase_jobs < 1:
+            raise VerifierError("--testcase-jobs must be greater than 0.")
         self._input = verifications
         self.timeout = timeout
         self.default_tle = default_tle
         self.default_mle = default_mle
+        self.jobs = jobs
+        self.testcase_jobs = testcase_jobs
+        self.pin_cpu = pin_cpu
+        self.tle_by_cpu_time = tle_by_cpu_time
+        self.compile_cache = compile_cache
         self._result = None
+        self._workdir_locks = {}
+        self._workdir_locks_guard = threading.Lock()
 
     @property
     def force_result(self) -> VerifyCommandResult:
@@ -202,7 +309,8 @@ class BaseVerifier(InputContainer):
                 if prev_time > deadline:
                     raise VerifcationTimeoutError  # noqa: TRY301
 
-                rs, error_message = self.run_verification(ve, deadline=deadline)
+                digest = self.get_verification_digest(p, ve)
+                rs, error_message = self.run_verification(ve, deadline=deadline, path=p)
                 if error_message:
                     logger.error("%s: %s, %s", error_message, p, repr(ve))
                     if github.env.is_in_github_actions():
@@ -210,9 +318,9 @@ class BaseVerifier(InputContainer):
                             message=f"{error_message} {p.as_posix()}",
                             file=str(p.resolve()),
                         )
-                verifications.append(
-                    self.create_command_result(rs, prev_time, name=ve.name)
-                )
+                result = self.create_command_result(rs, prev_time, name=ve.name)
+                result.digest = digest
+                verifications.append(result)
             except VerifcationTimeoutError:
                 logger.warning("Skip[Timeout]: %s, %s", p, repr(ve))
                 verifications.append(
@@ -227,7 +335,6 @@ class BaseVerifier(InputContainer):
                     e.message if isinstance(e, VerifierError) else "Failed to verify"
                 )
                 logger.exception("%s: %s, %s", message, p, repr(ve))
-                traceback.print_exc()
                 verifications.append(
                     self.create_command_result(
                         ResultStatus.FAILURE,
@@ -237,12 +344,58 @@ class BaseVerifier(InputContainer):
                 )
         return verifications
 
+    def _verify_file_in_worker(
+        self,
+        p: pathlib.Path,
+        f: VerificationFile,
+        *,
+        download: bool,
+        deadline: float,
+    ) -> FileResult:
+        with log.deferred_group(f"Verify: {p.as_posix()}"):
+            return FileResult(
+                verifications=self._enumerate_verifications(
+                    p,
+                    f,
+                    download=download,
+                    deadline=deadline,
+                )
+            )
+
+    def _verify_parallel(
+        self,
+        files: dict[pathlib.Path, VerificationFile],
+        *,
+        download: bool,
+        deadline: float,
+    ) -> dict[pathlib.Path, FileResult]:
+        with (
+            log.enable_deferred_groups(),
+            concurrent.futures.ThreadPoolExecutor(max_workers=self.jobs) as executor,
+        ):
+            futures = {
+                p: executor.submit(
+                    self._verify_file_in_worker,
+                    p,
+                    f,
+                    download=download,
+                    deadline=deadline,
+                )
+                for p, f in files.items()
+            }
+        return {p: future.result() for p, future in futures.items()}
+
     def verify(self, *, download: bool = True) -> VerifyCommandResult:
         start_time = time.perf_counter()
         deadline = start_time + self.timeout
 
         with log.group("current_verification_files"):
             current_verification_files = self.current_verification_files
+            if math.isfinite(self.timeout):
+                # verify the files which are likely to complete in the time limit first
+                current_verification_files = schedule_by_history(
+                    current_verification_files, self.prev_result
+                )
         logger.info(
             "current_verification_files: %s",
             " ".join(p.as_posix() for p in current_verification_files),
@@ -251,6 +404,11 @@ class BaseVerifier(InputContainer):
             ulimit_stack()
         except BaseException:  # noqa: BLE001
             logger.warning("failed to increase the stack size[ulimit]")
+        if download:
+            # the test cases of Library Checker are generated in parallel in advance
+            oj.generate_library_checker_problems(
+                parse_urls(current_verification_files.values())
+            )
 
         file_results: dict[pathlib.Path, FileResult] = (
             {
@@ -262,16 +420,25 @@ class BaseVerifier(InputContainer):
             else {}
         )
 
-        for p, f in current_verification_files.items():
-            with log.group(f"Verify: {p.as_posix()}"):
-                file_results[p] = FileResult(
-                    verifications=self._enumerate_verifications(
-                        p,
-                        f,
-                        download=download,
-                        deadline=deadline,
-                    )
+        if self.jobs > 1:
+            file_results.update(
+                self._verify_parallel(
+                    current_verification_files,
+                    download=download,
+                    deadline=deadline,
                 )
+            )
+        else:
+            for p, f in current_verification_files.items():
+                with log.group(f"Verify: {p.as_posix()}"):
+                    file_results[p] = FileResult(
+                        verifications=self._enumerate_verifications(
+                            p,
+                            f,
+                            download=download,
+                            deadline=deadline,
+                        )
+                    )
 
         sippable_file_results = self.skippable_results()
         self._result = VerifyCommandResult(
@@ -285,24 +452,61 @@ class BaseVerifier(InputContainer):
         verification: Verification,
         *,
         deadline: float = float("inf"),
+        path: pathlib.Path | None = None,
     ) -> tuple[ResultStatus | VerificationResult, str | None]:
         """Run verification.
 
+        Args:
+            verification: The verification to run
+            deadline: The deadline of verification in ``time.perf_counter()``
+            path: The path of verified file. It is required to use the compile cache.
+
         Returns:
             tuple[ResultStatus, Optional[str]]: (Result, error_message)
         """
-        if not verification.run_compile_command():
-            return ResultStatus.FAILURE, "Failed to compile"
+        with self._workdir_lock(verification):
+            if not self._run_compile_command(verification, path=path):
+                return ResultStatus.FAILURE, "Failed to compile"
 
-        if time.perf_counter() > deadline:
-            raise VerifcationTimeoutError
+            if time.perf_counter() > deadline:
+                raise VerifcationTimeoutError
 
-        rs = verification.run(self, deadline=deadline)
+            rs = verification.run(self, deadline=deadline)
 
         if rs.status != ResultStatus.SUCCESS:
             return rs, "Failed to test"
         return rs, None
 
+    def _run_compile_command(
+        self,
+        verification: Verification,
+        *,
+        path: pathlib.Path | None,
+    ) -> bool:
+        if self.compile_cache is None or path is None:
+            return verification.run_compile_command()
+        return self.compile_cache.run_compile_command(
+            verification,
+            sources_digest=self.dependencies_digest(path),
+        )
+
+    def _workdir_lock(self, verification: Verification) -> threading.Lock:
+        """The lock for the directory shared between verifications.
+
+        Verifications of the same problem compile into the same directory,
+        so they must not run at the same time.
+        """
+        key: str | pathlib.Path | None = None
+        if isinstance(verification, ProblemVerification):
+            # different URLs of the same problem share the directory
+            key = oj.get_directory(verification.problem)
+        elif isinstance(verification, CommandVerification):
+            key = verification.tempdir
+        with self._workdir_locks_guard:
+            if key is None:
+                return threading.Lock()
+            return self._workdir_locks.setdefault(key, threading.Lock())
+
     def skippable_results(self) -> dict[pathlib.Path, FileResult]:
         """Run skippable verification."""
         results = dict[pathlib.Path, FileResult]()
@@ -313,7 +517,7 @@ class BaseVerifier(InputContainer):
                 prev_time = time.perf_counter()
 
                 for v in f.verification_list:
-                    rs = self.run_verification(v)[0]
+                    rs = self.run_verification(v, path=p)[0]
                     verifications.append(
                         self.create_command_result(rs, prev_time, name=v.name)
                     )
@@ -356,6 +560,11 @@ class Verifier(BaseVerifier):
         split_state: SplitState | None,
         verification_time: datetime.datetime | None = None,
         use_git_timestamp: bool,
+        jobs: int = 1,
+        testcase_jobs: int = 1,
+        pin_cpu: bool = False,
+        tle_by_cpu_time: bool = False,
+        compile_cache: CompileCache | None = None,
     ) -> None:
         super().__init__(
             verifications=verifications,
@@ -365,9 +574,21 @@ class Verifier(BaseVerifier):
             timeout=timeout,
             default_tle=default_tle,
             default_mle=default_mle,
+            jobs=jobs,
+            testcase_jobs=testcase_jobs,
+            pin_cpu=pin_cpu,
+            tle_by_cpu_time=tle_by_cpu_time,
+            compile_cache=compile_cache,
         )
         self.use_git_timestamp = use_git_timestamp
 
+    def get_verification_digest(
+        self,
+        path: pathlib.Path,
+        verification: Verification,
+    ) -> str:
+        return self.content_digest(path, verification)
+
     def get_file_timestamp(self, path: pathlib.Path) -> datetime.datetime:
         if self.use_git_timestamp:
             return git.get_commit_time(self.verifications.transitive_depends_on[path])
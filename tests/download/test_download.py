@@ -1,5 +1,9 @@
 import os
 import pathlib
+import threading
+import time
+import urllib.parse
+from collections import Counter
 from dataclasses import dataclass
 
 import pytest
@@ -12,8 +16,9 @@ from competitive_verifier.oj.tools import service
 
 @dataclass
 class MockProblem:
-    download_system_cases: MockType
+    download_system_cases_to: MockType
     generate_test_cases_in_cloned_repository: MockType | None = None
+    generate_test_cases: MockType | None = None
 
 
 @pytest.fixture
@@ -27,16 +32,16 @@ def mock_problem(mocker: MockerFixture, monkeypatch: pytest.MonkeyPatch):
 
     return {
         service.YukicoderProblem: MockProblem(
-            download_system_cases=mocker.patch.object(
+            download_system_cases_to=mocker.patch.object(
                 service.YukicoderProblem,
-                "download_system_cases",
+                "download_system_cases_to",
                 return_value=[],
             ),
         ),
         service.LibraryCheckerProblem: MockProblem(
-            download_system_cases=mocker.patch.object(
+            download_system_cases_to=mocker.patch.object(
                 service.LibraryCheckerProblem,
-                "download_system_cases",
+                "download_system_cases_to",
                 return_value=[],
             ),
             generate_test_cases_in_cloned_repository=mocker.patch.object(
@@ -44,6 +49,11 @@ def mock_problem(mocker: MockerFixture, monkeypatch: pytest.MonkeyPatch):
                 "generate_test_cases_in_cloned_repository",
                 return_value=None,
             ),
+            generate_test_cases=mocker.patch.object(
+                service.LibraryCheckerProblem,
+                "generate_test_cases",
+                return_value=None,
+            ),
         ),
     }
 
@@ -77,12 +87,47 @@ def test_oj_download(
     }
 
     mock_library_checker = mock_problem[service.LibraryCheckerProblem]
-    mock_library_checker.download_system_cases.assert_not_called()
+    mock_library_checker.download_system_cases_to.assert_not_called()
     assert mock_library_checker.generate_test_cases_in_cloned_repository
     mock_library_checker.generate_test_cases_in_cloned_repository.assert_called_once()
+    assert mock_library_checker.generate_test_cases
+    mock_library_checker.generate_test_cases.assert_called_once()
+    assert [
+        p.problem_id for p in mock_library_checker.generate_test_cases.call_args[0][0]
+    ] == ["aplusb"]
 
     mock_yuki_coder = mock_problem[service.YukicoderProblem]
-    mock_yuki_coder.download_system_cases.assert_called_once()
-    assert mock_yuki_coder.download_system_cases.call_args[1]["headers"] == {
+    mock_yuki_coder.download_system_cases_to.assert_called_once()
+    assert mock_yuki_coder.download_system_cases_to.call_args[1]["headers"] == {
         "Authorization": "Bearer YKTK"
     }
+
+
+def test_download_files_jobs(mocker: MockerFixture):
+    lock = threading.Lock()
+    running: Counter[str] = Counter()
+    max_running: Counter[str] = Counter()
+
+    def fake_download(url: str) -> bool:
+        host = urllib.parse.urlparse(url).netloc
+        with lock:
+            running[host] += 1
+            max_running[host] = max(max_running[host], running[host])
+        time.sleep(0.05)
+        with lock:
+            running[host] -= 1
+        return not url.endswith("/fail")
+
+    oj_download = mocker.patch(
+        "competitive_verifier.oj.download", side_effect=fake_download
+    )
+    urls = [f"https://yukicoder.me/problems/no/{i}" for i in range(6)] + [
+        f"https://judge.yosupo.jp/problem/{i}" for i in range(3)
+    ]
+
+    assert download(urls, jobs=4, jobs_per_host=2)
+    assert oj_download.call_count == len(urls)
+    assert set(max_running) == {"yukicoder.me", "judge.yosupo.jp"}
+    assert max(max_running.values()) <= 2
+
+    assert not download([*urls, "https://judge.yosupo.jp/problem/fail"], jobs=4)
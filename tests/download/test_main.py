@@ -2,7 +2,11 @@ from collections.abc import Iterable
 
 import pytest
 
-from competitive_verifier.download.download import UrlOrVerificationFile, parse_urls
+from competitive_verifier.download.download import (
+    UrlOrVerificationFile,
+    interleave_hosts,
+    parse_urls,
+)
 from competitive_verifier.models import ProblemVerification, VerificationFile
 
 
@@ -105,3 +109,23 @@ def test_parse_urls(
     expected: set[str],
 ):
     assert set(parse_urls(url_or_file)) == expected
+
+
+def test_interleave_hosts():
+    assert interleave_hosts(
+        [
+            "https://yukicoder.me/problems/no/2",
+            "https://yukicoder.me/problems/no/1",
+            "https://yukicoder.me/problems/no/3",
+            "https://judge.u-aizu.ac.jp/onlinejudge/description.jsp?id=ITP1_1_A",
+            "https://judge.yosupo.jp/problem/aplusb",
+            "https://judge.u-aizu.ac.jp/onlinejudge/description.jsp?id=ITP1_1_B",
+        ]
+    ) == [
+        "https://judge.u-aizu.ac.jp/onlinejudge/description.jsp?id=ITP1_1_A",
+        "https://judge.yosupo.jp/problem/aplusb",
+        "https://yukicoder.me/problems/no/1",
+        "https://judge.u-aizu.ac.jp/onlinejudge/description.jsp?id=ITP1_1_B",
+        "https://yukicoder.me/problems/no/2",
+        "https://yukicoder.me/problems/no/3",
+    ]
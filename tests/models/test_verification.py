@@ -25,6 +25,9 @@ from competitive_verifier.oj.tools.oj_test import OjTestArguments
 class DataVerificationParams:
     default_tle: float | None
     default_mle: float | None
+    testcase_jobs: int = 1
+    pin_cpu: bool = False
+    tle_by_cpu_time: bool = False
 
 
 test_command_union_json_params: list[tuple[Verification, str, str]] = [
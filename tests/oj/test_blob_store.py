@@ -0,0 +1,105 @@
+import pathlib
+
+from pytest_mock import MockerFixture
+
+from competitive_verifier.oj.tools import blob_store
+from competitive_verifier.oj.tools.blob_store import BlobStore, remove_tree
+
+
+def test_blob_store_move(tmp_path: pathlib.Path):
+    store = BlobStore(tmp_path / "blobs")
+    for name in ("a", "b"):
+        (tmp_path / name).mkdir()
+        (tmp_path / name / "src.in").write_bytes(b"1 2\n")
+        digest = store.add(tmp_path / name / "src.in", move=True)
+        store.link(digest, tmp_path / name / "sample.in")
+
+    a = tmp_path / "a" / "sample.in"
+    b = tmp_path / "b" / "sample.in"
+    assert a.read_bytes() == b.read_bytes() == b"1 2\n"
+    assert not (tmp_path / "a" / "src.in").exists()
+    # the same contents are stored once
+    assert a.samefile(b)
+    assert len(list((tmp_path / "blobs").glob("*/*"))) == 1
+
+
+def test_blob_store_keep(tmp_path: pathlib.Path):
+    store = BlobStore(tmp_path / "blobs")
+    src = tmp_path / "src.in"
+    src.write_bytes(b"3\n")
+    dst = tmp_path / "dst.in"
+    dst.write_bytes(b"old\n")
+
+    store.link(store.add(src, move=False), dst)
+
+    assert dst.read_bytes() == b"3\n"
+    # the source file is kept and shares the disk space with the store
+    assert src.exists()
+    assert src.samefile(dst)
+
+
+def test_blob_store_read_only(tmp_path: pathlib.Path):
+    store = BlobStore(tmp_path / "blobs")
+    src = tmp_path / "src.in"
+    src.write_bytes(b"1\n")
+    digest = store.add(src, move=True)
+    assert store.get_blob_path(digest).stat().st_mode & 0o222 == 0
+
+
+def test_blob_store_modified_through_link(tmp_path: pathlib.Path):
+    store = BlobStore(tmp_path / "blobs")
+    src = tmp_path / "src.in"
+    src.write_bytes(b"1 2\n")
+    digest = store.add(src, move=True)
+    linked = tmp_path / "linked.in"
+    store.link(digest, linked)
+
+    # edit the linked file in place with the same size
+    linked.chmod(0o644)
+    with linked.open("r+b") as fh:
+        fh.write(b"3 4\n")
+    assert store.get_blob_path(digest).read_bytes() == b"3 4\n"
+    assert not store.verify(digest)
+
+    # the modified blob is not reused
+    src.write_bytes(b"1 2\n")
+    assert store.add(src, move=True) == digest
+    dst = tmp_path / "dst.in"
+    store.link(digest, dst)
+    assert dst.read_bytes() == b"1 2\n"
+    assert store.verify(digest)
+
+
+def test_blob_store_prune(tmp_path: pathlib.Path, mocker: MockerFixture):
+    store = BlobStore(tmp_path / "blobs", max_size=15)
+    digests: list[str] = []
+    for i in range(4):
+        src = tmp_path / f"{i}.in"
+        src.write_bytes(b"%09d\n" % i)
+        digests.append(store.add(src, move=True))
+    linked = tmp_path / "linked.in"
+    store.link(digests[0], linked)
+
+    # the blobs added recently may be about to be linked
+    store.prune()
+    assert all(store.get_blob_path(d).exists() for d in digests)
+
+    mocker.patch.object(blob_store, "PRUNE_GRACE_SECONDS", -60)
+    store.prune()
+    assert store.get_blob_path(digests[0]).exists()
+    assert linked.read_bytes() == b"000000000\n"
+    assert sum(store.get_blob_path(d).exists() for d in digests[1:]) == 1
+
+
+def test_remove_tree(tmp_path: pathlib.Path):
+    store = BlobStore(tmp_path / "blobs")
+    src = tmp_path / "src.in"
+    src.write_bytes(b"1\n")
+    test_directory = tmp_path / "test"
+    test_directory.mkdir()
+    store.link(store.add(src, move=True), test_directory / "sample.in")
+
+    remove_tree(test_directory)
+    remove_tree(test_directory)
+
+    assert not test_directory.exists()
@@ -0,0 +1,115 @@
+import textwrap
+from pathlib import Path
+
+import pytest
+from pytest_mock import MockerFixture
+
+from competitive_verifier.oj.verify.languages import cplusplus
+from competitive_verifier.oj.verify.languages.cplusplus import (
+    CPlusPlusLanguage,
+    OjVerifyCPlusPlusConfig,
+)
+
+
+@pytest.fixture
+def sources(tmp_path: Path) -> Path:
+    files = {
+        "main.cpp": """
+            #include <vector>
+            #include "lib/a.hpp"
+            // #include "commented.hpp"
+            /*
+            #include "commented.hpp"
+            */
+            #include <external/c.hpp>
+            int main() {}
+            """,
+        "lib/a.hpp": """
+            #ifndef A_HPP
+            #define A_HPP
+            #include "b.hpp"
+            #include "../lib/b.hpp"
+            #endif
+            """,
+        "lib/b.hpp": """
+            #pragma once
+            #include "a.hpp"
+            """,
+        "include/external/c.hpp": """
+            #include <bits/stdc++.h>
+            """,
+        "conditional.cpp": """
+            #include "lib/b.hpp"
+            #ifdef LOCAL
+            #include "lib/a.hpp"
+            #endif
+            """,
+        "macro.cpp": """
+            #define HEADER "lib/a.hpp"
+            #include HEADER
+            """,
+        "missing.cpp": """
+            #include "missing.hpp"
+            """,
+    }
+    for name, content in files.items():
+        p = tmp_path / name
+        p.parent.mkdir(parents=True, exist_ok=True)
+        p.write_text(textwrap.dedent(content), encoding="utf-8")
+    return tmp_path
+
+
+def test_scan_depending_files(sources: Path):
+    assert set(
+        cplusplus.cplusplus_scan_depending_files(
+            sources / "main.cpp",
+            CXXFLAGS=["-std=c++17", "-I", str(sources / "include")],
+        )
+    ) == {
+        sources / "main.cpp",
+        sources / "lib/a.hpp",
+        sources / "lib/b.hpp",
+        sources / "include/external/c.hpp",
+    }
+
+    assert set(
+        cplusplus.cplusplus_scan_depending_files(
+            sources / "main.cpp",
+            CXXFLAGS=[f"-I{sources / 'include'}"],
+        )
+    ) == {
+        sources / "main.cpp",
+        sources / "lib/a.hpp",
+        sources / "lib/b.hpp",
+        sources / "include/external/c.hpp",
+    }
+
+
+@pytest.mark.parametrize("name", ["conditional.cpp", "macro.cpp", "missing.cpp"])
+def test_scan_depending_files_undecidable(sources: Path, name: str):
+    with pytest.raises(cplusplus.UndecidableIncludeError):
+        cplusplus.cplusplus_scan_depending_files(sources / name, CXXFLAGS=[])
+
+
+def test_list_dependencies_native(mocker: MockerFixture, sources: Path):
+    compiler = mocker.patch.object(
+        cplusplus,
+        "_cplusplus_list_depending_files",
+        return_value=[sources / "conditional.cpp"],
+    )
+    language = CPlusPlusLanguage(
+        config=OjVerifyCPlusPlusConfig.model_validate(
+            {"include_scanner": "native", "environments": [{"CXX": "g++"}]}
+        )
+    )
+
+    assert set(language.list_dependencies(sources / "lib/a.hpp", basedir=sources)) == {
+        sources / "lib/a.hpp",
+        sources / "lib/b.hpp",
+    }
+    compiler.assert_not_called()
+
+    assert language.list_dependencies(sources / "conditional.cpp", basedir=sources) == [
+        sources / "conditional.cpp"
+    ]
+    compiler.assert_called_once()
@@ -0,0 +1,110 @@
+import os
+import shutil
+import textwrap
+from pathlib import Path
+
+import pytest
+from pytest_mock import MockerFixture
+
+from competitive_verifier.oj.verify.languages import cplusplus_bundle
+from competitive_verifier.oj.verify.languages.cplusplus_bundle import (
+    BundleError,
+    Bundler,
+    get_uncommented_cache_dir,
+    prune_uncommented_cache,
+)
+
+pytestmark = pytest.mark.skipif(shutil.which("g++") is None, reason="g++ is required")
+
+
+@pytest.fixture
+def sources(monkeypatch: pytest.MonkeyPatch, tmp_path: Path) -> Path:
+    monkeypatch.chdir(tmp_path)
+    files = {
+        "lib/common.hpp": """
+            #pragma once
+            // common
+            int common() { return 1; }
+            """,
+        "lib/guarded.hpp": """
+            #ifndef GUARDED_HPP
+            #define GUARDED_HPP
+            int guarded() { return 2; }
+            #endif
+            int outside() { return 3; }
+            """,
+        "a.cpp": """
+            #include "lib/common.hpp"
+            int main() { return common(); }
+            """,
+        "b.cpp": """
+            #include "lib/common.hpp"
+            /* b */
+            int main() { return common() + 1; }
+            """,
+    }
+    for name, content in files.items():
+        p = tmp_path / name
+        p.parent.mkdir(parents=True, exist_ok=True)
+        p.write_text(textwrap.dedent(content).lstrip(), encoding="utf-8")
+    return tmp_path
+
+
+def test_bundler_shares_headers(mocker: MockerFixture, sources: Path):
+    spy = mocker.spy(cplusplus_bundle, "exec_command")
+
+    bundled: dict[str, bytes] = {}
+    for name in ["a.cpp", "b.cpp"]:
+        bundler = Bundler(iquotes=[sources], compiler="g++")
+        bundler.update(Path(name))
+        bundled[name] = bundler.get()
+
+    assert b"int common() { return 1; }" in bundled["a.cpp"]
+    assert b"int common() { return 1; }" in bundled["b.cpp"]
+    assert b"return common() + 1;" in bundled["b.cpp"]
+
+    preprocessed = [c.args[0][-1] for c in spy.call_args_list if "-E" in c.args[0]]
+    assert sorted(preprocessed) == sorted(
+        str((sources / name).resolve()) for name in ["a.cpp", "b.cpp", "lib/common.hpp"]
+    )
+    assert len(list(get_uncommented_cache_dir().glob("*/*"))) == 3
+
+
+def test_bundler_analyzes_headers_once(mocker: MockerFixture, sources: Path):
+    spy = mocker.spy(cplusplus_bundle, "_read_header")
+
+    for name in ["a.cpp", "b.cpp"]:
+        bundler = Bundler(iquotes=[sources], compiler="g++")
+        bundler.update(Path(name))
+
+    assert sorted(c.args[0] for c in spy.call_args_list) == sorted(
+        (sources / name).resolve() for name in ["a.cpp", "b.cpp", "lib/common.hpp"]
+    )
+
+
+def test_bundler_code_out_of_include_guard(sources: Path):
+    for _ in range(2):
+        bundler = Bundler(iquotes=[sources], compiler="g++")
+        with pytest.raises(
+            BundleError, match="line 5: found codes out of include guard"
+        ):
+            bundler.update(Path("lib/guarded.hpp"))
+
+
+def test_prune_uncommented_cache(monkeypatch: pytest.MonkeyPatch, tmp_path: Path):
+    monkeypatch.chdir(tmp_path)
+    cache_dir = get_uncommented_cache_dir()
+    paths: list[Path] = []
+    for i, key in enumerate(["0" * 64, "1" * 64, "2" * 64]):
+        path = cache_dir / key[:2] / key
+        path.parent.mkdir(parents=True, exist_ok=True)
+        path.write_bytes(b"x" * 100)
+        os.utime(path, ns=(i * 10**9, (3 - i) * 10**9))
+        paths.append(path)
+    temporary = cache_dir / "00" / "tmpabcdef"
+    temporary.write_bytes(b"x" * 1000)
+
+    prune_uncommented_cache(max_size=150)
+
+    assert [p.exists() for p in paths] == [True, False, False]
+    assert temporary.exists()
@@ -0,0 +1,37 @@
+import pytest
+
+from competitive_verifier.oj.tools.func import get_canonical_url, get_directory
+
+test_get_canonical_url_params: list[tuple[str, str]] = [
+    (
+        "http://old.yosupo.jp/problem/aplusb",
+        "https://judge.yosupo.jp/problem/aplusb",
+    ),
+    (
+        "https://judge.yosupo.jp/problem/aplusb/",
+        "https://judge.yosupo.jp/problem/aplusb",
+    ),
+    (
+        "http://yukicoder.me/problems/no/1088",
+        "https://yukicoder.me/problems/no/1088",
+    ),
+    (
+        "https://onlinejudge.u-aizu.ac.jp/courses/lesson/2/ITP1/1/ITP1_1_A",
+        "http://judge.u-aizu.ac.jp/onlinejudge/description.jsp?id=ITP1_1_A",
+    ),
+    (
+        "https://onlinejudge.u-aizu.ac.jp/problems/ITP1_1_A",
+        "http://judge.u-aizu.ac.jp/onlinejudge/description.jsp?id=ITP1_1_A",
+    ),
+    ("http://example.com", "http://example.com"),
+]
+
+
+@pytest.mark.parametrize(
+    ("url", "expected"),
+    test_get_canonical_url_params,
+    ids=[t[0] for t in test_get_canonical_url_params],
+)
+def test_get_canonical_url(url: str, expected: str):
+    assert get_canonical_url(url) == expected
+    assert get_directory(url) == get_directory(expected)
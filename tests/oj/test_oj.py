@@ -1,11 +1,18 @@
+import concurrent.futures
+import functools
+import os
 import pathlib
+import sys
+import threading
 from typing import Any
 
 import pytest
 from pytest_mock import MockerFixture
 
 from competitive_verifier import oj
-from competitive_verifier.oj.tools.oj_test import OjTestArguments
+from competitive_verifier.models import JudgeStatus
+from competitive_verifier.oj.tools import oj_test, pretty_printers
+from competitive_verifier.oj.tools.oj_test import OjTestArguments, run
 
 test_oj_test_params: dict[str, tuple[dict[str, Any], OjTestArguments]] = {
     "default": (
@@ -69,3 +76,264 @@ def test_oj_test(
     oj.test(**args)
 
     run.assert_called_once_with(expected)
+
+
+@pytest.mark.parametrize("jobs", [1, 3])
+def test_oj_test_run_jobs(tmp_path: pathlib.Path, jobs: int):
+    for i in range(6):
+        (tmp_path / f"case{i:02}.in").write_text(f"{i}\n")
+        (tmp_path / f"case{i:02}.out").write_text(f"{i if i % 4 else -1}\n")
+
+    result = run(
+        OjTestArguments(
+            command=[
+                sys.executable,
+                "-c",
+                "import sys; sys.stdout.write(sys.stdin.read())",
+            ],
+            directory=tmp_path,
+            judge=None,
+            tle=None,
+            mle=None,
+            error=None,
+            jobs=jobs,
+        )
+    )
+
+    assert not result.is_success
+    assert [(r.testcase.name, r.status) for r in result.testcases] == [
+        ("case00", JudgeStatus.WA),
+        ("case01", JudgeStatus.AC),
+        ("case02", JudgeStatus.AC),
+        ("case03", JudgeStatus.AC),
+        ("case04", JudgeStatus.WA),
+        ("case05", JudgeStatus.AC),
+    ]
+
+
+@pytest.mark.parametrize("jobs", [1, 2])
+def test_oj_test_run_bounds_outputs(
+    mocker: MockerFixture, tmp_path: pathlib.Path, jobs: int
+):
+    for i in range(12):
+        (tmp_path / f"case{i:02}.in").write_text(f"{i}\n")
+        (tmp_path / f"case{i:02}.out").write_text(f"{i}\n")
+    judge_single_case = oj_test.judge_single_case
+    outputs: list[int] = []
+    threads: set[int] = set()
+
+    def record(*args: Any, output_path: pathlib.Path, **kwargs: Any):
+        outputs.append(len(list(output_path.parent.glob("*.out"))))
+        return judge_single_case(*args, output_path=output_path, **kwargs)
+
+    def execute(*args: Any, **kwargs: Any):
+        threads.add(threading.get_ident())
+        return execute_single_case(*args, **kwargs)
+
+    execute_single_case = oj_test.execute_single_case
+    mocker.patch.object(oj_test, "judge_single_case", side_effect=record)
+    mocker.patch.object(oj_test, "execute_single_case", side_effect=execute)
+
+    result = run(
+        OjTestArguments(
+            command=[sys.executable, "-c", "print(input())"],
+            directory=tmp_path,
+            judge=None,
+            tle=None,
+            mle=None,
+            error=None,
+            jobs=jobs,
+        )
+    )
+
+    assert result.is_success
+    assert len(outputs) == 12
+    assert max(outputs) <= oj_test.PIPELINE_DEPTH_PER_JOB * jobs + 1
+    if jobs == 1:
+        assert threads == {threading.get_ident()}
+
+
+def test_oj_test_run_builds_match_function_once(
+    mocker: MockerFixture, tmp_path: pathlib.Path
+):
+    for i in range(4):
+        (tmp_path / f"case{i:02}.in").write_text(f"{i}\n")
+        (tmp_path / f"case{i:02}.out").write_text(f"{i}.0\n")
+    build = mocker.spy(oj_test, "build_match_function")
+
+    result = run(
+        OjTestArguments(
+            command=[sys.executable, "-c", "print(int(input()))"],
+            directory=tmp_path,
+            judge=None,
+            tle=None,
+            mle=None,
+            error=1e-6,
+        )
+    )
+
+    assert result.is_success
+    assert len(result.testcases) == 4
+    build.assert_called_once_with(error=1e-6, judge_command=None, silent=False)
+
+
+def test_oj_test_run_skips_previews(mocker: MockerFixture, tmp_path: pathlib.Path):
+    (tmp_path / "wa.in").write_text("1\n")
+    (tmp_path / "wa.out").write_text("2\n")
+    mocker.patch.object(oj_test.logger, "isEnabledFor", return_value=False)
+    file_content = mocker.spy(pretty_printers, "make_pretty_file_content")
+    content = mocker.spy(pretty_printers, "make_pretty_large_file_content")
+
+    result = run(
+        OjTestArguments(
+            command=[sys.executable, "-c", "print(input())"],
+            directory=tmp_path,
+            judge=None,
+            tle=None,
+            mle=None,
+            error=None,
+        )
+    )
+
+    assert [r.status for r in result.testcases] == [JudgeStatus.WA]
+    file_content.assert_not_called()
+    content.assert_not_called()
+
+
+PRINT_CPU = """
+import os, sys, time
+sys.stdout.write(sys.stdin.read())
+with open(sys.argv[1], "a") as fh:
+    fh.write(f"{min(os.sched_getaffinity(0))}\\n")
+time.sleep(0.3)
+"""
+
+
+def _run_printing_cpu(directory: pathlib.Path, log: pathlib.Path, *, jobs: int):
+    return run(
+        OjTestArguments(
+            command=[sys.executable, "-c", PRINT_CPU, str(log)],
+            directory=directory,
+            judge=None,
+            tle=None,
+            mle=None,
+            error=None,
+            jobs=jobs,
+            pin_cpu=True,
+        )
+    )
+
+
+@pytest.mark.skipif(
+    not hasattr(os, "sched_setaffinity"), reason="CPU pinning is not supported"
+)
+def test_oj_test_run_pin_cpu(tmp_path: pathlib.Path):
+    for i in range(3):
+        (tmp_path / f"case{i:02}.in").write_text(f"{i}\n")
+        (tmp_path / f"case{i:02}.out").write_text(f"{i}\n")
+    affinity = os.sched_getaffinity(0)
+
+    result = _run_printing_cpu(tmp_path, tmp_path / "cpu.log", jobs=2)
+
+    assert result.is_success
+    assert len((tmp_path / "cpu.log").read_text().split()) == 3
+    # the affinity of the calling thread is restored
+    assert os.sched_getaffinity(0) == affinity
+
+
+@pytest.mark.skipif(
+    not hasattr(os, "sched_setaffinity") or len(os.sched_getaffinity(0)) < 2,
+    reason="CPU pinning across problems requires 2 CPUs",
+)
+def test_oj_test_run_pin_cpu_across_problems(tmp_path: pathlib.Path):
+    log = tmp_path / "cpu.log"
+    directories = [tmp_path / "a", tmp_path / "b"]
+    for directory in directories:
+        directory.mkdir()
+        (directory / "case.in").write_text("1\n")
+        (directory / "case.out").write_text("1\n")
+
+    # the problems verified at the same time are pinned to different CPUs
+    with concurrent.futures.ThreadPoolExecutor(max_workers=2) as executor:
+        results = list(
+            executor.map(
+                functools.partial(_run_printing_cpu, log=log, jobs=1), directories
+            )
+        )
+
+    assert all(r.is_success for r in results)
+    assert len(set(log.read_text().split())) == 2
+
+
+@pytest.mark.parametrize(
+    ("tle_by_cpu_time", "expected"),
+    [(False, JudgeStatus.TLE), (True, JudgeStatus.AC)],
+)
+def test_oj_test_run_tle_by_cpu_time(
+    tmp_path: pathlib.Path,
+    *,
+    tle_by_cpu_time: bool,
+    expected: JudgeStatus,
+):
+    (tmp_path / "sleep.in").write_text("")
+    (tmp_path / "sleep.out").write_text("")
+
+    # sleeping does not consume the CPU time
+    result = run(
+        OjTestArguments(
+            command=[sys.executable, "-c", "import time; time.sleep(1)"],
+            directory=tmp_path,
+            judge=None,
+            tle=0.8,
+            mle=None,
+            error=None,
+            tle_by_cpu_time=tle_by_cpu_time,
+        )
+    )
+
+    assert [r.status for r in result.testcases] == [expected]
+
+
+@pytest.mark.skipif(os.name != "posix", reason="the checker is a script")
+@pytest.mark.parametrize("jobs", [1, 3])
+def test_oj_test_run_judge(tmp_path: pathlib.Path, jobs: int):
+    test_dir = tmp_path / "test"
+    test_dir.mkdir()
+    for i in range(4):
+        (test_dir / f"case{i:02}.in").write_text(f"{i}\n")
+        # the checker accepts the outputs with the differences of multiples of 3
+        (test_dir / f"case{i:02}.out").write_text(
+            f"{i * 5 + (1 if i in (1, 2) else 3)}\n"
+        )
+
+    # the path with a space is passed as one argument
+    judge = tmp_path / "checker dir" / "checker"
+    judge.parent.mkdir()
+    judge.write_text(
+        f"""#!{sys.executable}
+import sys
+_, input_path, actual_path, expected_path = sys.argv
+with open(actual_path) as actual, open(expected_path) as expected:
+    sys.exit((int(actual.read()) - int(expected.read())) % 3 != 0)
+"""
+    )
+    judge.chmod(0o755)
+
+    result = run(
+        OjTestArguments(
+            command=[sys.executable, "-c", "print(int(input()) * 5)"],
+            directory=test_dir,
+            judge=judge,
+            tle=None,
+            mle=None,
+            error=None,
+            jobs=jobs,
+        )
+    )
+
+    assert [(r.testcase.name, r.status) for r in result.testcases] == [
+        ("case00", JudgeStatus.AC),
+        ("case01", JudgeStatus.WA),
+        ("case02", JudgeStatus.WA),
+        ("case03", JudgeStatus.AC),
+    ]
@@ -0,0 +1,112 @@
+import pathlib
+
+import pytest
+from pytest_mock import MockerFixture
+from pytest_mock.plugin import MockType
+
+from competitive_verifier import oj
+from competitive_verifier.config import COMPETITIVE_VERIFY_CONFIG_PATH
+from competitive_verifier.oj.tools.manifest import ProblemManifest
+from competitive_verifier.oj.tools.service import AOJProblem
+
+URL = "https://onlinejudge.u-aizu.ac.jp/problems/ITP1_1_A"
+
+
+@pytest.fixture
+def download_system_cases_to(
+    mocker: MockerFixture,
+    monkeypatch: pytest.MonkeyPatch,
+    tmp_path: pathlib.Path,
+) -> MockType:
+    monkeypatch.setenv(COMPETITIVE_VERIFY_CONFIG_PATH, str(tmp_path))
+
+    def download(
+        directory: pathlib.Path, *, headers: dict[str, str] | None = None
+    ) -> list[pathlib.Path]:
+        directory.mkdir(parents=True, exist_ok=True)
+        files: list[pathlib.Path] = []
+        for name, data in [("1.in", b"1 2\n"), ("1.out", b"3\n")]:
+            (directory / name).write_bytes(data)
+            files.append(directory / name)
+        return files
+
+    return mocker.patch.object(
+        AOJProblem, "download_system_cases_to", side_effect=download
+    )
+
+
+def test_download_manifest(download_system_cases_to: MockType):
+    assert oj.download(URL)
+
+    directory = oj.get_directory(URL)
+    manifest = ProblemManifest.load(directory)
+    assert manifest is not None
+    assert manifest.url == URL
+    assert {name: f.size for name, f in manifest.files.items()} == {
+        "1.in": 4,
+        "1.out": 2,
+    }
+    assert (directory / "test" / "1.in").read_bytes() == b"1 2\n"
+
+    # the missing file is restored from the blob store without downloading
+    (directory / "test" / "1.out").unlink()
+    assert oj.download(URL)
+    assert (directory / "test" / "1.out").read_bytes() == b"3\n"
+    download_system_cases_to.assert_called_once()
+
+    # the broken file is downloaded again
+    (directory / "test" / "1.in").write_bytes(b"broken\n")
+    assert oj.download(URL)
+    assert (directory / "test" / "1.in").read_bytes() == b"1 2\n"
+    assert download_system_cases_to.call_count == 2
+
+
+def test_download_manifest_redownload(
+    download_system_cases_to: MockType, tmp_path: pathlib.Path
+):
+    assert oj.download(URL)
+
+    # the blobs are lost
+    for blob in (tmp_path / "cache" / "blobs").glob("*/*"):
+        blob.unlink()
+    directory = oj.get_directory(URL)
+    kept = (directory / "test" / "1.in").stat()
+    (directory / "test" / "1.out").unlink()
+    assert oj.download(URL)
+    assert (directory / "test" / "1.out").read_bytes() == b"3\n"
+    assert download_system_cases_to.call_count == 2
+    # the intact file is not replaced
+    assert (directory / "test" / "1.in").stat().st_ino == kept.st_ino
+
+
+def test_download_manifest_same_size(download_system_cases_to: MockType):
+    assert oj.download(URL)
+    directory = oj.get_directory(URL)
+
+    # replaced with a file of the same size
+    test_file = directory / "test" / "1.in"
+    test_file.unlink()
+    test_file.write_bytes(b"3 4\n")
+    (directory / "test" / "unknown.in").write_bytes(b"5\n")
+
+    assert oj.download(URL)
+    assert test_file.read_bytes() == b"1 2\n"
+    assert not (directory / "test" / "unknown.in").exists()
+    download_system_cases_to.assert_called_once()
+
+
+def test_download_manifest_modified_through_link(download_system_cases_to: MockType):
+    assert oj.download(URL)
+    directory = oj.get_directory(URL)
+
+    # the blob is modified through the linked file with the same size
+    test_file = directory / "test" / "1.in"
+    test_file.chmod(0o644)
+    with test_file.open("r+b") as fh:
+        fh.write(b"3 4\n")
+    test_file.unlink()
+
+    # the modified blob is not linked again
+    assert oj.download(URL)
+    assert test_file.read_bytes() == b"1 2\n"
+    assert download_system_cases_to.call_count == 2
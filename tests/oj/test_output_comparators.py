@@ -0,0 +1,230 @@
+import mmap
+from pathlib import Path
+
+import pytest
+from pytest_mock import MockerFixture
+
+from competitive_verifier.oj.tools import numpy_comparators, output_comparators
+from competitive_verifier.oj.tools.output_comparators import (
+    CRLFInsensitiveComparator,
+    ExactComparator,
+    ExactMatchComparator,
+    ExactMatchResult,
+    FloatingPointNumberComparator,
+    OutputComparator,
+    SplitComparator,
+    SplitLinesComparator,
+)
+
+exact = CRLFInsensitiveComparator(ExactComparator())
+ignore_spaces = CRLFInsensitiveComparator(SplitComparator(ExactComparator()))
+floating = CRLFInsensitiveComparator(
+    SplitLinesComparator(
+        SplitComparator(FloatingPointNumberComparator(rel_tol=1e-6, abs_tol=1e-6))
+    )
+)
+
+test_comparator_params: list[tuple[OutputComparator, bytes, bytes, bool]] = [
+    (ExactComparator(), b"1 2\n", b"1 2\n", True),
+    (ExactComparator(), b"1 2\r\n", b"1 2\n", False),
+    (ExactComparator(), b"1 2\n", b"1 3\n", False),
+    (exact, b"1 2\r\n3\r\n", b"1 2\n3\n", True),
+    (exact, b"1 2\r\r\n", b"1 2\r\n", False),
+    (exact, b"1\r\n2\r", b"1\n2\r", True),
+    (exact, b"1\r", b"1\r\n", False),
+    (exact, b"1 2", b"1 2\n", False),
+    (exact, b"", b"", True),
+    (ExactMatchComparator(), b"1 2\r\n3\r\n", b"1 2\n3\n", True),
+    (ExactMatchComparator(), b"1 2\r\r\n", b"1 2\r\n", False),
+    (ExactMatchComparator(), b"1\r\n2\r", b"1\n2\r", True),
+    (ExactMatchComparator(), b"1\r", b"1\r\n", False),
+    (ExactMatchComparator(), b"1 2", b"1 2\n", False),
+    (ExactMatchComparator(), b"1 2\n", b"1 3\n", False),
+    (ExactMatchComparator(), b"", b"", True),
+    (ignore_spaces, b"1  2\n\n3", b"1 2 3\r\n", True),
+    (ignore_spaces, b"1 2", b"1 2 3", False),
+    (ignore_spaces, b"", b" \n", True),
+    (floating, b"1.0000001 2\n", b"1 2.0\r\n\r\n", True),
+    (floating, b"1.1 2\n", b"1 2\n", False),
+    (floating, b"1\n2\n", b"1 2\n", False),
+    (floating, b"1\n\n2\n", b"1\n2\n", False),
+    (floating, b"abc 1\n", b"abc 1.0\n", True),
+    (floating, b"abc 1\n", b"abd 1.0\n", False),
+    (SplitLinesComparator(ExactComparator()), b"a\nb\n\n", b"a\nb", True),
+    (SplitLinesComparator(ExactComparator()), b"a\r\nb\n", b"a\nb", False),
+]
+
+
+@pytest.mark.parametrize(
+    ("comparator", "actual", "expected", "result"),
+    test_comparator_params,
+)
+def test_comparator(
+    *,
+    comparator: OutputComparator,
+    actual: bytes,
+    expected: bytes,
+    result: bool,
+):
+    assert comparator(actual, expected) == result
+
+
+@pytest.mark.parametrize(
+    ("comparator", "actual", "expected", "result"),
+    test_comparator_params,
+)
+def test_comparator_mmap(
+    *,
+    mocker: MockerFixture,
+    tmp_path: Path,
+    comparator: OutputComparator,
+    actual: bytes,
+    expected: bytes,
+    result: bool,
+):
+    # compare chunk by chunk
+    mocker.patch.object(output_comparators, "_CHUNK_SIZE", 2)
+
+    def _map(name: str, content: bytes) -> bytes | mmap.mmap:
+        if not content:
+            return content
+        path = tmp_path / name
+        path.write_bytes(content)
+        with path.open("rb") as fh:
+            return mmap.mmap(fh.fileno(), 0, access=mmap.ACCESS_READ)
+
+    assert comparator(_map("actual", actual), _map("expected", expected)) == result
+
+
+test_exact_match_comparator_params: list[tuple[bytes, bytes, ExactMatchResult]] = [
+    (b"1 2\n", b"1 2\n", ExactMatchResult(True, True, None)),
+    (b"1 2\r\n", b"1 2\n", ExactMatchResult(True, True, None)),
+    (b"1 2\n3 4\n", b"1 2\n3 5\n", ExactMatchResult(False, False, (2, 3))),
+    (b"1 2\n345\n", b"1 2\n346\n", ExactMatchResult(False, False, (2, 3))),
+    (b"1 2\n3\n", b"1 2\n3 4\n", ExactMatchResult(False, False, (2, 2))),
+    (b"1 2\n3 4\n", b"1 2\n3\n", ExactMatchResult(False, False, (2, 2))),
+    (b"1 2 3", b"1 2\n3\n", ExactMatchResult(False, True, (1, 4))),
+    (b"1  2\r\n", b"1 2\n", ExactMatchResult(False, True, (1, 3))),
+    (b"1 2", b"1 2\n", ExactMatchResult(False, True, (1, 4))),
+    (b"1\n2\n", b"1\n2\n\n", ExactMatchResult(False, True, (3, 1))),
+    (b"1\n2 \n3\n", b"1\n2\n4\n", ExactMatchResult(False, False, (2, 2))),
+    (b"", b"\n", ExactMatchResult(False, True, (1, 1))),
+]
+
+
+@pytest.mark.parametrize(
+    ("actual", "expected", "result"),
+    test_exact_match_comparator_params,
+)
+def test_exact_match_comparator(
+    actual: bytes,
+    expected: bytes,
+    result: ExactMatchResult,
+):
+    assert ExactMatchComparator().compare(actual, expected) == result
+
+
+@pytest.mark.parametrize("chunk_size", [1, 2, 3])
+@pytest.mark.parametrize(
+    ("actual", "expected", "result"),
+    test_exact_match_comparator_params,
+)
+def test_exact_match_comparator_small_chunks(
+    mocker: MockerFixture,
+    chunk_size: int,
+    actual: bytes,
+    expected: bytes,
+    result: ExactMatchResult,
+):
+    mocker.patch.object(output_comparators, "_CHUNK_SIZE", chunk_size)
+    assert ExactMatchComparator().compare(actual, expected) == result
+
+
+def test_exact_match_comparator_crlf(mocker: MockerFixture):
+    # the words are not joined when the outputs differ only in line endings
+    joined_words = mocker.spy(output_comparators, "_iter_joined_words")
+    actual = b"1 2\r\n" * 100000
+    expected = b"1 2\n" * 100000
+
+    assert ExactMatchComparator().compare(actual, expected) == ExactMatchResult(
+        matched=True, matched_ignoring_spaces=True, first_difference=None
+    )
+    joined_words.assert_not_called()
+
+
+def test_exact_match_comparator_from_difference(mocker: MockerFixture):
+    # the words before the line of the first difference are not compared again
+    joined_words = mocker.spy(output_comparators, "_iter_joined_words")
+    actual = b"1 2\r\n" * 100000 + b"3  4\r\n"
+    expected = b"1 2\n" * 100000 + b"3 4\n"
+
+    assert ExactMatchComparator().compare(actual, expected) == ExactMatchResult(
+        matched=False, matched_ignoring_spaces=True, first_difference=(100001, 3)
+    )
+    assert joined_words.call_args_list == [
+        mocker.call(actual, 500000),
+        mocker.call(expected, 400000),
+    ]
+
+
+test_numpy_floating_point_comparator_params: list[tuple[bytes, bytes, bool]] = [
+    (b"1.0000001 2\n", b"1 2.0\r\n\r\n", True),
+    (b"1.1 2\n", b"1 2\n", False),
+    (b"1\n2\n", b"1 2\n", False),
+    (b"1\n\n2\n", b"1\n2\n", False),
+    (b"1\n \n", b"1\n", False),
+    (b"1\r 2\n", b"1 2\n", True),
+    (b"", b"\n", True),
+    (b"inf -inf\n", b"inf -inf\n", True),
+    (b"inf\n", b"1e308\n", False),
+    (b"nan\n", b"nan\n", False),
+    (b"1e308 -1e308\n", b"-1e308 1e308\n", False),
+    (b"abc 1\n", b"abc 1.0\n", True),
+    (b"abc 1\n", b"abd 1.0\n", False),
+    (b"1" * 100 + b"\n", b"1" * 100 + b".0\n", True),
+]
+
+
+@pytest.mark.parametrize(
+    ("actual", "expected", "result"),
+    test_numpy_floating_point_comparator_params,
+)
+def test_numpy_floating_point_comparator(
+    *,
+    actual: bytes,
+    expected: bytes,
+    result: bool,
+):
+    pytest.importorskip("numpy")
+    comparator = numpy_comparators.NumpyFloatingPointComparator(
+        rel_tol=1e-6, abs_tol=1e-6, fallback=floating
+    )
+    assert floating(actual, expected) == result
+    assert comparator(actual, expected) == result
+
+
+@pytest.mark.parametrize(
+    ("actual", "expected", "result"),
+    [
+        *test_numpy_floating_point_comparator_params,
+        (b"1.5 2\n3 4 5\n6\n", b"1.5 2.0\n3 4 5\n6\n", True),
+        (b"1 2 3 4\n5 6\n", b"1 2\n3 4 5 6\n", False),
+        (b"1 2 3 4\n5 6\n", b"1 2 3 4\n5 7\n", False),
+        (b"1\n2\nabc\n", b"1.0\n2\nabc\n", True),
+        (b"1\n2\n3\n", b"1\n2\n", False),
+    ],
+)
+def test_numpy_floating_point_comparator_chunks(
+    mocker: MockerFixture,
+    *,
+    actual: bytes,
+    expected: bytes,
+    result: bool,
+):
+    pytest.importorskip("numpy")
+    mocker.patch.object(numpy_comparators, "_CHUNK_SIZE", 2)
+    comparator = numpy_comparators.NumpyFloatingPointComparator(
+        rel_tol=1e-6, abs_tol=1e-6, fallback=floating
+    )
+    assert floating(actual, expected) == result
+    assert comparator(actual, expected) == result
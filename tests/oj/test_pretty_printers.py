@@ -0,0 +1,102 @@
+import mmap
+import pathlib
+
+import pytest
+from pytest_mock import MockerFixture
+
+from competitive_verifier.oj.tools import pretty_printers
+
+
+@pytest.fixture(autouse=True)
+def terminal_size(mocker: MockerFixture):
+    mocker.patch.object(pretty_printers, "_get_terminal_size", return_value=40)
+    mocker.patch("colorama.Style.BRIGHT", "")
+    mocker.patch("colorama.Style.DIM", "")
+    mocker.patch("colorama.Style.RESET_ALL", "")
+
+
+@pytest.mark.parametrize(
+    ("content", "expected"),
+    [
+        (b"", "(empty)"),
+        (b"1 2\n3", "1_2\n3(no trailing newline)"),
+        (b"\n", "\n(only newline)"),
+        (b"1\r\n", "1\\r\n"),
+    ],
+)
+def test_make_pretty_small_content(
+    tmp_path: pathlib.Path, content: bytes, expected: str
+):
+    path = tmp_path / "small.txt"
+    path.write_bytes(content)
+    assert (
+        pretty_printers.make_pretty_large_file_content(
+            content, limit=40, head=20, tail=10
+        )
+        == expected
+    )
+    assert (
+        pretty_printers.make_pretty_file_content(path, limit=40, head=20, tail=10)
+        == expected
+    )
+
+
+def test_make_pretty_large_content(tmp_path: pathlib.Path):
+    content = b"".join(b"%d\n" % i for i in range(1000000))
+    path = tmp_path / "large.txt"
+    path.write_bytes(content)
+
+    head = "".join(f"{i}\n" for i in range(20))
+    tail = "".join(f"{i}\n" for i in range(999990, 1000000))
+    omitted = len(content) - len(head) - len(tail)
+    expected = f"{head}... ({omitted} bytes) ...\n{tail}"
+
+    with (
+        path.open("rb") as fh,
+        mmap.mmap(fh.fileno(), 0, access=mmap.ACCESS_READ) as mm,
+    ):
+        assert (
+            pretty_printers.make_pretty_large_file_content(
+                mm, limit=40, head=20, tail=10
+            )
+            == expected
+        )
+    assert (
+        pretty_printers.make_pretty_file_content(path, limit=40, head=20, tail=10)
+        == expected
+    )
+
+
+def test_make_pretty_large_content_long_line():
+    content = b"x" * 100000
+    result = pretty_printers.make_pretty_large_file_content(
+        content, limit=40, head=20, tail=10
+    )
+    assert result == (
+        "x" * 800 + "... (98800 bytes) ..." + "x" * 400 + "(no trailing newline)"
+    )
+
+
+def test_make_pretty_large_content_multibyte():
+    # the windows split the characters of 3 bytes
+    content = "あ".encode() * 100000
+    result = pretty_printers.make_pretty_large_file_content(
+        content, limit=40, head=20, tail=10
+    )
+    assert result == (
+        "あ" * 266 + "... (298800 bytes) ..." + "あ" * 134 + "(no trailing newline)"
+    )
+
+
+def test_make_pretty_large_content_invalid_utf8():
+    content = b"\xff" + b"x" * 100000
+    result = pretty_printers.make_pretty_large_file_content(
+        content, limit=40, head=20, tail=10
+    )
+    assert result == (
+        "'utf-8' codec can't decode byte 0xff in position 0: invalid start byte\ufffd"
+        + "x" * 799
+        + "... (98801 bytes) ..."
+        + "x" * 400
+        + "(no trailing newline)"
+    )
@@ -0,0 +1,110 @@
+from pathlib import Path
+
+import pytest
+from pytest_mock import MockerFixture
+
+from competitive_verifier.exec import exec_command
+from competitive_verifier.oj.resolve import cache
+from competitive_verifier.oj.resolve.cache import ResolveCache
+from competitive_verifier.oj.resolve.resolver import OjResolver
+from competitive_verifier.oj.verify.languages.user_defined import (
+    UserDefinedLanguage,
+)
+from competitive_verifier.oj.verify.list import OjVerifyConfig
+
+
+@pytest.fixture
+def git_repository(monkeypatch: pytest.MonkeyPatch, tmp_path: Path) -> Path:
+    monkeypatch.chdir(tmp_path)
+    exec_command(["git", "init", "-q"], check=True)
+    for i in range(8):
+        d = tmp_path / f"dir{i % 3}"
+        d.mkdir(exist_ok=True)
+        (d / f"file{i}.txt").write_text(
+            f"# competitive-verifier: TITLE file{i}\n", encoding="utf-8"
+        )
+    (tmp_path / "ignored.md").write_text("ignored", encoding="utf-8")
+    exec_command(["git", "add", "."], check=True)
+    return tmp_path
+
+
+@pytest.mark.usefixtures("git_repository")
+def test_resolve_jobs():
+    config = OjVerifyConfig.model_validate(
+        {
+            "languages": {
+                "txt": {
+                    "execute": "cat {path}",
+                    "list_dependencies": "true",
+                },
+            },
+        }
+    )
+    expected = OjResolver(include=[], exclude=[], config=config).resolve(bundle=False)
+    assert list(expected.files) == sorted(
+        Path(f"dir{i % 3}/file{i}.txt") for i in range(8)
+    )
+    assert expected.files[Path("dir1/file4.txt")].document_attributes == {
+        "TITLE": "file4"
+    }
+
+    resolved = OjResolver(include=[], exclude=[], config=config, jobs=4).resolve(
+        bundle=False
+    )
+    assert list(resolved.files) == list(expected.files)
+    assert resolved == expected
+
+
+def test_resolve_jobs_error():
+    with pytest.raises(ValueError, match=r"--jobs must be greater than 0\."):
+        OjResolver(include=[], exclude=[], config=OjVerifyConfig(), jobs=0)
+
+
+@pytest.mark.usefixtures("git_repository")
+def test_resolve_cache(mocker: MockerFixture, tmp_path: Path):
+    Path("common.txt").write_text("common", encoding="utf-8")
+    exec_command(["git", "add", "."], check=True)
+    config = OjVerifyConfig.model_validate(
+        {
+            "languages": {
+                "txt": {
+                    "execute": "cat {path}",
+                    "list_dependencies": "echo common.txt",
+                    "bundle": "cat {path}",
+                },
+            },
+        }
+    )
+    spy = mocker.spy(UserDefinedLanguage, "list_dependencies")
+
+    def resolve():
+        return OjResolver(
+            include=[],
+            exclude=[],
+            config=config,
+            cache=ResolveCache(tmp_path / ".cache"),
+        ).resolve(bundle=True)
+
+    expected = resolve()
+    assert spy.call_count == 9
+    assert expected.files[Path("dir1/file4.txt")].dependencies == {
+        Path("dir1/file4.txt"),
+        Path("common.txt"),
+    }
+
+    assert resolve() == expected
+    assert spy.call_count == 9
+
+    Path("dir1/file4.txt").write_text("changed", encoding="utf-8")
+    resolve()
+    assert spy.call_count == 10
+
+    Path("common.txt").write_text("changed", encoding="utf-8")
+    resolve()
+    assert spy.call_count == 19
+
+    # the dependency shared by all files is hashed once per run
+    hash_spy = mocker.spy(cache, "hash_file")
+    resolve()
+    assert spy.call_count == 19
+    assert [c.args[0] for c in hash_spy.call_args_list].count(Path("common.txt")) == 1
@@ -1,5 +1,28 @@
+import concurrent.futures
+import functools
+import http.server
+import io
+import json
+import pathlib
+import re
+import threading
+import time
+import zipfile
+from collections.abc import Generator
+from typing import Any
+
 import pytest
 
+from competitive_verifier.oj.tools import service
+from competitive_verifier.oj.tools.service import (
+    AOJProblem,
+    LibraryCheckerProblem,
+    session,
+)
+from competitive_verifier.oj.tools.service.session import create_session
+from competitive_verifier.oj.tools.service.testcase_zipper import (
+    extract_zip_to_directory,
+)
 from competitive_verifier.oj.tools.service.text import normpath
 
 test_normpath_params: list[tuple[str, str]] = [
@@ -16,3 +39,223 @@ test_normpath_params: list[tuple[str, str]] = [
 )
 def test_normpath(path: str, expected: str):
     assert normpath(path) == expected
+
+
+class _JudgedatHandler(http.server.BaseHTTPRequestHandler):
+    protocol_version = "HTTP/1.1"
+
+    def do_GET(self):
+        server = self.server
+        assert isinstance(server, _JudgedatServer)
+        with server.lock:
+            server.requests.append(self.path)
+            server.clients.add(self.client_address)
+            fail = server.failures > 0
+            if fail:
+                server.failures -= 1
+            server.active += 1
+            server.max_active = max(server.max_active, server.active)
+        try:
+            self._respond(fail=fail)
+        finally:
+            with server.lock:
+                server.active -= 1
+
+    def _respond(self, *, fail: bool):
+        server = self.server
+        assert isinstance(server, _JudgedatServer)
+        time.sleep(server.delay)
+        if fail:
+            self._send(503, b"")
+        elif self.path == "/testcases/ITP1_1_A/header":
+            headers = [{"serial": i, "name": f"case{i}"} for i in range(1, 6)]
+            self._send(200, json.dumps({"headers": headers}).encode())
+        elif m := re.fullmatch(r"/testcases/ITP1_1_A/(\d+)/(in|out)", self.path):
+            self._send(200, f"{m.group(2)}{m.group(1)}\n".encode())
+        else:
+            self._send(404, b"")
+
+    def _send(self, code: int, body: bytes):
+        self.send_response(code)
+        self.send_header("Content-Length", str(len(body)))
+        self.end_headers()
+        self.wfile.write(body)
+
+    def log_message(self, format: str, *args: Any) -> None:  # noqa: A002
+        pass
+
+
+class _JudgedatServer(http.server.ThreadingHTTPServer):
+    def __init__(self) -> None:
+        super().__init__(("127.0.0.1", 0), _JudgedatHandler)
+        self.lock = threading.Lock()
+        self.requests: list[str] = []
+        self.clients: set[tuple[str, int]] = set()
+        self.failures = 0
+        self.delay = 0.0
+        self.active = 0
+        self.max_active = 0
+
+
+@pytest.fixture
+def judgedat(
+    monkeypatch: pytest.MonkeyPatch,
+) -> Generator[_JudgedatServer, None, None]:
+    server = _JudgedatServer()
+    thread = threading.Thread(target=server.serve_forever, daemon=True)
+    thread.start()
+    monkeypatch.setattr(
+        AOJProblem, "judgedat_url", f"http://127.0.0.1:{server.server_port}"
+    )
+    # a fresh pool for the server
+    monkeypatch.setattr(service.aoj, "get_session", functools.cache(create_session))
+    try:
+        yield server
+    finally:
+        server.shutdown()
+        server.server_close()
+
+
+def test_aoj_download_system_cases(judgedat: _JudgedatServer):
+    testcases = AOJProblem(problem_id="ITP1_1_A").download_system_cases()
+
+    assert testcases == [
+        service.TestCase(
+            f"case{i}",
+            f"case{i}",
+            f"in{i}\n".encode(),
+            f"case{i}",
+            f"out{i}\n".encode(),
+        )
+        for i in range(1, 6)
+    ]
+    assert len(judgedat.requests) == 11
+    # the connections are kept alive
+    assert len(judgedat.clients) <= AOJProblem.testcase_jobs
+
+
+def test_aoj_download_system_cases_retry(judgedat: _JudgedatServer):
+    judgedat.failures = 1
+
+    testcases = AOJProblem(problem_id="ITP1_1_A").download_system_cases()
+
+    assert len(testcases) == 5
+    assert judgedat.requests[:2] == ["/testcases/ITP1_1_A/header"] * 2
+
+
+def test_aoj_download_system_cases_limit_per_host(
+    judgedat: _JudgedatServer, monkeypatch: pytest.MonkeyPatch
+):
+    judgedat.delay = 0.05
+    monkeypatch.setattr(session, "REQUESTS_PER_HOST", 2)
+    monkeypatch.setattr(session, "_host_semaphores", {})
+
+    problems = [AOJProblem(problem_id="ITP1_1_A") for _ in range(3)]
+    with concurrent.futures.ThreadPoolExecutor(max_workers=len(problems)) as executor:
+        results = list(executor.map(AOJProblem.download_system_cases, problems))
+
+    assert all(len(testcases) == 5 for testcases in results)
+    assert len(judgedat.requests) == 33
+    assert judgedat.max_active == 2
+
+
+def test_aoj_download_system_cases_to(
+    judgedat: _JudgedatServer, tmp_path: pathlib.Path
+):
+    files = AOJProblem(problem_id="ITP1_1_A").download_system_cases_to(tmp_path)
+
+    assert files == [
+        tmp_path / f"case{i}.{ext}" for i in range(1, 6) for ext in ("in", "out")
+    ]
+    assert {p.name: p.read_bytes() for p in tmp_path.iterdir()} == {
+        f"case{i}.{ext}": f"{ext}{i}\n".encode()
+        for i in range(1, 6)
+        for ext in ("in", "out")
+    }
+
+
+def test_extract_zip_to_directory(tmp_path: pathlib.Path):
+    buf = io.BytesIO()
+    with zipfile.ZipFile(buf, "w") as zf:
+        zf.writestr("test_in/", b"")
+        zf.writestr("test_in/01.txt", b"1 2\n")
+        zf.writestr("test_out/01.txt", b"3\n")
+        zf.writestr("test_in/02.txt", b"4 5\n")
+        zf.writestr("test_out/02.txt", b"9\n")
+        zf.writestr("test_in/garbage.txt", b"")
+    buf.seek(0)
+
+    files = extract_zip_to_directory(
+        buf, "test_%e/%s", tmp_path, ignore_unmatched_samples=True
+    )
+
+    assert files == [
+        tmp_path / "01.in",
+        tmp_path / "01.out",
+        tmp_path / "02.in",
+        tmp_path / "02.out",
+    ]
+    assert [p.read_bytes() for p in files] == [b"1 2\n", b"3\n", b"4 5\n", b"9\n"]
+
+
+@pytest.fixture
+def library_checker_repository(
+    monkeypatch: pytest.MonkeyPatch, tmp_path: pathlib.Path
+) -> pathlib.Path:
+    for category, problem_id in [
+        ("sample", "aplusb"),
+        ("sample", "many_aplusb"),
+        ("graph", "unionfind"),
+        ("graph", "shortest_path"),
+    ]:
+        (tmp_path / category / problem_id).mkdir(parents=True)
+        (tmp_path / category / problem_id / "info.toml").write_text("")
+    # generate.py records the problems in the invocation
+    (tmp_path / "generate.py").write_text(
+        "import pathlib, sys\n"
+        "for toml in sys.argv[1:]:\n"
+        "    d = pathlib.Path(toml).parent\n"
+        "    (d / 'generated').write_text(' '.join(sys.argv[1:]))\n"
+    )
+    monkeypatch.setattr(
+        LibraryCheckerProblem, "get_cloned_repository_path", lambda: tmp_path
+    )
+    monkeypatch.setattr(LibraryCheckerProblem, "is_repository_updated", True)
+    monkeypatch.setattr(LibraryCheckerProblem, "_problem_directories", None)
+    monkeypatch.setattr(LibraryCheckerProblem, "_generated_problems", set[str]())
+    return tmp_path
+
+
+def test_library_checker_problem_directory(library_checker_repository: pathlib.Path):
+    assert (
+        LibraryCheckerProblem(problem_id="unionfind").get_problem_directory_path()
+        == library_checker_repository / "graph" / "unionfind"
+    )
+    with pytest.raises(RuntimeError):
+        LibraryCheckerProblem(problem_id="sample").get_problem_directory_path()
+
+
+def test_library_checker_generate_test_cases(
+    library_checker_repository: pathlib.Path,
+):
+    problems = [
+        LibraryCheckerProblem(problem_id=problem_id)
+        for problem_id in ("aplusb", "many_aplusb", "unionfind")
+    ]
+
+    LibraryCheckerProblem.generate_test_cases(problems, jobs=2)
+
+    generated = {
+        p.problem_id: (p.get_problem_directory_path() / "generated").read_text()
+        for p in problems
+    }
+    # 2 invocations of generate.py
+    assert len(set(generated.values())) == 2
+    assert not (
+        library_checker_repository / "graph" / "shortest_path" / "generated"
+    ).exists()
+
+    # the generated problems are not generated again
+    (library_checker_repository / "sample" / "aplusb" / "generated").unlink()
+    problems[0].generate_test_cases_in_cloned_repository()
+    assert not (library_checker_repository / "sample" / "aplusb" / "generated").exists()
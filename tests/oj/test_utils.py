@@ -0,0 +1,84 @@
+import sys
+from pathlib import Path
+
+import pytest
+
+from competitive_verifier.oj.tools import utils
+from competitive_verifier.oj.tools.utils import measure_command
+
+requires_rusage = pytest.mark.skipif(
+    not utils.HAS_RUSAGE, reason="os.wait4 is not available"
+)
+
+
+@requires_rusage
+def test_measure_command_rusage():
+    info, proc = measure_command(
+        [
+            sys.executable,
+            "-c",
+            "import sys; b = bytearray(64 * 1000 * 1000); print(sys.stdin.read())",
+        ],
+        input=b"hello",
+    )
+    assert proc.returncode == 0
+    assert info.answer == b"hello\n"
+    assert info.memory is not None
+    assert info.memory > 64
+    assert info.cpu_time is not None
+
+
+@requires_rusage
+def test_measure_command_rusage_cpu_time():
+    info, _ = measure_command(
+        [sys.executable, "-c", "import time; time.sleep(0.5)"],
+    )
+    assert info.elapsed >= 0.5
+    assert info.cpu_time is not None
+    assert info.cpu_time < info.elapsed
+
+
+@requires_rusage
+def test_measure_command_rusage_returncode(tmp_path: Path):
+    output = tmp_path / "out"
+    with output.open("wb") as fh:
+        info, proc = measure_command(
+            [sys.executable, "-c", "import sys; print('out'); sys.exit(3)"],
+            stdout=fh,
+        )
+    assert proc.returncode == 3
+    assert info.answer is None
+    assert output.read_bytes().strip() == b"out"
+
+
+@requires_rusage
+def test_measure_command_rusage_timeout():
+    info, proc = measure_command(
+        [sys.executable, "-c", "import time; time.sleep(10)"],
+        timeout=0.5,
+    )
+    assert info.timed_out
+    # the killed process is reaped
+    assert proc.returncode is not None
+    assert proc.poll() == proc.returncode
+    assert info.answer is None
+    assert info.elapsed < 5
+
+
+@requires_rusage
+def test_measure_command_rusage_without_pidfd(monkeypatch: pytest.MonkeyPatch):
+    monkeypatch.delattr("os.pidfd_open", raising=False)
+    info, proc = measure_command(
+        [sys.executable, "-c", "import time; time.sleep(0.1); print('done')"],
+    )
+    assert proc.returncode == 0
+    assert info.answer == b"done\n"
+    assert not info.timed_out
+
+    info, proc = measure_command(
+        [sys.executable, "-c", "import time; time.sleep(10)"],
+        timeout=0.5,
+    )
+    assert info.timed_out
+    assert proc.returncode is not None
+    assert info.elapsed < 5
@@ -38,14 +38,20 @@ test_parse_args_params: list[
         ["verify", "--verify-json", ".competitive-verifier/verify_files.json"],
         {
             "subcommand": "verify",
+            "compile_cache": False,
             "default_mle": None,
+            "tle_by_cpu_time": False,
             "default_tle": None,
             "download": True,
             "ignore_error": True,
+            "jobs": 1,
             "output": None,
+            "pin_cpu": False,
             "prev_result": None,
             "split": None,
             "split_index": None,
+            "split_strategy": "count",
+            "testcase_jobs": 1,
             "timeout": math.inf,
             "verbose": False,
             "verify_files_json": pathlib.Path(
@@ -59,14 +65,20 @@ test_parse_args_params: list[
         ["verify"],
         {
             "subcommand": "verify",
+            "compile_cache": False,
             "default_mle": None,
+            "tle_by_cpu_time": False,
             "default_tle": None,
             "download": True,
             "ignore_error": True,
+            "jobs": 1,
             "output": None,
+            "pin_cpu": False,
             "prev_result": None,
             "split": None,
             "split_index": None,
+            "split_strategy": "count",
+            "testcase_jobs": 1,
             "timeout": math.inf,
             "verbose": False,
             "verify_files_json": pathlib.Path(
@@ -83,7 +95,9 @@ test_parse_args_params: list[
             "1024.5",
             "--tle",
             "2.5",
+            "--tle-by-cpu-time",
             "--no-download",
+            "--compile-cache",
             "--check-error",
             "--write-summary",
             "--verbose",
@@ -91,6 +105,13 @@ test_parse_args_params: list[
             "6",
             "--split-index",
             "6",
+            "--split-strategy",
+            "cost",
+            "--jobs",
+            "3",
+            "--testcase-jobs",
+            "4",
+            "--pin-cpu",
             "--timeout",
             "20.5",
             "--prev-result",
@@ -100,14 +121,20 @@ test_parse_args_params: list[
         ],
         {
             "subcommand": "verify",
+            "compile_cache": True,
             "default_mle": 1024.5,
+            "tle_by_cpu_time": True,
             "default_tle": 2.5,
             "download": False,
             "ignore_error": False,
+            "jobs": 3,
             "output": pathlib.Path(".competitive-verifier/out.json"),
+            "pin_cpu": True,
             "prev_result": pathlib.Path(".competitive-verifier/prev.json"),
             "split": 6,
             "split_index": 6,
+            "split_strategy": "cost",
+            "testcase_jobs": 4,
             "timeout": 20.5,
             "verbose": True,
             "verify_files_json": pathlib.Path(
@@ -125,14 +152,20 @@ test_parse_args_params: list[
         ],
         {
             "subcommand": "verify",
+            "compile_cache": False,
             "default_mle": None,
+            "tle_by_cpu_time": False,
             "default_tle": None,
             "download": True,
             "ignore_error": True,
+            "jobs": 1,
             "output": pathlib.Path(".competitive-verifier/out.json"),
+            "pin_cpu": False,
             "prev_result": None,
             "split": None,
             "split_index": None,
+            "split_strategy": "count",
+            "testcase_jobs": 1,
             "timeout": math.inf,
             "verbose": False,
             "verify_files_json": pathlib.Path(
@@ -209,6 +242,7 @@ test_parse_args_params: list[
             "subcommand": "download",
             "verbose": False,
             "urls": [],
+            "jobs": 1,
             "verify_files_json": None,
         },
     ),
@@ -224,6 +258,7 @@ test_parse_args_params: list[
             "subcommand": "download",
             "verbose": False,
             "urls": ["https://example.com/ex1"],
+            "jobs": 1,
             "verify_files_json": pathlib.Path(
                 ".competitive-verifier/verify_files.json"
             ),
@@ -231,11 +266,19 @@ test_parse_args_params: list[
     ),
     (
         {COMPETITIVE_VERIFY_FILES_PATH: ".competitive-verifier/verify_files.json"},
-        ["download", "https://example.com/ex1", "https://example.com/ex2", "--verbose"],
+        [
+            "download",
+            "https://example.com/ex1",
+            "https://example.com/ex2",
+            "--verbose",
+            "--jobs",
+            "3",
+        ],
         {
             "subcommand": "download",
             "verbose": True,
             "urls": ["https://example.com/ex1", "https://example.com/ex2"],
+            "jobs": 3,
             "verify_files_json": pathlib.Path(
                 ".competitive-verifier/verify_files.json"
             ),
@@ -248,6 +291,7 @@ test_parse_args_params: list[
             "subcommand": "download",
             "verbose": False,
             "urls": ["https://example.com/ex1", "https://example.com/ex2"],
+            "jobs": 1,
             "verify_files_json": None,
         },
     ),
@@ -321,6 +365,8 @@ test_parse_args_params: list[
             "verbose": False,
             "bundle": True,
             "config": None,
+            "jobs": 1,
+            "resolve_cache": False,
             "exclude": [],
             "include": [],
         },
@@ -339,12 +385,17 @@ test_parse_args_params: list[
             "indir1/ext",
             "indir2/ext/*",
             "--no-bundle",
+            "--jobs",
+            "4",
+            "--resolve-cache",
         ],
         {
             "subcommand": "oj-resolve",
             "verbose": True,
             "bundle": False,
             "config": pathlib.Path("new-config.toml"),
+            "jobs": 4,
+            "resolve_cache": True,
             "include": ["indir1", "indir2"],
             "exclude": ["indir1/ext", "indir2/ext/*"],
         },
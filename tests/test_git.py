@@ -0,0 +1,46 @@
+import datetime
+from pathlib import Path
+
+import pytest
+
+from competitive_verifier.git import CommitTimeIndex
+
+JST = datetime.timezone(datetime.timedelta(hours=9))
+LOG = (
+    "\x012020-01-04 00:00:00 +0000\nd\0a\0"
+    "\0\x012020-01-03 00:00:00 +0000\na\0"
+    "\0\x012020-01-02 00:00:00 +0900"
+    "\0\x012020-01-01 00:00:00 +0900\na\0sub/b c\0"
+)
+
+test_commit_time_index_params: list[tuple[list[str], datetime.datetime]] = [
+    (["a"], datetime.datetime(2020, 1, 4, tzinfo=datetime.timezone.utc)),
+    (["d"], datetime.datetime(2020, 1, 4, tzinfo=datetime.timezone.utc)),
+    (["sub/b c"], datetime.datetime(2020, 1, 1, tzinfo=JST)),
+    (["sub/b c", "a"], datetime.datetime(2020, 1, 4, tzinfo=datetime.timezone.utc)),
+    (["sub/../a"], datetime.datetime(2020, 1, 4, tzinfo=datetime.timezone.utc)),
+    (["nothing"], datetime.datetime.min.replace(tzinfo=datetime.timezone.utc)),
+    ([], datetime.datetime.min.replace(tzinfo=datetime.timezone.utc)),
+]
+
+
+@pytest.mark.parametrize(
+    ("files", "expected"),
+    test_commit_time_index_params,
+)
+def test_commit_time_index(
+    monkeypatch: pytest.MonkeyPatch,
+    tmp_path: Path,
+    files: list[str],
+    expected: datetime.datetime,
+):
+    monkeypatch.chdir(tmp_path)
+    index = CommitTimeIndex(tmp_path, LOG)
+    assert index.get_commit_time(map(Path, files)) == expected
+
+
+def test_commit_time_index_empty():
+    index = CommitTimeIndex(".", "")
+    assert index.get_commit_time([Path("a")]) == datetime.datetime.min.replace(
+        tzinfo=datetime.timezone.utc
+    )
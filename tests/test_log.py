@@ -1,10 +1,18 @@
+import concurrent.futures
+import logging
 import os
+import threading
 from io import StringIO
 
 import pytest
 from pytest_mock import MockerFixture
 
-from competitive_verifier.log import group
+from competitive_verifier.log import (
+    deferred_group,
+    enable_deferred_groups,
+    group,
+    in_current_context,
+)
 
 
 class TestLogGroup:
@@ -63,3 +71,101 @@ class TestLogGroup:
                 fp.read()
                 == "<------------- \x1b[36mFinish group:\x1b[33mTestTitle\x1b[0m ------------->\n"
             )
+
+
+class TestDeferredGroup:
+    def test_deferred_group(self):
+        logger = logging.getLogger("test_deferred_group")
+        handler_stream = StringIO()
+        handler = logging.StreamHandler(handler_stream)
+        handler.setFormatter(logging.Formatter("%(message)s"))
+        root = logging.getLogger()
+        root.addHandler(handler)
+        prev_level = root.level
+        root.setLevel(logging.INFO)
+        try:
+            entered = threading.Event()
+            logged = threading.Event()
+
+            def worker(name: str):
+                with deferred_group(name, stream=handler_stream):
+                    entered.set()
+                    logger.info("%s: first", name)
+                    logged.wait()
+                    logger.info("%s: second", name)
+
+            with enable_deferred_groups():
+                thread = threading.Thread(target=worker, args=("worker",))
+                thread.start()
+                entered.wait()
+                logger.info("main")
+                logged.set()
+                thread.join()
+        finally:
+            root.removeHandler(handler)
+            root.setLevel(prev_level)
+
+        assert handler_stream.getvalue().splitlines() == [
+            "main",
+            "<------------- \x1b[36m Start group:\x1b[33mworker\x1b[0m ------------->",
+            "worker: first",
+            "worker: second",
+            "<------------- \x1b[36mFinish group:\x1b[33mworker\x1b[0m ------------->",
+        ]
+
+    def test_deferred_group_worker_threads(self):
+        logger = logging.getLogger("test_deferred_group")
+        handler_stream = StringIO()
+        handler = logging.StreamHandler(handler_stream)
+        handler.setFormatter(logging.Formatter("%(message)s"))
+        root = logging.getLogger()
+        root.addHandler(handler)
+        prev_level = root.level
+        root.setLevel(logging.INFO)
+        try:
+            with (
+                enable_deferred_groups(),
+                deferred_group("group", stream=handler_stream),
+                concurrent.futures.ThreadPoolExecutor(max_workers=2) as executor,
+            ):
+                logger.info("before")
+                list(executor.map(in_current_context(logger.info), ["a", "b"]))
+                logger.info("after")
+            logger.info("outside")
+        finally:
+            root.removeHandler(handler)
+            root.setLevel(prev_level)
+
+        lines = handler_stream.getvalue().splitlines()
+        assert lines[0] == (
+            "<------------- \x1b[36m Start group:\x1b[33mgroup\x1b[0m ------------->"
+        )
+        assert lines[1] == "before"
+        assert sorted(lines[2:4]) == ["a", "b"]
+        assert lines[4:] == [
+            "after",
+            "<------------- \x1b[36mFinish group:\x1b[33mgroup\x1b[0m ------------->",
+            "outside",
+        ]
+
+    def test_enable_deferred_groups(self):
+        logger = logging.getLogger("test_deferred_group")
+        handler_stream = StringIO()
+        handler = logging.StreamHandler(handler_stream)
+        handler.setFormatter(logging.Formatter("%(message)s"))
+        root = logging.getLogger()
+        root.addHandler(handler)
+        prev_level = root.level
+        root.setLevel(logging.INFO)
+        try:
+            with enable_deferred_groups():
+                assert len(handler.filters) == 1
+            assert handler.filters == []
+
+            # the records are not held back outside enable_deferred_groups
+            with deferred_group("group", stream=handler_stream):
+                logger.info("inside")
+                assert handler_stream.getvalue().splitlines()[-1] == "inside"
+        finally:
+            root.removeHandler(handler)
+            root.setLevel(prev_level)
@@ -0,0 +1,128 @@
+import os
+import pathlib
+import sys
+
+import pytest
+
+from competitive_verifier.models import (
+    CommandVerification,
+    ConstVerification,
+    ShellCommand,
+)
+from competitive_verifier.models.result_status import ResultStatus
+from competitive_verifier.verify.compile_cache import CompileCache
+
+COMPILE_SCRIPT = """
+import pathlib, sys
+work = pathlib.Path(sys.argv[1])
+(work / "a.out").write_text("compiled")
+with (work.parent / "count.txt").open("a") as fp:
+    fp.write("1")
+"""
+
+
+def _count(tmp_path: pathlib.Path) -> int:
+    count = tmp_path / "count.txt"
+    return len(count.read_text()) if count.exists() else 0
+
+
+def test_compile_cache(tmp_path: pathlib.Path):
+    workdir = tmp_path / "work"
+    verification = CommandVerification(
+        command="true",
+        compile=[sys.executable, "-c", COMPILE_SCRIPT, str(workdir)],
+        tempdir=workdir,
+    )
+    cache = CompileCache(tmp_path / "cache")
+
+    assert cache.run_compile_command(verification, sources_digest="digest1")
+    assert _count(tmp_path) == 1
+
+    (workdir / "a.out").unlink()
+    assert cache.run_compile_command(verification, sources_digest="digest1")
+    assert _count(tmp_path) == 1
+    assert (workdir / "a.out").read_text() == "compiled"
+
+    assert cache.run_compile_command(verification, sources_digest="digest2")
+    assert _count(tmp_path) == 2
+
+
+def test_compile_cache_failure(tmp_path: pathlib.Path):
+    workdir = tmp_path / "work"
+    verification = CommandVerification(
+        command="true",
+        compile=[sys.executable, "-c", "import sys; sys.exit(1)"],
+        tempdir=workdir,
+    )
+    cache = CompileCache(tmp_path / "cache")
+
+    assert not cache.run_compile_command(verification, sources_digest="digest")
+    assert not (tmp_path / "cache").exists()
+
+
+def test_compile_cache_no_compile(tmp_path: pathlib.Path):
+    cache = CompileCache(tmp_path / "cache")
+
+    assert cache.run_compile_command(
+        ConstVerification(status=ResultStatus.SUCCESS), sources_digest="digest"
+    )
+    assert not (tmp_path / "cache").exists()
+
+
+@pytest.mark.skipif(os.name != "posix", reason="the compile command is a script")
+def test_compile_cache_unknown_compiler(tmp_path: pathlib.Path):
+    script = tmp_path / "build.sh"
+    script.write_text(f"#!/bin/sh\ntouch {tmp_path / 'called'}\n")
+    script.chmod(0o755)
+    cache = CompileCache(tmp_path / "cache")
+
+    cache.get_key(ShellCommand(command=[str(script), "--fast"]), sources_digest="")
+
+    # `build.sh --version` is never run
+    assert not (tmp_path / "called").exists()
+
+
+def test_compile_cache_excludes_test_cases(tmp_path: pathlib.Path):
+    workdir = tmp_path / "work"
+    script = (
+        COMPILE_SCRIPT
+        + "(work / 'test').mkdir()\n(work / 'test' / '1.in').write_text('1')\n"
+    )
+    verification = CommandVerification(
+        command="true",
+        compile=[sys.executable, "-c", script, str(workdir)],
+        tempdir=workdir,
+    )
+    cache = CompileCache(tmp_path / "cache")
+
+    assert cache.run_compile_command(verification, sources_digest="digest")
+
+    assert [p.name for p in (tmp_path / "cache").glob("*/*")] == ["a.out", "files.json"]
+
+
+def test_compile_cache_prune(tmp_path: pathlib.Path):
+    workdir = tmp_path / "work"
+    verification = CommandVerification(
+        command="true",
+        compile=[sys.executable, "-c", COMPILE_SCRIPT, str(workdir)],
+        tempdir=workdir,
+    )
+    # an entry is 8 bytes of a.out and 9 bytes of files.json
+    cache = CompileCache(tmp_path / "cache", max_size=40)
+
+    for digest in ("digest1", "digest2"):
+        assert cache.run_compile_command(verification, sources_digest=digest)
+    key1 = cache.get_key(
+        ShellCommand.parse_command_like(
+            [sys.executable, "-c", COMPILE_SCRIPT, str(workdir)]
+        ),
+        sources_digest="digest1",
+    )
+    # digest1 is used recently
+    assert cache.restore(key1, workdir)
+    assert len(list((tmp_path / "cache").iterdir())) == 2
+
+    assert cache.run_compile_command(verification, sources_digest="digest3")
+    assert _count(tmp_path) == 3
+    assert len(list((tmp_path / "cache").iterdir())) == 2
+    assert cache.restore(key1, workdir)
@@ -36,6 +36,17 @@ def test_get_split_state(
     assert v.split_state == expected
 
 
+def test_get_split_state_strategy():
+    v = Verify(
+        subcommand="verify",
+        verify_files_json=pathlib.Path("verify.json"),
+        split=5,
+        split_index=2,
+        split_strategy="cost",
+    )
+    assert v.split_state == SplitState(size=5, index=2, strategy="cost")
+
+
 get_split_state_error_params = {
     "No split index": (
         ["--verify-json", "verify.json", "--split", "2"],
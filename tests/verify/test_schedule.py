@@ -0,0 +1,81 @@
+import pathlib
+
+from competitive_verifier.models import (
+    FileResult,
+    ResultStatus,
+    VerificationResult,
+    VerifyCommandResult,
+)
+from competitive_verifier.verify.schedule import estimate_cost, schedule_by_history
+
+
+def file_result(*results: tuple[ResultStatus, float]) -> FileResult:
+    return FileResult(
+        verifications=[
+            VerificationResult(status=status, elapsed=elapsed)
+            for status, elapsed in results
+        ]
+    )
+
+
+def test_estimate_cost():
+    assert estimate_cost(None) is None
+    assert estimate_cost(FileResult()) is None
+    assert (
+        estimate_cost(
+            file_result((ResultStatus.SUCCESS, 1.5), (ResultStatus.SUCCESS, 2.0))
+        )
+        == 3.5
+    )
+    assert (
+        estimate_cost(
+            file_result((ResultStatus.SUCCESS, 1.5), (ResultStatus.FAILURE, 2.0))
+        )
+        == 3.5
+    )
+    # interrupted by the timeout
+    assert (
+        estimate_cost(
+            file_result((ResultStatus.SUCCESS, 1.5), (ResultStatus.SKIPPED, 2.0))
+        )
+        is None
+    )
+    assert estimate_cost(file_result((ResultStatus.SKIPPED, 0))) is None
+
+
+def test_schedule_by_history():
+    prev_result = VerifyCommandResult(
+        total_seconds=100,
+        files={
+            pathlib.Path("slow.py"): file_result((ResultStatus.SUCCESS, 30)),
+            pathlib.Path("fast.py"): file_result(
+                (ResultStatus.SUCCESS, 1), (ResultStatus.SUCCESS, 2)
+            ),
+            pathlib.Path("medium.py"): file_result((ResultStatus.SUCCESS, 10)),
+            pathlib.Path("failed.py"): file_result(
+                (ResultStatus.SUCCESS, 5), (ResultStatus.FAILURE, 20)
+            ),
+            pathlib.Path("skipped.py"): file_result((ResultStatus.SKIPPED, 0)),
+        },
+    )
+    files = {
+        pathlib.Path(name): name
+        for name in (
+            "slow.py",
+            "new.py",
+            "fast.py",
+            "failed.py",
+            "medium.py",
+            "skipped.py",
+        )
+    }
+
+    assert list(schedule_by_history(files, prev_result).values()) == [
+        "new.py",
+        "skipped.py",
+        "failed.py",
+        "fast.py",
+        "medium.py",
+        "slow.py",
+    ]
+    assert schedule_by_history(files, None) == dict(sorted(files.items()))
@@ -21,3 +21,73 @@ test_split_by_split_state_params: list[tuple[SplitState, list[Any], list[Any]]]
 )
 def test_split_by_split_state(state: SplitState, lst: list[Any], expected: list[Any]):
     assert state.split(lst) == expected
+
+
+test_split_by_cost_params: list[
+    tuple[SplitState, list[Any], list[float | None], list[Any]]
+] = [
+    (SplitState(size=2, index=0, strategy="cost"), [0, 1, 2, 3], [5, 1, 1, 3], [0]),
+    (
+        SplitState(size=2, index=1, strategy="cost"),
+        [0, 1, 2, 3],
+        [5, 1, 1, 3],
+        [1, 2, 3],
+    ),
+    (
+        SplitState(size=3, index=0, strategy="cost"),
+        ["a", "b", "c", "d", "e"],
+        [1, 1, 1, 1, 1],
+        ["a", "d"],
+    ),
+    (
+        SplitState(size=3, index=2, strategy="cost"),
+        ["a", "b", "c", "d", "e"],
+        [1, 1, 1, 1, 1],
+        ["c"],
+    ),
+    # None is regarded as the median of the known costs
+    (
+        SplitState(size=2, index=0, strategy="cost"),
+        [0, 1, 2, 3],
+        [None, 4, 2, 1],
+        [1, 3],
+    ),
+    (
+        SplitState(size=2, index=1, strategy="cost"),
+        [0, 1, 2, 3],
+        [None, None, None, None],
+        [1, 3],
+    ),
+    (SplitState(size=4, index=3, strategy="cost"), [0, 1], [1, 2], []),
+]
+
+
+@pytest.mark.parametrize(
+    ("state", "lst", "costs", "expected"),
+    test_split_by_cost_params,
+    ids=range(len(test_split_by_cost_params)),
+)
+def test_split_by_cost(
+    state: SplitState,
+    lst: list[Any],
+    costs: list[float | None],
+    expected: list[Any],
+):
+    assert state.split_by_cost(lst, costs) == expected
+
+
+def test_split_by_cost_covers_all():
+    lst = list(range(100))
+    costs = [float((i * 37) % 11) for i in lst]
+    chunks = [
+        SplitState(size=7, index=i, strategy="cost").split_by_cost(lst, costs)
+        for i in range(7)
+    ]
+    assert sorted(x for c in chunks for x in c) == lst
+    totals = [sum(costs[x] for x in c) for c in chunks]
+    assert max(totals) - min(totals) <= max(costs)
+
+
+def test_split_by_cost_length_mismatch():
+    with pytest.raises(ValueError, match="the same length"):
+        SplitState(size=2, index=0, strategy="cost").split_by_cost([0, 1], [1.0])
@@ -11,6 +11,7 @@ from competitive_verifier.models import (
     ConstVerification,
     FileResult,
     ResultStatus,
+    Verification,
     VerificationFile,
     VerificationInput,
     VerificationResult,
@@ -525,3 +526,124 @@ def test_current_verification_files(index: int, expected: dict[Path, Verificatio
     }
     assert resolver.remaining_verification_files == remaining_verification_files
     assert resolver.current_verification_files == expected
+
+
+def test_current_verification_files_by_cost(
+    monkeypatch: pytest.MonkeyPatch, tmp_path: Path
+):
+    monkeypatch.chdir(tmp_path)
+    paths = [Path("a.py"), Path("b.py"), Path("c.py"), Path("d.py")]
+    for p in paths:
+        p.touch()
+    command_verification = {"verification": {"type": "command", "command": "true"}}
+
+    def failure(elapsed: float) -> FileResult:
+        return FileResult(
+            verifications=[
+                VerificationResult(
+                    elapsed=elapsed,
+                    status=ResultStatus.FAILURE,
+                    last_execution_time=datetime.datetime(2016, 12, 24),
+                ),
+            ]
+        )
+
+    def resolver(index: int) -> MockInputContainer:
+        return MockInputContainer(
+            {
+                "files": {
+                    "a.py": command_verification,
+                    "b.py": command_verification,
+                    "c.py": command_verification,
+                    "d.py": command_verification,
+                },
+            },
+            prev_result=VerifyCommandResult(
+                total_seconds=9,
+                files={
+                    Path("a.py"): failure(1),
+                    Path("b.py"): failure(5),
+                    Path("c.py"): failure(3),
+                },
+            ),
+            verification_time=datetime.datetime(2018, 12, 25),
+            file_timestamps=dict.fromkeys(paths, datetime.datetime(2015, 12, 25)),
+            split_state=SplitState(size=2, index=index, strategy="cost"),
+        )
+
+    # d.py has no history and is regarded as the median 3 seconds
+    assert list(resolver(0).current_verification_files) == [
+        Path("a.py"),
+        Path("b.py"),
+    ]
+    assert list(resolver(1).current_verification_files) == [
+        Path("c.py"),
+        Path("d.py"),
+    ]
+
+
+class DigestInputContainer(MockInputContainer):
+    def get_verification_digest(
+        self, path: Path, verification: Verification
+    ) -> str | None:
+        return self.content_digest(path, verification)
+
+
+def test_file_need_verification_by_digest(
+    monkeypatch: pytest.MonkeyPatch, tmp_path: Path
+):
+    monkeypatch.chdir(tmp_path)
+    Path("lib.py").write_text("lib")
+    Path("test.py").write_text("test")
+    obj = {
+        "files": {
+            "lib.py": {},
+            "test.py": {
+                "dependencies": ["lib.py"],
+                "verification": {"type": "command", "command": "true"},
+            },
+        },
+    }
+    # the timestamp is always newer than the last execution
+    timestamps = {Path("test.py"): datetime.datetime(2020, 1, 1)}
+
+    def prev_result(digest: str | None, status: ResultStatus) -> FileResult:
+        return FileResult(
+            verifications=[
+                VerificationResult(
+                    elapsed=1.0,
+                    status=status,
+                    last_execution_time=datetime.datetime(2019, 1, 1),
+                    digest=digest,
+                )
+            ]
+        )
+
+    container = DigestInputContainer(
+        obj,
+        verification_time=datetime.datetime(2021, 1, 1),
+        file_timestamps=timestamps,
+    )
+    digest = container.content_digest(
+        Path("test.py"), CommandVerification(command="true")
+    )
+    assert not container.file_need_verification(
+        Path("test.py"), prev_result(digest, ResultStatus.SUCCESS)
+    )
+    assert container.file_need_verification(
+        Path("test.py"), prev_result(digest, ResultStatus.FAILURE)
+    )
+    # fallback to timestamp
+    assert container.file_need_verification(
+        Path("test.py"), prev_result(None, ResultStatus.SUCCESS)
+    )
+
+    Path("lib.py").write_text("lib changed")
+    container = DigestInputContainer(
+        obj,
+        verification_time=datetime.datetime(2021, 1, 1),
+        file_timestamps=timestamps,
+    )
+    assert container.file_need_verification(
+        Path("test.py"), prev_result(digest, ResultStatus.SUCCESS)
+    )
@@ -12,6 +12,7 @@ from competitive_verifier.models import (
     ResultStatus,
     VerificationInput,
     VerificationResult,
+    VerifierError,
     VerifyCommandResult,
 )
 from competitive_verifier.verify.verifier import BaseVerifier, SplitState
@@ -34,6 +35,7 @@ class MockVerifier(BaseVerifier):
         prev_result: VerifyCommandResult | None,
         verification_time: datetime.datetime,
         split_state: SplitState | None,
+        jobs: int = 1,
     ) -> None:
         super().__init__(
             verifications=VerificationInput.model_validate(obj),
@@ -43,6 +45,7 @@ class MockVerifier(BaseVerifier):
             default_tle=10,
             default_mle=256,
             timeout=10,
+            jobs=jobs,
         )
         self.mock_current_time = datetime.datetime(2006, 1, 2, 15, 4, 5)
 
@@ -651,3 +654,54 @@ def test_verify_timeout(
 
     result = verifier.verify()
     assert result == VerifyCommandResult.model_validate(expected)
+
+
+def test_verify_jobs(mocker: MockerFixture):
+    mocker.patch.object(pathlib.Path, "exists", return_value=True)
+    mocker.patch("time.perf_counter", return_value=0.0)
+    mocker.patch("competitive_verifier.verify.verifier.run_download", return_value=True)
+
+    files = {
+        "lib/hoge1.py": {},
+        **{
+            f"test/foo{i}.py": {
+                "dependencies": ["lib/hoge1.py"],
+                "verification": [
+                    NotSkippableConstVerification(
+                        status=ResultStatus.SUCCESS if i % 3 else ResultStatus.FAILURE
+                    ),
+                    NotSkippableConstVerification(status=ResultStatus.SUCCESS),
+                ],
+            }
+            for i in range(10)
+        },
+        "test/skip.py": {
+            "dependencies": ["lib/hoge1.py"],
+            "verification": [ConstVerification(status=ResultStatus.SUCCESS)],
+        },
+    }
+
+    def verify(jobs: int) -> VerifyCommandResult:
+        return MockVerifier(
+            {"files": files},
+            prev_result=None,
+            verification_time=datetime.datetime(2007, 1, 2, 15, 4, 5),
+            split_state=None,
+            jobs=jobs,
+        ).verify()
+
+    expected = verify(1)
+    actual = verify(4)
+    assert actual == expected
+    assert list(actual.files) == list(expected.files)
+
+
+def test_verify_jobs_error():
+    with pytest.raises(VerifierError, match=r"--jobs must be greater than 0\."):
+        MockVerifier(
+            {"files": {}},
+            prev_result=None,
+            verification_time=datetime.datetime(2007, 1, 2, 15, 4, 5),
+            split_state=None,
+            jobs=0,
+        )
@@ -17,7 +17,7 @@ from pytest_subtests import SubTests
 from competitive_verifier import app
 from competitive_verifier.documents.config import ConfigIcons, ConfigYaml
 from competitive_verifier.documents.front_matter import split_front_matter_raw
-from competitive_verifier.oj import check_gnu_time
+from competitive_verifier.oj import can_measure_memory
 
 from .data.user_defined_and_python import UserDefinedAndPythonData
 from .types import FilePaths
@@ -595,7 +595,7 @@ def data(
                                     "memory": 19.27,
                                 },
                             ]
-                            if check_gnu_time()
+                            if can_measure_memory()
                             else []
                         ),
                         "timestamp": "2063-11-24 03:09:17.740000+12:00",